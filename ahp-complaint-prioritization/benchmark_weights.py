@@ -0,0 +1,114 @@
+"""
+Weight Derivation Benchmark
+Compares speed and agreement of the AHP weight methods
+
+Usage:
+    python benchmark_weights.py --matrices 10000 --size 5 --noise 0.3
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from src.ahp_core import AHPCore
+
+
+SAATY_VALUES = np.array([1/9, 1/8, 1/7, 1/6, 1/5, 1/4, 1/3, 1/2, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+
+def random_comparison_matrices(k: int, n: int, noise: float = 0.3, seed: int = 0) -> np.ndarray:
+    """
+    Generate random reciprocal comparison matrices.
+    
+    With noise >= 0 each matrix is a consistent matrix w_i / w_j with
+    log-normal judgment noise, which resembles real survey input. With
+    noise < 0 the judgments are drawn uniformly from the Saaty scale
+    (mostly very inconsistent matrices).
+    
+    Args:
+        k: Number of matrices
+        n: Matrix size
+        noise: Standard deviation of the log-normal judgment noise
+        seed: Random seed
+        
+    Returns:
+        Array of shape (k, n, n)
+    """
+    rng = np.random.default_rng(seed)
+    upper = np.triu_indices(n, 1)
+    
+    if noise < 0:
+        values = rng.choice(SAATY_VALUES, size=(k, len(upper[0])))
+    else:
+        true_weights = rng.dirichlet(np.ones(n), size=k)
+        ratios = true_weights[:, upper[0]] / true_weights[:, upper[1]]
+        values = np.clip(ratios * rng.lognormal(0.0, noise, size=ratios.shape), 1/9, 9)
+    
+    matrices = np.ones((k, n, n))
+    matrices[:, upper[0], upper[1]] = values
+    matrices[:, upper[1], upper[0]] = 1 / values
+    return matrices
+
+
+def time_method(matrices: np.ndarray, method: str, repeats: int):
+    """Best-of-N wall time for one batched weight derivation."""
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = AHPCore.calculate_weights_batch(matrices, method=method)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description='Benchmark AHP weight derivation methods')
+    parser.add_argument('--matrices', type=int, default=10000, help='Number of matrices')
+    parser.add_argument('--size', type=int, default=5, help='Number of criteria (matrix size)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repeats (best is reported)')
+    parser.add_argument('--noise', type=float, default=0.3,
+                        help='Log-normal judgment noise (negative = uniform Saaty judgments)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+    
+    matrices = random_comparison_matrices(args.matrices, args.size, args.noise, args.seed)
+    
+    # Single-matrix loop as the baseline callers used before batching
+    start = time.perf_counter()
+    for matrix in matrices[:min(1000, len(matrices))]:
+        ahp = AHPCore([str(i) for i in range(args.size)])
+        ahp.comparison_matrix = matrix
+        ahp.calculate_weights()
+        ahp.calculate_consistency_ratio()
+    loop_time = (time.perf_counter() - start) * len(matrices) / min(1000, len(matrices))
+    
+    results = {method: time_method(matrices, method, args.repeats) for method in AHPCore.WEIGHT_METHODS}
+    exact_weights, _, exact_cr = results['eigen'][1]
+    exact_order = np.argsort(-exact_weights, axis=1, kind='mergesort')
+    
+    print("=" * 78)
+    print(f"AHP WEIGHT METHODS: {args.matrices} random {args.size}x{args.size} matrices "
+          f"(noise {args.noise})")
+    print("=" * 78)
+    print(f"{'Method':<16}{'Time (s)':>10}{'Speedup':>10}{'Max |dw|':>12}{'Same order':>12}{'Max |dCR|':>12}")
+    print("-" * 78)
+    print(f"{'eigen (loop)':<16}{loop_time:>10.4f}{1.0:>10.1f}{'-':>12}{'-':>12}{'-':>12}")
+    
+    for method, (elapsed, (weights, _, cr)) in results.items():
+        order = np.argsort(-weights, axis=1, kind='mergesort')
+        same_order = np.mean(np.all(order == exact_order, axis=1))
+        print(f"{method:<16}{elapsed:>10.4f}{loop_time / elapsed:>10.1f}"
+              f"{np.max(np.abs(weights - exact_weights)):>12.2e}{same_order:>12.1%}"
+              f"{np.max(np.abs(cr - exact_cr)):>12.2e}")
+    
+    print("-" * 78)
+    print("Agreement columns compare against the batched eigen method.")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,13 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from src.ahp_core import AHPCore
 from src.data_loader import ComplaintDataLoader
-from src.prioritizer import ComplaintPrioritizer
+from src.prioritizer import ComplaintPrioritizer, DEFAULT_STATE_PATH
+from src.uncertainty import WeightUncertaintyAnalyzer
+from src.sensitivity import SensitivityAnalyzer
+from src.workload import WorkloadBalancer
+from src.routing import RoutePlanner
+from src.spatial import SpatialGridIndex, hotspot_scores, DEFAULT_HOTSPOT_RADIUS_M
+from src.group_ahp import GroupAHP
 from src.visualizer import PrioritizationVisualizer
 
 
@@ -52,12 +58,164 @@ def main():
         action='store_true',
         help='Generate interactive map visualization (requires folium)'
     )
+    parser.add_argument(
+        '--map-mode',
+        choices=['auto', 'markers', 'geojson'],
+        default='auto',
+        help='Map rendering: one folium marker per complaint, or one embedded GeoJSON layer drawn '
+             'and clustered in the browser (auto: GeoJSON above 100 complaints)'
+    )
     parser.add_argument(
         '--top-n', 
         type=int, 
         default=10,
         help='Number of top priority complaints to display'
     )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default='default',
+        help='Weight profile from config/criteria_weights.json to prioritize with'
+    )
+    parser.add_argument(
+        '--fuzzy',
+        type=float,
+        nargs='?',
+        const=1.0,
+        default=None,
+        metavar='SPREAD',
+        help='Derive weights with fuzzy AHP, fuzzifying each judgment by +/- SPREAD (default 1)'
+    )
+    parser.add_argument(
+        '--hierarchy',
+        action='store_true',
+        help='Load sub-criteria from the config and show global sub-criteria weights'
+    )
+    parser.add_argument(
+        '--evaluators',
+        type=str,
+        default=None,
+        help='Survey CSV (one row per evaluator, "A vs B" columns) to aggregate into group weights'
+    )
+    parser.add_argument(
+        '--repair-consistency',
+        action='store_true',
+        help='Adjust pairwise comparisons until CR < 0.1 when the loaded weights are inconsistent'
+    )
+    parser.add_argument(
+        '--compare-profiles',
+        action='store_true',
+        help='Score complaints under every weight profile in the config and compare rankings'
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Stream the input in chunks of this many rows (bounded memory, no charts)'
+    )
+    parser.add_argument(
+        '--as-of',
+        type=str,
+        default=None,
+        help='Reference time for urgency scoring, ISO format (defaults to now)'
+    )
+    parser.add_argument(
+        '--state',
+        type=str,
+        default=None,
+        help='Scored state file for incremental runs, saved after a full run '
+             '(default for --delta: .cache/prioritizer_state.pkl)'
+    )
+    parser.add_argument(
+        '--delta',
+        type=str,
+        default=None,
+        help='CSV of new or changed complaints to apply to the saved state instead of '
+             'rescoring --input (rows with deleted=true are removed)'
+    )
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Merge duplicate reports (same type, nearby, similar title) before scoring (full runs only)'
+    )
+    parser.add_argument(
+        '--dedup-radius',
+        type=float,
+        default=ComplaintDataLoader.DEDUP_RADIUS_M,
+        help='Maximum distance in meters between duplicate reports'
+    )
+    parser.add_argument(
+        '--geofence',
+        type=str,
+        default=None,
+        help='GeoJSON of sector polygons; sets location_name (and department, where the polygons '
+             'define one) from the polygon containing each complaint (full runs only)'
+    )
+    parser.add_argument(
+        '--uncertainty',
+        type=int,
+        default=None,
+        metavar='SAMPLES',
+        help='Monte Carlo samples of perturbed judgments for rank-stability analysis'
+    )
+    parser.add_argument(
+        '--sensitivity',
+        action='store_true',
+        help='Sweep each criterion weight and report rank reversals of the top complaints'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Worker processes for the sensitivity sweeps'
+    )
+    parser.add_argument(
+        '--agents',
+        type=str,
+        default=None,
+        help='Agents CSV (agent_id, department, capacity) to assign open complaints to'
+    )
+    parser.add_argument(
+        '--routes',
+        action='store_true',
+        help='Build priority-weighted visit routes over the top open complaints of each department '
+             '(split across the --agents, or --route-agents per department)'
+    )
+    parser.add_argument(
+        '--route-top-k',
+        type=int,
+        default=20,
+        help='Open complaints per department to route'
+    )
+    parser.add_argument(
+        '--route-agents',
+        type=int,
+        default=1,
+        help='Agents per department for --routes when no --agents file is given'
+    )
+    parser.add_argument(
+        '--cluster-impact',
+        action='store_true',
+        help='Score Scale of Impact from the people affected by nearby complaints of the same type '
+             '(full runs only)'
+    )
+    parser.add_argument(
+        '--cluster-radius',
+        type=float,
+        default=ComplaintDataLoader.CLUSTER_RADIUS_M,
+        help='Neighbourhood radius in meters for --cluster-impact'
+    )
+    parser.add_argument(
+        '--hotspots',
+        action='store_true',
+        help='Add a Getis-Ord hotspot score of nearby priorities as a sixth criterion (full runs only)'
+    )
+    parser.add_argument(
+        '--hotspot-radius',
+        type=float,
+        default=DEFAULT_HOTSPOT_RADIUS_M,
+        help='Neighbourhood radius in meters for hotspot scores'
+    )
     
     args = parser.parse_args()
     
@@ -71,9 +229,50 @@ def main():
     prioritizer = ComplaintPrioritizer()
     data_loader = ComplaintDataLoader()
     
-    # Step 2: Load default criteria weights
-    print("Step 2: Loading default criteria weights...")
-    prioritizer.load_default_weights()
+    # Step 2: Load criteria weights
+    print(f"Step 2: Loading '{args.profile}' criteria weights...")
+    if args.profile == 'default':
+        prioritizer.load_default_weights()
+    else:
+        try:
+            prioritizer.load_weights_from_config(args.profile)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not load weight profile: {e}")
+            return
+    if args.hierarchy:
+        print("Loading criteria hierarchy...")
+        try:
+            hierarchy = prioritizer.load_hierarchy(args.profile)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not load criteria hierarchy: {e}")
+            return
+        print("Global Sub-criteria Weights:")
+        for leaf, weight in hierarchy.global_weights().items():
+            print(f"  • {leaf:<30} {weight:.4f} ({weight*100:.1f}%)")
+    # Fuzzy weights come after the hierarchy, which loads the crisp profile weights
+    if args.fuzzy is not None:
+        print(f"Deriving fuzzy AHP weights (judgment spread +/-{args.fuzzy:g})...")
+        try:
+            prioritizer.load_fuzzy_weights(args.profile, spread=args.fuzzy)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not derive fuzzy weights: {e}")
+            return
+    if args.evaluators:
+        print(f"Aggregating evaluator comparisons from {args.evaluators}...")
+        try:
+            group = GroupAHP(prioritizer.criteria)
+            group.add_survey_responses(pd.read_csv(args.evaluators))
+            prioritizer.set_group_weights(group, policy='downweight')
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ERROR] Could not aggregate evaluator comparisons: {e}")
+            return
+    if args.repair_consistency and not prioritizer.ahp.is_consistent():
+        print("Repairing inconsistent pairwise comparisons...")
+        prioritizer.repair_criteria_weights()
+    try:
+        prioritizer.load_priority_categories()
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Using default priority levels: {e}")
     print()
     
     print("Criteria Weights:")
@@ -81,31 +280,114 @@ def main():
         print(f"  • {criterion:<30} {weight:.4f} ({weight*100:.1f}%)")
     print()
     
-    # Step 3: Load complaint data
-    print(f"Step 3: Loading complaint data from {args.input}...")
-    try:
-        complaints_df = data_loader.load_from_csv(args.input)
-        print(f"[OK] Loaded {len(complaints_df)} complaints")
-    except FileNotFoundError:
-        print(f"[ERROR] Input file '{args.input}' not found")
-        print("  Please create sample data or specify a valid input file")
-        return
-    except Exception as e:
-        print(f"[ERROR] Error loading data: {e}")
-        return
-    print()
+    # Use one reference time for every complaint (and every chunk)
+    as_of = data_loader.resolve_as_of(args.as_of)
     
-    # Step 4: Enrich data with criteria scores
-    print("Step 4: Calculating criteria scores for each complaint...")
-    enriched_df = data_loader.enrich_complaint_data()
-    print("[OK] Criteria scores calculated")
-    print()
+    if args.chunksize:
+        # Steps 3-5 and 7 run as one pass: read, score and export chunk by chunk
+        print(f"Steps 3-5: Streaming complaint data from {args.input} "
+              f"in chunks of {args.chunksize} rows...")
+        chunks = (data_loader.enrich_frame(chunk, as_of=as_of)
+                  for chunk in data_loader.iter_csv_chunks(args.input, args.chunksize))
+        try:
+            prioritizer.prioritize_stream(chunks, args.output, top_n=max(args.top_n, 5))
+            print(f"[OK] Prioritized {prioritizer.stream_summary.count} complaints")
+        except FileNotFoundError:
+            print(f"[ERROR] Input file '{args.input}' not found")
+            print("  Please create sample data or specify a valid input file")
+            return
+        except Exception as e:
+            print(f"[ERROR] Error processing data: {e}")
+            return
+        print()
+    elif args.delta:
+        # Steps 3-5 only touch the changed complaints and re-age urgency
+        state_path = args.state or DEFAULT_STATE_PATH
+        print(f"Steps 3-5: Applying {args.delta} to the scored state in {state_path}...")
+        try:
+            prioritizer.load_state(state_path)
+            delta_df = pd.read_csv(args.delta)
+            deleted = pd.Series(False, index=delta_df.index)
+            if 'deleted' in delta_df.columns:
+                deleted = delta_df.pop('deleted').astype(str).str.lower().isin(['true', '1', 'yes'])
+            changes = prioritizer.apply_delta(delta_df[~deleted], deleted_ids=delta_df.loc[deleted, 'id'],
+                                              as_of=as_of)
+            prioritizer.save_state(state_path)
+        except FileNotFoundError as e:
+            print(f"[ERROR] {e}")
+            print("  Run once with --state to save a scored state before applying deltas")
+            return
+        except Exception as e:
+            print(f"[ERROR] Error applying delta: {e}")
+            return
+        print(f"[OK] {changes['inserted']} inserted, {changes['updated']} updated, "
+              f"{changes['deleted']} deleted, {changes['rescored']} re-aged")
+        enriched_df = prioritizer.scored_complaints.reset_index(drop=True)
+        print()
+    else:
+        # Step 3: Load complaint data
+        print(f"Step 3: Loading complaint data from {args.input}...")
+        try:
+            complaints_df = data_loader.load_from_csv(args.input)
+            print(f"[OK] Loaded {len(complaints_df)} complaints")
+        except FileNotFoundError:
+            print(f"[ERROR] Input file '{args.input}' not found")
+            print("  Please create sample data or specify a valid input file")
+            return
+        except Exception as e:
+            print(f"[ERROR] Error loading data: {e}")
+            return
+        
+        if args.dedup:
+            complaints_df = data_loader.deduplicate(radius_m=args.dedup_radius)
+            merged = int((complaints_df['duplicate_count'] - 1).sum())
+            print(f"[OK] Merged {merged} duplicate reports into {len(complaints_df)} complaints")
+        
+        if args.geofence:
+            previous = complaints_df.get('department')
+            try:
+                complaints_df = data_loader.assign_geofence(args.geofence)
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Could not apply geofence: {e}")
+                return
+            moved = 0 if previous is None else int((complaints_df['department'] != previous).sum())
+            print(f"[OK] Located complaints in {args.geofence}; {moved} moved to another department")
+        print()
     
-    # Step 5: Prioritize complaints
-    print("Step 5: Applying AHP algorithm to prioritize complaints...")
-    prioritized_df = prioritizer.prioritize_complaints(enriched_df)
-    print(f"[OK] Prioritization complete")
-    print()
+        # Step 4: Enrich data with criteria scores
+        print("Step 4: Calculating criteria scores for each complaint...")
+        enriched_df = data_loader.enrich_complaint_data(as_of=as_of)
+        print("[OK] Criteria scores calculated")
+        print()
+        
+        if args.cluster_impact:
+            print(f"Aggregating affected people within {args.cluster_radius:g} m...")
+            data_loader.enrich_cluster_impact(enriched_df, radius_m=args.cluster_radius)
+            raised = int((enriched_df['impact_score'] > enriched_df['local_impact_score']).sum())
+            print(f"[OK] Impact raised for {raised} complaints in clusters of related reports")
+            print()
+        
+        if args.hotspots:
+            print(f"Scoring priority hotspots within {args.hotspot_radius:g} m...")
+            spatial_index = SpatialGridIndex.from_frame(enriched_df, cell_m=args.hotspot_radius / 2)
+            enriched_df['hotspot_score'] = hotspot_scores(enriched_df,
+                                                          prioritizer.calculate_priority_scores(enriched_df),
+                                                          radius_m=args.hotspot_radius, index=spatial_index)
+            prioritizer.add_hotspot_criterion()
+            hotspot_weight = prioritizer.ahp.weights[-1]
+            print(f"[OK] {int((enriched_df['hotspot_score'] > 0.975).sum())} complaints in significant hotspots; "
+                  f"'{prioritizer.HOTSPOT_CRITERION}' weight {hotspot_weight:.4f} ({hotspot_weight*100:.1f}%)")
+            print()
+    
+        # Step 5: Prioritize complaints
+        print("Step 5: Applying AHP algorithm to prioritize complaints...")
+        # Only the top N are ranked here; the full ranking is built on export
+        prioritizer.prioritize_complaints(enriched_df, top_k=args.top_n)
+        print(f"[OK] Prioritization complete")
+        if args.state:
+            prioritizer.save_state(args.state)
+            print(f"[OK] Scored state saved to {args.state}")
+        print()
     
     # Step 6: Display results
     print(f"Step 6: Top {args.top_n} Priority Complaints:")
@@ -123,10 +405,11 @@ def main():
         print(f"     Status: {status}")
         print()
     
-    # Step 7: Export results
-    print(f"Step 7: Exporting results to {args.output}...")
-    prioritizer.export_results(args.output, include_scores=True)
-    print()
+    # Step 7: Export results (already written incrementally when streaming)
+    if not args.chunksize:
+        print(f"Step 7: Exporting results to {args.output}...")
+        prioritizer.export_results(args.output, include_scores=True)
+        print()
     
     # Step 8: Generate summary report
     print(f"Step 8: Generating summary report...")
@@ -144,6 +427,111 @@ def main():
     # Display report
     print(report)
     
+    # Multi-profile comparison (optional)
+    if args.compare_profiles and not args.chunksize:
+        print("Comparing weight profiles from config/criteria_weights.json...")
+        prioritizer.load_weight_profiles()
+        profiles_df = prioritizer.prioritize_profiles(enriched_df)
+        
+        print("Profile Weights:")
+        print(prioritizer.profile_weights.round(4).to_string())
+        print()
+        print("Rank Agreement:")
+        print(prioritizer.compare_profile_rankings(top_k=args.top_n).round(4).to_string(index=False))
+        print()
+        
+        profiles_path = Path(args.output).with_name(Path(args.output).stem + '_profiles.csv')
+        rank_cols = [col for col in profiles_df.columns if col.startswith('priority_')]
+        profiles_df[[col for col in ['id', 'title'] if col in profiles_df.columns] + rank_cols].to_csv(
+            profiles_path, index=False
+        )
+        print(f"[OK] Profile rankings saved to {profiles_path}")
+        print()
+    
+    # Rank stability under perturbed judgments (optional)
+    if args.uncertainty and not args.chunksize:
+        print(f"Simulating {args.uncertainty} perturbed weight sets (+/-1 Saaty step)...")
+        analyzer = WeightUncertaintyAnalyzer.from_matrix(prioritizer.criteria, prioritizer.ahp.comparison_matrix)
+        stability = analyzer.analyze_complaints(enriched_df, prioritizer.CRITERIA_COLUMNS,
+                                                n_samples=args.uncertainty, top_k=args.top_n)
+        stability.insert(0, 'id', enriched_df['id'])
+        stability = stability.sort_values('rank_mean', kind='mergesort')
+        
+        print(f"Rank Stability (top {args.top_n} by mean rank):")
+        print(stability.head(args.top_n).round(3).to_string(index=False))
+        print()
+        
+        stability_path = Path(args.output).with_name(Path(args.output).stem + '_uncertainty.csv')
+        stability.to_csv(stability_path, index=False)
+        print(f"[OK] Rank stability saved to {stability_path}")
+        print()
+    
+    # One-at-a-time weight sensitivity (optional)
+    sensitivity = None
+    if args.sensitivity and not args.chunksize:
+        print("Sweeping criteria weights for rank reversals...")
+        sensitivity = SensitivityAnalyzer(prioritizer.criteria, prioritizer.ahp.weights)
+        sensitivity.run_complaints(enriched_df, prioritizer.CRITERIA_COLUMNS,
+                                   top_k=args.top_n, n_jobs=args.jobs)
+        
+        print(f"Smallest weight changes that reorder the top {args.top_n}:")
+        print(sensitivity.get_critical_changes().round(4).to_string())
+        print()
+        
+        sensitivity.export_results(Path(args.output).with_name(Path(args.output).stem + '_sensitivity.csv'))
+        print()
+    
+    # Capacity-aware assignment of open complaints (optional)
+    if args.agents and not args.chunksize:
+        print(f"Assigning open complaints to the agents in {args.agents}...")
+        ranked = prioritizer.prioritized_complaints
+        if 'status' in ranked.columns:
+            ranked = ranked[ranked['status'] != 'resolved']
+        
+        balancer = WorkloadBalancer.from_csv(args.agents)
+        assignments = balancer.assign(ranked, prioritizer.ahp.weights, prioritizer.CRITERIA_COLUMNS)
+        
+        print("Assignments per department:")
+        print(balancer.department_summary.to_string(index=False))
+        print()
+        
+        assignments_path = Path(args.output).with_name(Path(args.output).stem + '_assignments.csv')
+        assignments.to_csv(assignments_path, index=False)
+        print(f"[OK] Assignments saved to {assignments_path}")
+        print()
+    
+    # Field-agent routes over the top open complaints (optional)
+    if args.routes and not args.chunksize:
+        print(f"Routing the top {args.route_top_k} open complaints of each department...")
+        ranked = prioritizer.prioritized_complaints
+        if 'status' in ranked.columns:
+            ranked = ranked[ranked['status'] != 'resolved']
+        
+        agents = pd.read_csv(args.agents) if args.agents else None
+        planner = RoutePlanner(agents, agents_per_department=args.route_agents)
+        routes = planner.plan(ranked, top_k=args.route_top_k)
+        
+        print("Routes per agent:")
+        print(planner.get_route_summary().round(1).to_string(index=False))
+        if len(planner.unrouted):
+            print(f"[WARNING] {len(planner.unrouted)} complaints without coordinates or agents were not routed")
+        print()
+        
+        routes_path = Path(args.output).with_name(Path(args.output).stem + '_routes.csv')
+        routes.to_csv(routes_path, index=False)
+        print(f"[OK] Routes saved to {routes_path}")
+        print()
+    
+    if args.chunksize and (args.visualize or args.map or args.compare_profiles
+                           or args.uncertainty or args.sensitivity or args.agents or args.routes):
+        print("[WARNING] Charts, maps, profile comparison, uncertainty, sensitivity analysis, "
+              "agent assignment and routing need the full data set and are skipped in --chunksize mode")
+        print()
+        args.visualize = args.map = False
+    
+    if args.visualize or args.map:
+        prioritized_df = prioritizer.prioritized_complaints
+    
     # Step 9: Visualizations (optional)
     if args.visualize:
         print("Step 9: Generating visualizations...")
@@ -175,9 +563,8 @@ def main():
             )
         
         # Priority levels pie chart
-        categories = prioritizer.get_priority_categories()
         visualizer.plot_priority_levels(
-            categories,
+            prioritizer.get_priority_level_counts(),
             save_path=charts_dir / 'priority_levels.png'
         )
         
@@ -188,6 +575,14 @@ def main():
             save_path=charts_dir / 'criteria_heatmap.png'
         )
         
+        # Rank sensitivity to criteria weights
+        if sensitivity is not None:
+            visualizer.plot_sensitivity_analysis(
+                sensitivity.results,
+                base_weights=dict(zip(prioritizer.criteria, prioritizer.ahp.weights)),
+                save_path=charts_dir / 'sensitivity_analysis.png'
+            )
+        
         print("[OK] All visualizations generated and saved to reports/charts/")
         print()
     
@@ -205,7 +600,8 @@ def main():
         visualizer.plot_priority_map(
             prioritized_df,
             save_path=charts_dir / 'priority_map.html',
-            top_n=map_top_n
+            top_n=map_top_n,
+            mode=args.map_mode
         )
         
         print("[OK] Interactive map generated!")
@@ -6,10 +6,35 @@ This module implements the core AHP methodology including:
 - Pairwise comparison matrix creation
 - Eigenvector calculation for priority weights
 - Consistency ratio validation
+- Batched weights and consistency ratios for stacks of matrices
+- Power iteration and row geometric mean fast paths
 """
 
+import json
+import os
+import tempfile
 import numpy as np
-from typing import List, Dict, Tuple
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+
+def write_json_atomic(path: Path, data: Dict):
+    """
+    Write JSON via a temporary file so concurrent workers never see partial files.
+    
+    Failures are reported and ignored, since callers only use it for caches.
+    """
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"[WARNING] Could not write cache {path}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 class AHPCore:
@@ -24,6 +49,18 @@ class AHPCore:
         6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49
     }
     
+    # Larger matrices use an RI simulated once and persisted here
+    RANDOM_INDEX_CACHE = Path(__file__).parent.parent / '.cache' / 'random_index.json'
+    RANDOM_INDEX_SAMPLES = 20000
+    _simulated_random_index = {}
+    
+    # Weight derivation methods: exact eigenvector, power iteration and
+    # row geometric mean (RGMM)
+    WEIGHT_METHODS = ('eigen', 'power', 'geometric_mean')
+    
+    # Saaty scale values in ascending order: 1/9 ... 1/2, 1, 2 ... 9
+    SAATY_SCALE = np.array([1/9, 1/8, 1/7, 1/6, 1/5, 1/4, 1/3, 1/2, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+    
     def __init__(self, criteria: List[str]):
         """
         Initialize AHP with criteria names.
@@ -35,6 +72,7 @@ class AHPCore:
         self.n_criteria = len(criteria)
         self.comparison_matrix = None
         self.weights = None
+        self.lambda_max = None
         self.consistency_ratio = None
         
     def create_comparison_matrix(self, pairwise_values: Dict[Tuple[str, str], float]) -> np.ndarray:
@@ -59,11 +97,19 @@ class AHPCore:
                         matrix[j][i] = 1.0 / pairwise_values[key]  # Reciprocal
                         
         self.comparison_matrix = matrix
+        self.lambda_max = None
         return matrix
     
-    def calculate_weights(self) -> np.ndarray:
+    def calculate_weights(self, method: str = 'eigen', tol: float = 1e-10,
+                          max_iter: int = 1000) -> np.ndarray:
         """
-        Calculate priority weights using eigenvector method.
+        Calculate priority weights.
+        
+        Args:
+            method: 'eigen' (exact eigenvector), 'power' (power iteration)
+                    or 'geometric_mean' (row geometric mean, RGMM)
+            tol: Convergence tolerance for power iteration
+            max_iter: Maximum iterations for power iteration
         
         Returns:
             Normalized priority weight vector
@@ -71,6 +117,14 @@ class AHPCore:
         if self.comparison_matrix is None:
             raise ValueError("Comparison matrix not initialized. Call create_comparison_matrix first.")
         
+        if method != 'eigen':
+            weights, lambda_max, _ = self.calculate_weights_batch(
+                self.comparison_matrix[np.newaxis], method=method, tol=tol, max_iter=max_iter
+            )
+            self.weights = weights[0]
+            self.lambda_max = float(lambda_max[0])
+            return self.weights
+        
         # Calculate eigenvalues and eigenvectors
         eigenvalues, eigenvectors = np.linalg.eig(self.comparison_matrix)
         
@@ -78,6 +132,9 @@ class AHPCore:
         max_eigenvalue_idx = np.argmax(eigenvalues)
         principal_eigenvector = np.real(eigenvectors[:, max_eigenvalue_idx])
         
+        # Keep lambda_max from the same decomposition for the consistency check
+        self.lambda_max = float(np.real(eigenvalues[max_eigenvalue_idx]))
+        
         # Normalize to get weights (sum = 1)
         self.weights = principal_eigenvector / np.sum(principal_eigenvector)
         
@@ -94,20 +151,294 @@ class AHPCore:
         if self.comparison_matrix is None or self.weights is None:
             raise ValueError("Matrix and weights must be calculated first.")
         
-        # Calculate lambda_max (maximum eigenvalue)
-        eigenvalues = np.linalg.eigvals(self.comparison_matrix)
-        lambda_max = np.max(np.real(eigenvalues))
+        # lambda_max (maximum eigenvalue); for the principal eigenvector
+        # A w = lambda_max w, so it can be recovered without a decomposition
+        if self.lambda_max is None:
+            self.lambda_max = float(np.mean((self.comparison_matrix @ self.weights) / self.weights))
         
-        # Calculate Consistency Index (CI)
-        ci = (lambda_max - self.n_criteria) / (self.n_criteria - 1)
+        self.consistency_ratio = float(self._consistency_ratios(np.array([self.lambda_max]), self.n_criteria)[0])
         
+        return self.consistency_ratio
+    
+    @classmethod
+    def _consistency_ratios(cls, lambda_max: np.ndarray, n: int) -> np.ndarray:
+        """
+        Consistency ratios for an array of principal eigenvalues.
+        
+        Args:
+            lambda_max: Principal eigenvalues of n x n matrices
+            n: Matrix size
+            
+        Returns:
+            Array of consistency ratios (0 where RI is 0)
+        """
         # Get Random Index (RI) for matrix size
-        ri = self.RANDOM_INDEX.get(self.n_criteria, 1.49)
+        ri = cls.random_index(n)
+        if ri == 0:
+            return np.zeros_like(lambda_max, dtype=float)
         
-        # Calculate Consistency Ratio (CR)
-        self.consistency_ratio = ci / ri if ri != 0 else 0
+        # Consistency Index (CI) over RI
+        ci = (lambda_max - n) / (n - 1)
+        return ci / ri
+    
+    @classmethod
+    def random_index(cls, n: int, n_samples: Optional[int] = None, seed: int = 0) -> float:
+        """
+        Random Index for an n x n matrix.
         
-        return self.consistency_ratio
+        Saaty's table covers n <= 10. Larger sizes are simulated once per
+        (n, n_samples, seed) and stored in RANDOM_INDEX_CACHE under that key,
+        so later runs with the same settings read them from disk.
+        
+        Args:
+            n: Matrix size
+            n_samples: Number of random matrices (defaults to RANDOM_INDEX_SAMPLES)
+            seed: Random seed for the simulation
+            
+        Returns:
+            Random Index value
+        """
+        if n in cls.RANDOM_INDEX:
+            return cls.RANDOM_INDEX[n]
+        
+        n_samples = n_samples or cls.RANDOM_INDEX_SAMPLES
+        key = f"{n}:{n_samples}:{seed}"
+        if key in cls._simulated_random_index:
+            return cls._simulated_random_index[key]
+        
+        cache_file = Path(cls.RANDOM_INDEX_CACHE)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = {str(k): float(ri) for k, ri in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            cached = {}
+        
+        if key not in cached:
+            cached[key] = cls.simulate_random_index(n, n_samples, seed)
+            write_json_atomic(cache_file, dict(sorted(cached.items())))
+        
+        cls._simulated_random_index.update(cached)
+        return cached[key]
+    
+    @classmethod
+    def simulate_random_index(cls, n: int, n_samples: Optional[int] = None, seed: int = 0) -> float:
+        """
+        Estimate the Random Index by simulation.
+        
+        RI is the mean consistency index of random reciprocal matrices whose
+        upper-triangle judgments are drawn uniformly from the Saaty scale.
+        
+        Args:
+            n: Matrix size
+            n_samples: Number of random matrices (defaults to RANDOM_INDEX_SAMPLES)
+            seed: Random seed, fixed so the estimate is reproducible
+            
+        Returns:
+            Estimated Random Index
+        """
+        if n < 3:
+            return 0.0
+        
+        n_samples = n_samples or cls.RANDOM_INDEX_SAMPLES
+        rng = np.random.default_rng(seed)
+        upper_i, upper_j = np.triu_indices(n, 1)
+        
+        lambda_sum = 0.0
+        for start in range(0, n_samples, 1000):
+            size = min(1000, n_samples - start)
+            values = cls.SAATY_SCALE[rng.integers(0, len(cls.SAATY_SCALE), size=(size, len(upper_i)))]
+            
+            matrices = np.ones((size, n, n))
+            matrices[:, upper_i, upper_j] = values
+            matrices[:, upper_j, upper_i] = 1.0 / values
+            lambda_sum += np.real(np.linalg.eigvals(matrices)).max(axis=1).sum()
+        
+        return float((lambda_sum / n_samples - n) / (n - 1))
+    
+    @classmethod
+    def calculate_weights_batch(cls, matrices: np.ndarray, method: str = 'eigen', tol: float = 1e-10,
+                                max_iter: int = 1000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate weights, lambda_max and CR for a stack of comparison matrices.
+        
+        With the default eigen method all matrices are decomposed in one
+        vectorized np.linalg.eig call.
+        
+        Args:
+            matrices: Array of shape (k, n, n) of pairwise comparison matrices
+            method: 'eigen', 'power' or 'geometric_mean' (see calculate_weights)
+            tol: Convergence tolerance for power iteration
+            max_iter: Maximum iterations for power iteration
+            
+        Returns:
+            Tuple of weights (k, n), lambda_max (k,) and consistency ratios (k,)
+        """
+        matrices = np.asarray(matrices, dtype=float)
+        if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]:
+            raise ValueError(f"Expected an array of shape (k, n, n), got {matrices.shape}")
+        if method not in cls.WEIGHT_METHODS:
+            raise ValueError(f"Unknown weight method '{method}'. Use one of {cls.WEIGHT_METHODS}")
+        
+        k, n, _ = matrices.shape
+        
+        if method == 'power':
+            weights, lambda_max = cls._power_iteration(matrices, tol, max_iter)
+            return weights, lambda_max, cls._consistency_ratios(lambda_max, n)
+        
+        if method == 'geometric_mean':
+            # Row geometric means, computed in log space to avoid overflow
+            weights = np.exp(np.mean(np.log(matrices), axis=2))
+            weights /= weights.sum(axis=1, keepdims=True)
+            
+            # Standard lambda_max estimate for RGMM weights
+            lambda_max = np.mean(np.einsum('kij,kj->ki', matrices, weights) / weights, axis=1)
+            return weights, lambda_max, cls._consistency_ratios(lambda_max, n)
+        
+        eigenvalues, eigenvectors = np.linalg.eig(matrices)
+        
+        # Principal eigenpair of each matrix
+        max_eigenvalue_idx = np.argmax(eigenvalues, axis=1)
+        rows = np.arange(k)
+        principal_eigenvectors = np.real(eigenvectors[rows, :, max_eigenvalue_idx])
+        lambda_max = np.real(eigenvalues[rows, max_eigenvalue_idx])
+        
+        weights = principal_eigenvectors / principal_eigenvectors.sum(axis=1, keepdims=True)
+        
+        return weights, lambda_max, cls._consistency_ratios(lambda_max, n)
+    
+    @staticmethod
+    def _power_iteration(matrices: np.ndarray, tol: float, max_iter: int,
+                         initial: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Principal eigenpairs of positive matrices by batched power iteration.
+        
+        Positive reciprocal matrices have a simple dominant eigenvalue with a
+        positive eigenvector (Perron), so the iteration converges from the
+        uniform vector, and in a few steps from a nearby eigenvector.
+        
+        Args:
+            matrices: Array of shape (k, n, n) of positive matrices
+            tol: Stop when no weight changes by more than tol
+            max_iter: Maximum number of iterations
+            initial: Optional (k, n) starting weights (defaults to uniform)
+            
+        Returns:
+            Tuple of weights (k, n) normalized to sum 1 and lambda_max (k,)
+        """
+        k, n, _ = matrices.shape
+        if initial is None:
+            weights = np.full((k, n), 1.0 / n)
+        else:
+            weights = initial / initial.sum(axis=1, keepdims=True)
+        
+        for _ in range(max_iter):
+            product = np.einsum('kij,kj->ki', matrices, weights)
+            
+            # With weights summing to 1, the sum of A w estimates lambda_max
+            lambda_max = product.sum(axis=1)
+            new_weights = product / lambda_max[:, np.newaxis]
+            
+            converged = np.max(np.abs(new_weights - weights), initial=0.0) <= tol
+            weights = new_weights
+            if converged:
+                break
+        
+        lambda_max = np.einsum('kij,kj->ki', matrices, weights).sum(axis=1)
+        return weights, lambda_max
+    
+    def repair_consistency(self, threshold: float = 0.1, max_changes: Optional[int] = None,
+                           snap_to_scale: bool = True, apply: bool = False,
+                           tol: float = 1e-10) -> List[Dict]:
+        """
+        Propose judgment adjustments that bring CR below a threshold.
+        
+        Each step replaces the judgment a_ij with the largest deviation
+        |log(a_ij * w_j / w_i)| by the value the current weights imply,
+        w_i / w_j (kept within 1/9 ... 9 and optionally snapped to the Saaty
+        scale). After each change the weights and lambda_max are updated by
+        power iteration warm-started from the previous weights, which needs
+        only a few matrix-vector products instead of a full eigen
+        decomposition.
+        
+        Args:
+            threshold: Target CR (stop once CR < threshold)
+            max_changes: Maximum number of adjustments (defaults to the
+                         number of judgments)
+            snap_to_scale: Keep adjusted judgments on the 1/9 ... 9 Saaty scale
+            apply: Replace the comparison matrix, weights and CR with the
+                   repaired ones
+            tol: Convergence tolerance for the warm-started power iteration
+            
+        Returns:
+            List of adjustments in order, each a dictionary with criterion_i,
+            criterion_j, old_value, new_value and the consistency_ratio after
+            the change
+        """
+        if self.comparison_matrix is None:
+            raise ValueError("Comparison matrix not initialized. Call create_comparison_matrix first.")
+        
+        n = self.n_criteria
+        matrix = self.comparison_matrix.copy()
+        upper_i, upper_j = np.triu_indices(n, 1)
+        if max_changes is None:
+            max_changes = len(upper_i)
+        
+        weights, lambda_max, cr = self.calculate_weights_batch(matrix[np.newaxis])
+        weights, cr = weights[0], float(cr[0])
+        
+        changes = []
+        while cr >= threshold and len(changes) < max_changes:
+            current = matrix[upper_i, upper_j]
+            target = weights[upper_i] / weights[upper_j]
+            proposed = (self._snap_judgments(current, target) if snap_to_scale
+                        else np.clip(target, 1/9, 9))
+            
+            # Largest deviation among judgments that would actually change
+            deviation = np.abs(np.log(current / target))
+            deviation[np.isclose(proposed, current)] = -1.0
+            k = int(np.argmax(deviation))
+            if deviation[k] < 0:
+                break
+            
+            i, j = upper_i[k], upper_j[k]
+            matrix[i, j] = proposed[k]
+            matrix[j, i] = 1.0 / proposed[k]
+            
+            new_weights, lambda_max = self._power_iteration(matrix[np.newaxis], tol, 1000,
+                                                            initial=weights[np.newaxis])
+            weights = new_weights[0]
+            cr = float(self._consistency_ratios(lambda_max, n)[0])
+            
+            changes.append({
+                'criterion_i': self.criteria[i],
+                'criterion_j': self.criteria[j],
+                'old_value': float(current[k]),
+                'new_value': float(proposed[k]),
+                'consistency_ratio': cr
+            })
+        
+        if apply and changes:
+            self.comparison_matrix = matrix
+            self.calculate_weights()
+            self.calculate_consistency_ratio()
+        
+        return changes
+    
+    @classmethod
+    def _snap_judgments(cls, current: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """
+        Nearest Saaty scale value to each target, moving at least one step.
+        
+        Where the nearest scale value is the current judgment, the judgment
+        moves one step towards the target instead so every proposal changes.
+        """
+        log_scale = np.log(cls.SAATY_SCALE)
+        nearest = np.abs(log_scale[:, np.newaxis] - np.log(target)).argmin(axis=0)
+        current_step = np.abs(log_scale[:, np.newaxis] - np.log(current)).argmin(axis=0)
+        
+        step_towards = current_step + np.sign(np.log(target) - log_scale[current_step]).astype(int)
+        steps = np.where(nearest == current_step, step_towards, nearest)
+        return cls.SAATY_SCALE[np.clip(steps, 0, len(cls.SAATY_SCALE) - 1)]
     
     def is_consistent(self, threshold: float = 0.1) -> bool:
         """
@@ -154,10 +485,33 @@ class AHPCore:
         return {
             'criteria': self.criteria,
             'weights': self.weights.tolist() if self.weights is not None else None,
-            'consistency_ratio': self.consistency_ratio,
-            'is_consistent': self.is_consistent() if self.consistency_ratio is not None else None,
+            'lambda_max': self.lambda_max,
+            'consistency_ratio': float(self.consistency_ratio) if self.consistency_ratio is not None else None,
+            'is_consistent': bool(self.is_consistent()) if self.consistency_ratio is not None else None,
             'comparison_matrix': self.comparison_matrix.tolist() if self.comparison_matrix is not None else None
         }
+    
+    @classmethod
+    def from_summary(cls, summary: Dict) -> 'AHPCore':
+        """
+        Restore an AHP instance from a get_summary dictionary.
+        
+        Weights and CR are taken as stored, without recomputation.
+        
+        Args:
+            summary: Dictionary produced by get_summary
+            
+        Returns:
+            AHPCore instance with matrix, weights and consistency ratio set
+        """
+        ahp = cls(list(summary['criteria']))
+        if summary.get('comparison_matrix') is not None:
+            ahp.comparison_matrix = np.asarray(summary['comparison_matrix'], dtype=float)
+        if summary.get('weights') is not None:
+            ahp.weights = np.asarray(summary['weights'], dtype=float)
+        ahp.lambda_max = summary.get('lambda_max')
+        ahp.consistency_ratio = summary.get('consistency_ratio')
+        return ahp
 
 
 def create_saaty_scale_comparison(value: float) -> str:
@@ -0,0 +1,178 @@
+"""
+Configuration Loader
+Reads prioritization settings from config/criteria_weights.json
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from ahp_core import AHPCore, write_json_atomic
+
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'criteria_weights.json'
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / '.cache' / 'ahp_weights'
+
+# Bump when the weight derivation changes so stale cache entries are ignored
+WEIGHTS_CACHE_VERSION = 1
+
+
+def load_config(config_path: Optional[str] = None) -> Dict:
+    """
+    Load the prioritization configuration file.
+    
+    Args:
+        config_path: Path to JSON config (defaults to config/criteria_weights.json)
+    
+    Returns:
+        Parsed configuration dictionary
+    """
+    path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_priority_percentiles(config: Dict) -> Dict[str, float]:
+    """
+    Get the lower percentile bound of each priority level.
+    
+    Args:
+        config: Parsed configuration dictionary
+    
+    Returns:
+        Dictionary of priority level to threshold percentile (0-100),
+        ordered from the highest level to the lowest
+    """
+    categories = config.get('priority_categories')
+    if not categories:
+        raise ValueError("Config has no 'priority_categories' section.")
+    
+    percentiles = {}
+    for level, settings in categories.items():
+        percentile = float(settings['threshold_percentile'])
+        if not 0 <= percentile <= 100:
+            raise ValueError(f"Invalid threshold_percentile for '{level}': {percentile}")
+        percentiles[level] = percentile
+    
+    return dict(sorted(percentiles.items(), key=lambda item: item[1], reverse=True))
+
+
+def parse_pairwise_comparisons(profile: Dict[str, float],
+                               criteria: Optional[List[str]] = None) -> Dict[Tuple[str, str], float]:
+    """
+    Convert "A vs B" string keys into (A, B) tuple keys.
+    
+    Args:
+        profile: Dictionary of "A vs B" keys to comparison values (1-9 scale)
+        criteria: Optional list of known criteria names to validate against
+    
+    Returns:
+        Dictionary usable with AHPCore.create_comparison_matrix
+    """
+    comparisons = {}
+    for key, value in profile.items():
+        parts = [part.strip() for part in key.split(' vs ')]
+        if len(parts) != 2:
+            raise ValueError(f"Invalid comparison key '{key}', expected 'A vs B'")
+        
+        unknown = [part for part in parts if criteria is not None and part not in criteria]
+        if unknown:
+            raise ValueError(f"Unknown criteria in comparison '{key}': {unknown}")
+        
+        comparisons[(parts[0], parts[1])] = float(value)
+    
+    return comparisons
+
+
+def get_comparison_profiles(config: Dict,
+                            criteria: Optional[List[str]] = None) -> Dict[str, Dict[Tuple[str, str], float]]:
+    """
+    Get every pairwise comparison profile from the configuration.
+    
+    Args:
+        config: Parsed configuration dictionary
+        criteria: Optional list of known criteria names to validate against
+    
+    Returns:
+        Dictionary of profile name to parsed pairwise comparisons
+    """
+    profiles = config.get('pairwise_comparisons')
+    if not profiles:
+        raise ValueError("Config has no 'pairwise_comparisons' section.")
+    
+    return {name: parse_pairwise_comparisons(profile, criteria) for name, profile in profiles.items()}
+
+
+def profile_cache_key(profile: Dict[str, float], criteria: List[str]) -> str:
+    """
+    Hash a raw comparison profile together with the criteria order.
+    
+    Args:
+        profile: Dictionary of "A vs B" keys to comparison values
+        criteria: Criteria names in weight order
+    
+    Returns:
+        Hex digest identifying the compiled weights
+    """
+    payload = json.dumps({
+        'version': WEIGHTS_CACHE_VERSION,
+        'criteria': list(criteria),
+        'comparisons': {key: float(value) for key, value in profile.items()}
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def compile_profile(profile: Dict[str, float], criteria: List[str],
+                    cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> AHPCore:
+    """
+    Build an AHP instance for a profile, reusing cached weights when possible.
+    
+    On a cache hit the stored matrix, weights and CR are restored directly,
+    skipping parsing, the eigen decomposition and the consistency check.
+    
+    Args:
+        profile: Dictionary of "A vs B" keys to comparison values
+        criteria: Criteria names in weight order
+        cache_dir: Directory for cached weights (None disables caching)
+    
+    Returns:
+        AHPCore instance with weights and consistency ratio calculated
+    """
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = Path(cache_dir) / f"weights_{profile_cache_key(profile, criteria)}.json"
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return AHPCore.from_summary(json.load(f))
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    ahp = AHPCore(criteria)
+    ahp.create_comparison_matrix(parse_pairwise_comparisons(profile, criteria))
+    ahp.calculate_weights()
+    ahp.calculate_consistency_ratio()
+    
+    if cache_file is not None:
+        write_json_atomic(cache_file, ahp.get_summary())
+    
+    return ahp
+
+
+def compile_profiles(config: Dict, criteria: List[str],
+                     cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Dict[str, AHPCore]:
+    """
+    Compile every pairwise comparison profile in the configuration.
+    
+    Args:
+        config: Parsed configuration dictionary
+        criteria: Criteria names in weight order
+        cache_dir: Directory for cached weights (None disables caching)
+    
+    Returns:
+        Dictionary of profile name to AHPCore instance
+    """
+    profiles = config.get('pairwise_comparisons')
+    if not profiles:
+        raise ValueError("Config has no 'pairwise_comparisons' section.")
+    
+    return {name: compile_profile(profile, criteria, cache_dir) for name, profile in profiles.items()}
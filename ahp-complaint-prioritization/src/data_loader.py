@@ -5,8 +5,12 @@ Handles data integration with existing complaint management system
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import List, Dict, Iterator, Optional, Sequence, Union
+from datetime import datetime, timezone
+from pathlib import Path
+from dedup import duplicate_groups
+from spatial import SpatialGridIndex, DEFAULT_CELL_M
+from geofence import Geofence, DEFAULT_PROPERTY_COLUMNS
 
 
 class ComplaintDataLoader:
@@ -14,8 +18,42 @@ class ComplaintDataLoader:
     Loads and processes complaint data for AHP prioritization.
     """
     
+    # Base public safety risk by complaint type (unknown types score 0.5)
+    RISK_TYPE_SCORES = {
+        'gas_leak': 0.9, 'electrical_hazard': 0.9, 'building_collapse': 0.9, 'fire_hazard': 0.9,
+        'water_contamination': 0.6, 'broken_traffic_light': 0.6, 'pothole': 0.6,
+        'noise_complaint': 0.3, 'graffiti': 0.3, 'littering': 0.3
+    }
+    
+    SEVERITY_MULTIPLIER = {
+        'critical': 1.0,
+        'high': 0.8,
+        'medium': 0.5,
+        'low': 0.2
+    }
+    
+    COMPLEXITY_FACTOR = {
+        'low': 0.8,
+        'medium': 0.5,
+        'high': 0.2
+    }
+    
+    # Upper band limits (inclusive) and the score assigned to each band
+    IMPACT_BANDS = [0, 10, 50, 100, 500]
+    IMPACT_BAND_SCORES = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+    CAPACITY_BANDS = [5, 10, 20, 30]
+    CAPACITY_BAND_SCORES = [1.0, 0.8, 0.6, 0.4, 0.2]
+    
+    # Duplicate reports: same type, within this many meters, similar titles
+    DEDUP_RADIUS_M = 200.0
+    DEDUP_SIMILARITY = 0.6
+    
+    # Neighbourhood of a complaint for cluster-aware impact
+    CLUSTER_RADIUS_M = 300.0
+    
     def __init__(self):
         self.complaints_df = None
+        self.duplicate_of = None
         
     def load_from_csv(self, filepath: str) -> pd.DataFrame:
         """
@@ -30,6 +68,27 @@ class ComplaintDataLoader:
         self.complaints_df = pd.read_csv(filepath)
         return self.complaints_df
     
+    def iter_csv_chunks(self, filepath: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Stream complaint data from a CSV file in fixed-size chunks.
+        
+        Unlike load_from_csv, the chunks are not kept on the loader, so memory
+        use is bounded by the chunk size rather than the file size.
+        
+        Args:
+            filepath: Path to CSV file
+            chunksize: Number of rows per chunk
+            
+        Yields:
+            DataFrame chunks with complaint data
+        """
+        if chunksize <= 0:
+            raise ValueError("chunksize must be a positive integer.")
+        
+        with pd.read_csv(filepath, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk
+    
     def load_from_supabase(self, supabase_client, filters: Optional[Dict] = None) -> pd.DataFrame:
         """
         Load complaint data from Supabase database.
@@ -56,6 +115,116 @@ class ComplaintDataLoader:
         self.complaints_df = pd.DataFrame(response.data)
         return self.complaints_df
     
+    def deduplicate(self, radius_m: float = DEDUP_RADIUS_M, similarity: float = DEDUP_SIMILARITY,
+                    text_columns: Sequence[str] = ('title',)) -> pd.DataFrame:
+        """
+        Merge repeated reports of the same problem into one canonical complaint.
+        
+        Complaints of the same type within radius_m of each other whose text
+        has an estimated Jaccard similarity of at least `similarity` are
+        grouped (transitively) in near-linear time, see dedup.duplicate_groups.
+        The earliest report of each group is kept, with affected_people summed
+        over the group, a duplicate_count column and the other ids in merged_ids.
+        
+        Args:
+            radius_m: Maximum distance between duplicate reports in meters
+            similarity: Minimum text similarity (0-1) of duplicate reports
+            text_columns: Columns compared for similarity (e.g. title, description)
+            
+        Returns:
+            Deduplicated DataFrame, which also replaces the loaded data
+        """
+        if self.complaints_df is None:
+            raise ValueError("No data loaded.")
+        
+        df = self.complaints_df
+        labels = duplicate_groups(df, radius_m, similarity, text_columns)
+        
+        # Earliest report first within each group (missing dates last, ties in input order)
+        if 'created_at' in df.columns:
+            created = self.parse_created_dates(df['created_at'])
+            report_order = created.rank(method='first', na_option='bottom').to_numpy()
+        else:
+            report_order = np.arange(len(df))
+        order = np.lexsort((report_order, labels))
+        _, first = np.unique(labels[order], return_index=True)
+        canonical = np.sort(order[first])
+        canonical_of = np.empty(len(canonical), dtype=np.int64)
+        canonical_of[labels[canonical]] = canonical
+        
+        result = df.iloc[canonical].reset_index(drop=True)
+        if 'affected_people' in df.columns:
+            affected = pd.to_numeric(df['affected_people'], errors='coerce').groupby(labels).sum()
+            result['affected_people'] = affected.to_numpy()[labels[canonical]]
+        result['duplicate_count'] = np.bincount(labels, minlength=len(canonical))[labels[canonical]]
+        
+        if 'id' in df.columns:
+            merged_rows = np.flatnonzero(canonical_of[labels] != np.arange(len(df)))
+            merged = df['id'].astype(str).iloc[merged_rows].groupby(labels[merged_rows]).agg(';'.join)
+            result['merged_ids'] = merged.reindex(labels[canonical], fill_value='').to_numpy()
+            self.duplicate_of = pd.Series(df['id'].to_numpy()[canonical_of[labels]], index=df['id'],
+                                          name='canonical_id')
+        
+        self.complaints_df = result
+        return result
+    
+    def assign_geofence(self, geofence: Union[str, Path, Geofence],
+                        property_columns: Optional[Dict[str, str]] = None,
+                        overwrite: bool = True) -> pd.DataFrame:
+        """
+        Fill complaint columns from the polygon each complaint lies in.
+        
+        Feature properties (by default name -> location_name and
+        department -> department, where the GeoJSON has them) are copied to
+        every complaint inside a polygon. A complaint moved to another
+        department takes that department's most recently reported
+        department_load, so its capacity score reflects the new department.
+        
+        Args:
+            geofence: Geofence or path to a GeoJSON file of sector or
+                      jurisdiction polygons
+            property_columns: Mapping of feature property to complaint column
+            overwrite: Replace existing values (False only fills missing ones)
+            
+        Returns:
+            Updated DataFrame, which also replaces the loaded data
+        """
+        if self.complaints_df is None:
+            raise ValueError("No data loaded.")
+        if isinstance(geofence, (str, Path)):
+            geofence = Geofence.from_geojson(geofence)
+        
+        df = self.complaints_df.copy()
+        located = geofence.locate_frame(df)
+        previous_department = df['department'].copy() if 'department' in df.columns else None
+        
+        for prop, column in (property_columns or DEFAULT_PROPERTY_COLUMNS).items():
+            if prop not in geofence.properties.columns:
+                continue
+            values = pd.Series(geofence.properties[prop].to_numpy(dtype=object)[located], index=df.index)
+            update = (located >= 0) & values.notna().to_numpy()
+            if column not in df.columns:
+                df[column] = values.where(update)
+                continue
+            if not overwrite:
+                update &= df[column].isna().to_numpy()
+            df.loc[update, column] = values[update]
+        
+        if previous_department is not None and 'department_load' in df.columns:
+            moved = (df['department'] != previous_department).to_numpy() & df['department'].notna().to_numpy()
+            if moved.any():
+                # Latest load reported by each department on its own complaints
+                reports = df.loc[~moved, ['department', 'department_load']]
+                if 'created_at' in df.columns:
+                    created = self.parse_created_dates(df.loc[~moved, 'created_at'])
+                    reports = reports.iloc[np.argsort(created.to_numpy(), kind='stable')]
+                current = reports.dropna().groupby('department')['department_load'].last()
+                df.loc[moved, 'department_load'] = (df.loc[moved, 'department'].map(current)
+                                                    .fillna(df.loc[moved, 'department_load']))
+        
+        self.complaints_df = df
+        return df
+    
     def normalize_criteria_scores(self, criteria_columns: List[str]) -> pd.DataFrame:
         """
         Normalize criteria scores to 0-1 scale.
@@ -94,30 +263,11 @@ class ComplaintDataLoader:
         Returns:
             Safety score (0-1)
         """
-        # Define risk levels for different complaint types
-        high_risk_types = ['gas_leak', 'electrical_hazard', 'building_collapse', 'fire_hazard']
-        medium_risk_types = ['water_contamination', 'broken_traffic_light', 'pothole']
-        low_risk_types = ['noise_complaint', 'graffiti', 'littering']
-        
-        severity_multiplier = {
-            'critical': 1.0,
-            'high': 0.8,
-            'medium': 0.5,
-            'low': 0.2
-        }
-        
-        # Calculate base score
-        if complaint_type.lower() in high_risk_types:
-            base_score = 0.9
-        elif complaint_type.lower() in medium_risk_types:
-            base_score = 0.6
-        elif complaint_type.lower() in low_risk_types:
-            base_score = 0.3
-        else:
-            base_score = 0.5  # Default for unknown types
+        # Calculate base score (0.5 default for unknown types)
+        base_score = self.RISK_TYPE_SCORES.get(complaint_type.lower(), 0.5)
         
         # Apply severity multiplier
-        multiplier = severity_multiplier.get(severity.lower(), 0.5)
+        multiplier = self.SEVERITY_MULTIPLIER.get(severity.lower(), 0.5)
         
         return min(base_score * multiplier, 1.0)
     
@@ -145,20 +295,25 @@ class ComplaintDataLoader:
         else:
             return 1.0
     
-    def calculate_urgency_score(self, created_date: str, deadline_hours: Optional[int] = None) -> float:
+    def calculate_urgency_score(self, created_date: str, deadline_hours: Optional[int] = None,
+                                as_of: Optional[datetime] = None) -> float:
         """
         Calculate urgency score based on time elapsed and deadline.
         
         Args:
             created_date: Complaint creation date (ISO format)
             deadline_hours: Optional deadline in hours
+            as_of: Optional reference time (defaults to now)
             
         Returns:
             Urgency score (0-1)
         """
         try:
             created = datetime.fromisoformat(created_date.replace('Z', '+00:00'))
-            now = datetime.now(created.tzinfo)
+            if created.tzinfo is None:
+                # Naive timestamps are UTC, as in calculate_urgency_scores
+                created = created.replace(tzinfo=timezone.utc)
+            now = self.resolve_as_of(as_of)
             hours_elapsed = (now - created).total_seconds() / 3600
             
             if deadline_hours:
@@ -179,6 +334,104 @@ class ComplaintDataLoader:
             print(f"Error calculating urgency: {e}")
             return 0.5
     
+    def calculate_urgency_scores(self, created_dates: pd.Series, deadline_hours=None,
+                                 as_of=None) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_urgency_score.
+        
+        The whole column is parsed once and every complaint is aged against
+        the same reference time, so results are reproducible for a given as_of.
+        
+        Args:
+            created_dates: Series of complaint creation dates (ISO format)
+            deadline_hours: Optional deadline in hours (scalar or per-complaint Series)
+            as_of: Reference time (defaults to the current UTC time)
+            
+        Returns:
+            Array of urgency scores (0-1)
+        """
+        created = self.parse_created_dates(created_dates)
+        scores = self.calculate_urgency_from_created(created, deadline_hours, as_of)
+        
+        invalid = created.isna().to_numpy()
+        if invalid.any():
+            print(f"Warning: {int(invalid.sum())} complaint(s) with unparseable created_at, "
+                  "using default urgency 0.5")
+        
+        return scores
+    
+    @staticmethod
+    def parse_created_dates(created_dates: pd.Series) -> pd.Series:
+        """
+        Parse creation dates once into UTC timestamps (NaT where invalid).
+        
+        Args:
+            created_dates: Series of complaint creation dates (ISO format)
+        
+        Returns:
+            Series of timezone-aware UTC timestamps
+        """
+        return pd.to_datetime(pd.Series(created_dates), utc=True, errors='coerce', format='ISO8601')
+    
+    def calculate_urgency_from_created(self, created: pd.Series, deadline_hours=None,
+                                       as_of=None) -> np.ndarray:
+        """
+        Urgency scores from already parsed creation timestamps.
+        
+        Lets callers that keep parsed timestamps (e.g. incremental runs)
+        re-age complaints against a new reference time without re-parsing.
+        
+        Args:
+            created: Series of UTC timestamps from parse_created_dates
+            deadline_hours: Optional deadline in hours (scalar or per-complaint Series)
+            as_of: Reference time (defaults to the current UTC time)
+        
+        Returns:
+            Array of urgency scores (0-1), 0.5 where the timestamp is missing
+        """
+        as_of = self.resolve_as_of(as_of)
+        hours_elapsed = ((as_of - created) / pd.Timedelta(hours=1)).to_numpy(dtype=float)
+        
+        # Score based on age of complaint, decaying over a month after one week
+        scores = np.select(
+            [hours_elapsed < 24, hours_elapsed < 72, hours_elapsed < 168],
+            [0.9, 0.7, 0.5],
+            default=np.maximum(0.3, 1.0 - (hours_elapsed / (30 * 24)))
+        )
+        
+        if deadline_hours is not None:
+            deadlines = np.broadcast_to(
+                np.asarray(pd.to_numeric(deadline_hours, errors='coerce'), dtype=float),
+                hours_elapsed.shape
+            )
+            # Score based on deadline proximity where a deadline is set
+            has_deadline = np.nan_to_num(deadlines) != 0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.minimum(hours_elapsed / deadlines, 1.0)
+            scores = np.where(has_deadline, ratio, scores)
+        
+        scores[np.isnan(hours_elapsed)] = 0.5
+        return scores
+    
+    @staticmethod
+    def resolve_as_of(as_of=None) -> pd.Timestamp:
+        """
+        Normalize a reference time to a UTC timestamp.
+        
+        Args:
+            as_of: datetime, ISO string or None for the current time
+            
+        Returns:
+            Timezone-aware UTC timestamp
+        """
+        if as_of is None:
+            return pd.Timestamp.now(tz='UTC')
+        
+        as_of = pd.Timestamp(as_of)
+        if as_of.tzinfo is None:
+            return as_of.tz_localize('UTC')
+        return as_of.tz_convert('UTC')
+    
     def calculate_resource_score(self, estimated_cost: float, complexity: str) -> float:
         """
         Calculate resource requirement score (inverse - lower is better).
@@ -190,17 +443,11 @@ class ComplaintDataLoader:
         Returns:
             Resource score (0-1, inverted so higher is less resources)
         """
-        complexity_factor = {
-            'low': 0.8,
-            'medium': 0.5,
-            'high': 0.2
-        }
-        
         # Normalize cost (inverse relationship)
         cost_score = max(0, 1.0 - min(estimated_cost / 10000, 1.0))
         
         # Combine with complexity
-        complexity_score = complexity_factor.get(complexity.lower(), 0.5)
+        complexity_score = self.COMPLEXITY_FACTOR.get(complexity.lower(), 0.5)
         
         return (cost_score + complexity_score) / 2
     
@@ -227,10 +474,87 @@ class ComplaintDataLoader:
         else:
             return 0.2
     
-    def enrich_complaint_data(self) -> pd.DataFrame:
+    def calculate_safety_scores(self, complaint_types: pd.Series, severities: pd.Series) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_safety_score.
+        
+        Args:
+            complaint_types: Series of complaint types
+            severities: Series of severity levels
+            
+        Returns:
+            Array of safety scores (0-1)
+        """
+        base_score = self._lookup(complaint_types, self.RISK_TYPE_SCORES)
+        multiplier = self._lookup(severities, self.SEVERITY_MULTIPLIER)
+        
+        return np.minimum(base_score * multiplier, 1.0)
+    
+    def calculate_impact_scores(self, affected_people: pd.Series) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_impact_score.
+        
+        Args:
+            affected_people: Series with number of people affected
+            
+        Returns:
+            Array of impact scores (0-1)
+        """
+        values = pd.to_numeric(affected_people, errors='coerce').to_numpy(dtype=float)
+        
+        # NaN falls into the last band, matching the scalar comparisons
+        bands = np.digitize(values, self.IMPACT_BANDS, right=True)
+        return np.asarray(self.IMPACT_BAND_SCORES)[bands]
+    
+    def calculate_resource_scores(self, estimated_costs: pd.Series, complexities: pd.Series) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_resource_score.
+        
+        Args:
+            estimated_costs: Series of estimated costs
+            complexities: Series of complexity levels
+            
+        Returns:
+            Array of resource scores (0-1, inverted so higher is less resources)
+        """
+        costs = pd.to_numeric(estimated_costs, errors='coerce').to_numpy(dtype=float)
+        
+        # fmax drops NaN the same way the builtin max(0, nan) does
+        cost_score = np.fmax(0, 1.0 - np.minimum(costs / 10000, 1.0))
+        complexity_score = self._lookup(complexities, self.COMPLEXITY_FACTOR)
+        
+        return (cost_score + complexity_score) / 2
+    
+    def calculate_capacity_scores(self, current_loads: pd.Series) -> np.ndarray:
+        """
+        Vectorized counterpart of calculate_capacity_score.
+        
+        Args:
+            current_loads: Series with current number of active complaints
+            
+        Returns:
+            Array of capacity scores (0-1, higher means more capacity)
+        """
+        loads = pd.to_numeric(current_loads, errors='coerce').to_numpy(dtype=float)
+        
+        bands = np.digitize(loads, self.CAPACITY_BANDS, right=True)
+        return np.asarray(self.CAPACITY_BAND_SCORES)[bands]
+    
+    @staticmethod
+    def _lookup(values: pd.Series, table: Dict[str, float], default: float = 0.5) -> np.ndarray:
+        """Map lower-cased string values through a score table."""
+        keys = pd.Series(values).astype(str).str.lower()
+        return keys.map(table).fillna(default).to_numpy(dtype=float)
+    
+    def enrich_complaint_data(self, vectorized: bool = True, as_of=None) -> pd.DataFrame:
         """
         Enrich complaint data with calculated AHP criteria scores.
         
+        Args:
+            vectorized: Use the columnar scoring path (the per-row scalar
+                        methods are used when False)
+            as_of: Reference time for urgency scoring (defaults to now)
+        
         Returns:
             DataFrame with added criteria score columns
         """
@@ -239,6 +563,94 @@ class ComplaintDataLoader:
         
         df = self.complaints_df.copy()
         
+        if not vectorized:
+            return self._enrich_scalar(df, as_of)
+        
+        return self.enrich_frame(df, as_of)
+    
+    def enrich_frame(self, df: pd.DataFrame, as_of=None) -> pd.DataFrame:
+        """
+        Add vectorized criteria score columns to a DataFrame in place.
+        
+        Used directly for streamed chunks, which are already private copies.
+        
+        Args:
+            df: Complaint data (e.g. one chunk from iter_csv_chunks)
+            as_of: Reference time for urgency scoring (defaults to now)
+            
+        Returns:
+            The same DataFrame with added criteria score columns
+        """
+        if 'type' in df.columns and 'severity' in df.columns:
+            df['safety_score'] = self.calculate_safety_scores(df['type'], df['severity'])
+        
+        if 'affected_people' in df.columns:
+            df['impact_score'] = self.calculate_impact_scores(df['affected_people'])
+        
+        if 'created_at' in df.columns:
+            df['urgency_score'] = self.calculate_urgency_scores(df['created_at'], as_of=as_of)
+        
+        if 'estimated_cost' in df.columns and 'complexity' in df.columns:
+            df['resource_score'] = self.calculate_resource_scores(df['estimated_cost'], df['complexity'])
+        
+        if 'department' in df.columns and 'department_load' in df.columns:
+            df['capacity_score'] = self.calculate_capacity_scores(df['department_load'])
+        
+        return df
+    
+    def enrich_cluster_impact(self, df: pd.DataFrame, radius_m: float = CLUSTER_RADIUS_M,
+                              same_type: bool = True, index: Optional[SpatialGridIndex] = None) -> pd.DataFrame:
+        """
+        Make impact_score neighbourhood-aware, in place.
+        
+        Adjacent reports of one problem each affect few people but together
+        affect many. For every complaint, affected_people and complaints
+        within radius_m (itself included) are summed with a grid radius
+        search, and impact_score is rescored from the summed people using
+        IMPACT_BANDS. The single-complaint score is kept as local_impact_score.
+        
+        Args:
+            df: Enriched complaint data with latitude, longitude and
+                affected_people (complaints without coordinates keep their
+                own impact)
+            radius_m: Neighbourhood radius in meters
+            same_type: Only count complaints of the same type as neighbours
+            index: Prebuilt index over the rows of df (built if not given;
+                   must be grouped by type when same_type is set)
+            
+        Returns:
+            The same DataFrame with nearby_complaints, nearby_affected_people,
+            local_impact_score and the cluster-aware impact_score
+        """
+        if 'affected_people' not in df.columns:
+            raise ValueError("Missing column: affected_people")
+        if index is None:
+            index = SpatialGridIndex.from_frame(df, cell_m=radius_m / 2 if radius_m > 0 else DEFAULT_CELL_M,
+                                                group_column='type' if same_type else None)
+        elif index.n != len(df):
+            raise ValueError(f"Index covers {index.n} rows, DataFrame has {len(df)}")
+        
+        affected = pd.to_numeric(df['affected_people'], errors='coerce').to_numpy(dtype=float)
+        counts, nearby_affected, _ = index.neighbourhood_sums(np.nan_to_num(affected), radius_m)
+        
+        # Rows without coordinates are their own neighbourhood
+        df['nearby_complaints'] = np.where(index.valid, counts, 1).astype(np.int64)
+        df['nearby_affected_people'] = np.where(index.valid, nearby_affected, affected)
+        df['local_impact_score'] = self.calculate_impact_scores(df['affected_people'])
+        df['impact_score'] = self.calculate_impact_scores(df['nearby_affected_people'])
+        return df
+    
+    def _enrich_scalar(self, df: pd.DataFrame, as_of=None) -> pd.DataFrame:
+        """
+        Reference scoring path that calls the scalar methods once per row.
+        
+        Args:
+            df: Copy of the complaint data to enrich in place
+            as_of: Optional reference time for urgency scoring
+            
+        Returns:
+            DataFrame with added criteria score columns
+        """
         # Calculate scores for each criterion
         if 'type' in df.columns and 'severity' in df.columns:
             df['safety_score'] = df.apply(
@@ -250,7 +662,10 @@ class ComplaintDataLoader:
             df['impact_score'] = df['affected_people'].apply(self.calculate_impact_score)
         
         if 'created_at' in df.columns:
-            df['urgency_score'] = df['created_at'].apply(self.calculate_urgency_score)
+            reference = self.resolve_as_of(as_of)
+            df['urgency_score'] = df['created_at'].apply(
+                lambda created: self.calculate_urgency_score(created, as_of=reference)
+            )
         
         if 'estimated_cost' in df.columns and 'complexity' in df.columns:
             df['resource_score'] = df.apply(
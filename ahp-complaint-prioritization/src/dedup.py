@@ -0,0 +1,258 @@
+"""
+Duplicate Detection
+Near-linear grouping of repeated complaint reports
+
+Two complaints are duplicates when they share a type, lie within a radius of
+each other and have similar text. Instead of comparing every pair, each
+complaint gets a grid cell from its coordinates and a MinHash signature of its
+text shingles. Only complaints with the same type, neighbouring cells and a
+matching LSH band become candidate pairs; those are then checked exactly for
+distance and estimated Jaccard similarity and joined into groups.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from typing import Sequence, Tuple
+from spatial import haversine_m
+
+
+METERS_PER_DEGREE = 111_320.0
+
+# Prime modulus of the MinHash hash family (shingle ids stay below it)
+MINHASH_PRIME = (1 << 31) - 1
+
+# Characters kept in shingles (anything else becomes a space) and the
+# number of characters unpacked per block of texts
+SHINGLE_ALPHABET = ' 0123456789abcdefghijklmnopqrstuvwxyz'
+SHINGLE_BLOCK_CHARS = 4_000_000
+
+# Cell offsets probed from each cell; the mirrored offsets are covered from the other side
+FORWARD_OFFSETS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+
+def shingle_codes(texts: pd.Series, size: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Character shingles of normalized text, packed into integers.
+    
+    Text is lower-cased and reduced to letters, digits and single spaces,
+    so each character fits in 6 bits and a shingle of up to 10 characters
+    is one int64. Texts are handled in row blocks of bounded width.
+    
+    Args:
+        texts: Series of strings (missing values give no shingles)
+        size: Shingle length in characters (1-10); shorter texts give one shingle
+    
+    Returns:
+        Tuple of (shingle codes of all texts in row order, shingles per text)
+    """
+    if not 1 <= size <= 10:
+        raise ValueError(f"Shingle size must be between 1 and 10, got {size}")
+    
+    normalized = texts.fillna('').astype(str).str.lower().str.replace(r'[^0-9a-z]+', ' ', regex=True).str.strip()
+    lengths = normalized.str.len().to_numpy(dtype=np.int64)
+    counts = np.where(lengths > 0, np.maximum(lengths - size + 1, 1), 0)
+    
+    symbols = np.zeros(128, dtype=np.int64)
+    symbols[np.frombuffer(SHINGLE_ALPHABET.encode(), dtype=np.uint8)] = np.arange(1, len(SHINGLE_ALPHABET) + 1)
+    
+    codes = []
+    step = max(1, SHINGLE_BLOCK_CHARS // max(int(lengths.max(initial=0)), size))
+    for start in range(0, len(normalized), step):
+        block = normalized.iloc[start:start + step].to_numpy(dtype=str)
+        width = block.dtype.itemsize // 4
+        chars = block.view(np.uint32).reshape(len(block), width) if width else np.zeros((len(block), 0), np.uint32)
+        chars = symbols[np.pad(chars, ((0, 0), (0, max(size - width, 0))))]
+        
+        windows = chars.shape[1] - size + 1
+        packed = np.zeros((len(block), windows), dtype=np.int64)
+        for offset in range(size):
+            packed = (packed << 6) | chars[:, offset:offset + windows]
+        codes.append(packed[np.arange(windows) < counts[start:start + step, np.newaxis]])
+    
+    return np.concatenate(codes) if codes else np.empty(0, dtype=np.int64), counts
+
+
+def minhash_signatures(codes: np.ndarray, counts: np.ndarray, num_perm: int = 64, seed: int = 0,
+                       block: int = 16) -> np.ndarray:
+    """
+    MinHash signatures of shingle sets.
+    
+    Shingles are numbered with one factorize call, each distinct shingle is
+    hashed with (a * x + b) mod p for num_perm random (a, b), and the
+    hashes are gathered per set a few functions at a time so memory stays
+    at O(total shingles * block). Repeated shingles within a set do not
+    change its minimum.
+    
+    Args:
+        codes: Shingles of all sets, each set one contiguous run
+        counts: Number of shingles per set
+        num_perm: Number of hash functions (signature length)
+        seed: Random seed of the hash family
+        block: Hash functions evaluated per pass
+    
+    Returns:
+        int32 array of shape (len(counts), num_perm); empty sets get the
+        maximum value in every position
+    """
+    ids, unique = pd.factorize(codes)
+    unique_ids = np.arange(len(unique), dtype=np.int64)[:, np.newaxis]
+    
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MINHASH_PRIME, num_perm, dtype=np.int64)
+    b = rng.integers(0, MINHASH_PRIME, num_perm, dtype=np.int64)
+    
+    signatures = np.full((len(counts), num_perm), MINHASH_PRIME, dtype=np.int32)
+    filled = np.flatnonzero(counts > 0)
+    if ids.size == 0:
+        return signatures
+    
+    starts = np.concatenate([[0], np.cumsum(counts[filled])[:-1]])
+    for first in range(0, num_perm, block):
+        cols = slice(first, first + block)
+        hashed = ((unique_ids * a[cols] + b[cols]) % MINHASH_PRIME).astype(np.int32)
+        signatures[filled, cols] = np.minimum.reduceat(hashed[ids], starts, axis=0)
+    
+    return signatures
+
+
+def band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """
+    One hash per LSH band of each signature.
+    
+    Args:
+        signatures: MinHash signatures of shape (n, num_perm)
+        bands: Number of bands (must divide num_perm)
+    
+    Returns:
+        uint64 array of shape (n, bands)
+    """
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"{bands} bands do not divide {num_perm} MinHash values")
+    
+    rows = signatures.reshape(n, bands, num_perm // bands).astype(np.uint64)
+    keys = np.zeros((n, bands), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for column in range(rows.shape[2]):
+            keys = keys * np.uint64(1_000_003) + rows[:, :, column]
+    return keys
+
+
+def candidate_pairs(groups: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray,
+                    keys: np.ndarray, radius_m: float) -> np.ndarray:
+    """
+    Pairs sharing a group and an LSH band key in the same or a neighbouring grid cell.
+    
+    Cells are at least radius_m wide, so any two points within radius_m of
+    each other fall into the same or adjacent cells.
+    
+    Args:
+        groups: Integer blocking code per row (e.g. factorized type); -1 is skipped
+        latitudes: Latitudes in degrees
+        longitudes: Longitudes in degrees
+        keys: LSH band keys of shape (n, bands)
+        radius_m: Match radius in meters
+    
+    Returns:
+        Array of shape (pairs, 2) of row positions with first < second
+    """
+    valid = np.flatnonzero((groups >= 0) & ~np.isnan(latitudes) & ~np.isnan(longitudes))
+    if valid.size < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    
+    lat, lon = latitudes[valid], longitudes[valid]
+    cos_lat = max(np.cos(np.radians(np.abs(lat).max())), 0.01)
+    cell_y = np.floor(lat * METERS_PER_DEGREE / radius_m).astype(np.int64)
+    cell_x = np.floor(lon * METERS_PER_DEGREE * cos_lat / radius_m).astype(np.int64)
+    
+    # Band key, band number and group hashed into one key; a collision only
+    # adds a candidate, which is verified afterwards
+    bands = keys.shape[1]
+    rows = np.repeat(np.arange(valid.size), bands)
+    band = np.tile(np.arange(bands, dtype=np.uint64), valid.size)
+    with np.errstate(over='ignore'):
+        base = ((keys[valid].ravel() * np.uint64(31) + band) * np.uint64(1_000_003)
+                + np.repeat(groups[valid], bands).astype(np.uint64))
+    
+    # Band keys held by a single complaint anywhere cannot pair up
+    shared = pd.Series(base).duplicated(keep=False).to_numpy()
+    rows = rows[shared]
+    base_codes = pd.factorize(base[shared])[0].astype(np.int64)
+    
+    # Exact join code of (band key, cell), with a margin of one cell, so a
+    # neighbouring cell's code is the home code plus a constant shift
+    span_x = int(cell_x.max() - cell_x.min()) + 3
+    span_y = int(cell_y.max() - cell_y.min()) + 3
+    home = (base_codes * span_x + (cell_x[rows] - cell_x.min() + 1)) * span_y + (cell_y[rows] - cell_y.min() + 1)
+    order = np.argsort(home, kind='stable')
+    home = home[order]
+    
+    firsts, seconds = [], []
+    for dx, dy in FORWARD_OFFSETS:
+        # Shifted codes stay sorted, which keeps the binary searches cache friendly
+        probe = home + (dx * span_y + dy)
+        low = np.searchsorted(home, probe, side='left')
+        counts = np.searchsorted(home, probe, side='right') - low
+        hits = np.flatnonzero(counts)
+        
+        # Expand each probe's run of equal home codes into pairs
+        counts = counts[hits]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        firsts.append(rows[order[np.repeat(low[hits], counts) + offsets]])
+        seconds.append(np.repeat(rows[order[hits]], counts))
+    
+    pairs = valid[np.column_stack([np.concatenate(firsts), np.concatenate(seconds)])]
+    pairs = np.sort(pairs[pairs[:, 0] != pairs[:, 1]], axis=1)
+    
+    # The same pair can match in several bands and offsets
+    codes = np.unique(pairs[:, 0] * len(groups) + pairs[:, 1])
+    return np.column_stack([codes // len(groups), codes % len(groups)])
+
+
+def duplicate_groups(df: pd.DataFrame, radius_m: float, similarity: float,
+                     text_columns: Sequence[str] = ('title',), shingle_size: int = 3,
+                     num_perm: int = 64, bands: int = 16, seed: int = 0) -> np.ndarray:
+    """
+    Group label of every complaint; duplicates share a label.
+    
+    Args:
+        df: Complaints with type, latitude, longitude and the text columns
+        radius_m: Maximum distance between duplicates in meters
+        similarity: Minimum estimated Jaccard similarity of the text shingles
+        text_columns: Columns whose joined text is compared
+        shingle_size: Shingle length in characters
+        num_perm: MinHash signature length
+        bands: LSH bands (more bands find less similar candidates)
+        seed: Random seed of the MinHash hash family
+    
+    Returns:
+        Integer array of group labels, numbered in order of first appearance
+    """
+    n = len(df)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    columns = [df[column].fillna('').astype(str) for column in text_columns]
+    texts = columns[0].str.cat(columns[1:], sep=' ') if len(columns) > 1 else columns[0]
+    signatures = minhash_signatures(*shingle_codes(texts, shingle_size), num_perm, seed)
+    has_text = signatures[:, 0] < MINHASH_PRIME
+    
+    groups, _ = pd.factorize(df['type'].astype(str).str.lower().where(df['type'].notna()))
+    groups = np.where(has_text, groups, -1)
+    latitudes = pd.to_numeric(df['latitude'], errors='coerce').to_numpy(dtype=float)
+    longitudes = pd.to_numeric(df['longitude'], errors='coerce').to_numpy(dtype=float)
+    
+    pairs = candidate_pairs(groups, latitudes, longitudes, band_keys(signatures, bands), radius_m)
+    first, second = pairs[:, 0], pairs[:, 1]
+    
+    same_group = groups[first] == groups[second]
+    near = haversine_m(latitudes[first], longitudes[first], latitudes[second], longitudes[second]) <= radius_m
+    similar = (signatures[first] == signatures[second]).mean(axis=1) >= similarity
+    keep = same_group & near & similar
+    first, second = first[keep], second[keep]
+    
+    graph = coo_matrix((np.ones(first.size, dtype=np.int8), (first, second)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    return pd.factorize(labels)[0]
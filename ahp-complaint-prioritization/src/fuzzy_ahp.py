@@ -0,0 +1,194 @@
+"""
+Fuzzy AHP
+Pairwise judgments as triangular fuzzy numbers (Buckley's geometric mean method)
+
+A triangular fuzzy number (TFN) is stored as the last axis (l, m, u) of a
+NumPy array, so a comparison matrix has shape (n, n, 3) and a stack of them
+(k, n, n, 3). Fuzzy weights are computed for the whole stack at once and
+defuzzified into crisp weights that drop into the usual scoring path.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Union
+from ahp_core import AHPCore
+
+
+DEFUZZIFY_METHODS = ('centroid', 'graded_mean')
+
+TFN = Tuple[float, float, float]
+
+
+def crisp_to_tfn(matrices: np.ndarray, spread: float = 1.0) -> np.ndarray:
+    """
+    Fuzzify crisp Saaty-scale comparison matrices.
+    
+    A judgment x >= 1 becomes (x - spread, x, x + spread) kept within 1..9,
+    equal importance stays (1, 1, 1), and judgments below 1 are the
+    reciprocal TFN (1/u, 1/m, 1/l) of their inverse.
+    
+    Args:
+        matrices: Array of shape (..., n, n) of reciprocal comparison matrices
+        spread: Half-width of each TFN on the Saaty scale
+    
+    Returns:
+        Array of shape (..., n, n, 3)
+    """
+    matrices = np.asarray(matrices, dtype=float)
+    strength = np.where(matrices >= 1, matrices, 1.0 / matrices)
+    
+    fuzzy = np.stack([np.maximum(strength - spread, 1.0), strength,
+                      np.minimum(strength + spread, 9.0)], axis=-1)
+    fuzzy[np.isclose(strength, 1.0)] = 1.0
+    
+    reciprocal = 1.0 / fuzzy[..., ::-1]
+    return np.where((matrices < 1)[..., np.newaxis], reciprocal, fuzzy)
+
+
+def fuzzy_weights_batch(fuzzy_matrices: np.ndarray) -> np.ndarray:
+    """
+    Fuzzy weights of a stack of TFN comparison matrices (Buckley, 1985).
+    
+    Each row's fuzzy geometric mean r_i is divided by the fuzzy sum of all
+    r, which for TFNs pairs the lower bound with the upper sum and vice versa.
+    
+    Args:
+        fuzzy_matrices: Array of shape (k, n, n, 3)
+    
+    Returns:
+        Array of shape (k, n, 3) of fuzzy weights
+    """
+    fuzzy_matrices = np.asarray(fuzzy_matrices, dtype=float)
+    if fuzzy_matrices.ndim != 4 or fuzzy_matrices.shape[-1] != 3:
+        raise ValueError(f"Expected an array of shape (k, n, n, 3), got {fuzzy_matrices.shape}")
+    
+    # Row geometric means of l, m and u, in log space
+    row_means = np.exp(np.mean(np.log(fuzzy_matrices), axis=2))
+    totals = row_means.sum(axis=1, keepdims=True)
+    
+    return row_means / totals[..., ::-1]
+
+
+def defuzzify(fuzzy_numbers: np.ndarray, method: str = 'centroid') -> np.ndarray:
+    """
+    Crisp values of TFNs.
+    
+    Args:
+        fuzzy_numbers: Array of shape (..., 3)
+        method: 'centroid' ((l + m + u) / 3) or 'graded_mean' ((l + 4m + u) / 6)
+    
+    Returns:
+        Array of shape (...)
+    """
+    if method not in DEFUZZIFY_METHODS:
+        raise ValueError(f"Unknown defuzzification method '{method}'. Use one of {DEFUZZIFY_METHODS}")
+    
+    if method == 'centroid':
+        return fuzzy_numbers.mean(axis=-1)
+    return (fuzzy_numbers[..., 0] + 4 * fuzzy_numbers[..., 1] + fuzzy_numbers[..., 2]) / 6
+
+
+def calculate_weights_batch(fuzzy_matrices: np.ndarray, method: str = 'centroid') -> np.ndarray:
+    """
+    Defuzzified, normalized weights for a stack of TFN comparison matrices.
+    
+    Args:
+        fuzzy_matrices: Array of shape (k, n, n, 3)
+        method: Defuzzification method (see defuzzify)
+    
+    Returns:
+        Array of shape (k, n) of crisp weights summing to 1
+    """
+    crisp = defuzzify(fuzzy_weights_batch(fuzzy_matrices), method)
+    return crisp / crisp.sum(axis=1, keepdims=True)
+
+
+class FuzzyAHP:
+    """
+    Fuzzy AHP for a single set of criteria.
+    """
+    
+    def __init__(self, criteria: List[str]):
+        """
+        Initialize Fuzzy AHP with criteria.
+        
+        Args:
+            criteria: List of criteria names
+        """
+        self.criteria = criteria
+        self.n_criteria = len(criteria)
+        self.fuzzy_matrix = None
+        self.fuzzy_weights = None
+        self.weights = None
+    
+    def create_fuzzy_matrix(self, pairwise_values: Dict[Tuple[str, str], Union[float, TFN]],
+                            spread: float = 1.0) -> np.ndarray:
+        """
+        Create the TFN comparison matrix.
+        
+        Args:
+            pairwise_values: Dictionary with (criterion1, criterion2) as key and
+                             either a crisp value (1-9 scale, fuzzified with
+                             `spread`) or an explicit (l, m, u) tuple
+            spread: Half-width for crisp values
+        
+        Returns:
+            n x n x 3 fuzzy comparison matrix
+        """
+        crisp = {key: value for key, value in pairwise_values.items() if np.ndim(value) == 0}
+        ahp = AHPCore(self.criteria)
+        matrix = crisp_to_tfn(ahp.create_comparison_matrix(crisp), spread)
+        
+        index = {criterion: i for i, criterion in enumerate(self.criteria)}
+        for (first, second), value in pairwise_values.items():
+            if np.ndim(value) == 0:
+                continue
+            
+            tfn = np.asarray(value, dtype=float)
+            if tfn.shape != (3,) or not (0 < tfn[0] <= tfn[1] <= tfn[2]):
+                raise ValueError(f"Invalid TFN for {first} vs {second}: {value}, expected 0 < l <= m <= u")
+            
+            i, j = index[first], index[second]
+            matrix[i, j] = tfn
+            matrix[j, i] = 1.0 / tfn[::-1]
+        
+        self.fuzzy_matrix = matrix
+        return matrix
+    
+    def calculate_weights(self, method: str = 'centroid') -> np.ndarray:
+        """
+        Calculate fuzzy weights and their defuzzified, normalized values.
+        
+        Args:
+            method: Defuzzification method (see defuzzify)
+        
+        Returns:
+            Crisp weight vector summing to 1
+        """
+        if self.fuzzy_matrix is None:
+            raise ValueError("Fuzzy matrix not initialized. Call create_fuzzy_matrix first.")
+        
+        self.fuzzy_weights = fuzzy_weights_batch(self.fuzzy_matrix[np.newaxis])[0]
+        crisp = defuzzify(self.fuzzy_weights, method)
+        self.weights = crisp / crisp.sum()
+        return self.weights
+    
+    def to_ahp(self) -> AHPCore:
+        """
+        AHP model carrying the fuzzy weights, for the usual scoring path.
+        
+        The comparison matrix is the modal (m) matrix, and the consistency
+        ratio is that of the modal judgments.
+        
+        Returns:
+            AHPCore instance with matrix, weights and consistency ratio set
+        """
+        if self.weights is None:
+            self.calculate_weights()
+        
+        ahp = AHPCore(self.criteria)
+        ahp.comparison_matrix = self.fuzzy_matrix[..., 1].copy()
+        _, lambda_max, _ = AHPCore.calculate_weights_batch(ahp.comparison_matrix[np.newaxis])
+        ahp.lambda_max = float(lambda_max[0])
+        ahp.weights = self.weights.copy()
+        ahp.calculate_consistency_ratio()
+        return ahp
@@ -0,0 +1,255 @@
+"""
+Geofencing
+Point-in-polygon assignment of complaints to sectors and jurisdictions
+
+Polygons are read from a GeoJSON FeatureCollection. Their bounding boxes are
+packed into an R-tree with Sort-Tile-Recursive (STR) bulk loading, and all
+points descend the tree together, one level at a time, so each point is only
+tested against the few polygons whose boxes contain it. Those candidates are
+then checked with an even-odd ray-casting test, vectorized over points and
+polygon edges in bounded blocks.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+# Children per R-tree node
+NODE_CAPACITY = 16
+
+# Maximum number of point-edge tests evaluated at once
+EDGE_BLOCK = 1 << 22
+
+# Feature properties copied to complaint columns by default
+DEFAULT_PROPERTY_COLUMNS = {'name': 'location_name', 'department': 'department'}
+
+
+def _polygon_rings(geometry: Dict) -> List[np.ndarray]:
+    """All rings (outer boundaries and holes) of a Polygon or MultiPolygon as (k, 2) lon/lat arrays."""
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        raise ValueError(f"Unsupported geometry type '{geometry['type']}' (expected Polygon or MultiPolygon)")
+    
+    return [np.asarray(ring, dtype=float)[:, :2] for polygon in polygons for ring in polygon if len(ring) >= 3]
+
+
+def str_pack(boxes: np.ndarray, capacity: int = NODE_CAPACITY) -> np.ndarray:
+    """
+    Order boxes for Sort-Tile-Recursive packing.
+    
+    Boxes are sorted by center x into vertical slices of about
+    sqrt(n / capacity) nodes each, then by center y within each slice, so
+    every run of `capacity` boxes in the returned order forms a compact node.
+    
+    Args:
+        boxes: Array of shape (n, 4) with min_x, min_y, max_x, max_y
+        capacity: Boxes per node
+    
+    Returns:
+        Permutation of box positions
+    """
+    n = len(boxes)
+    nodes = -(-n // capacity)
+    slice_size = capacity * -(-nodes // max(int(np.ceil(np.sqrt(nodes))), 1))
+    
+    center_x = boxes[:, 0] + boxes[:, 2]
+    center_y = boxes[:, 1] + boxes[:, 3]
+    by_x = np.argsort(center_x, kind='stable')
+    slices = np.empty(n, dtype=np.int64)
+    slices[by_x] = np.arange(n) // max(slice_size, 1)
+    
+    return np.lexsort((center_y, slices))
+
+
+class Geofence:
+    """
+    Polygon lookup for coordinates, backed by an STR-packed R-tree.
+    """
+    
+    def __init__(self, features: List[Dict], capacity: int = NODE_CAPACITY):
+        """
+        Index GeoJSON features.
+        
+        Args:
+            features: GeoJSON Feature dicts with Polygon or MultiPolygon
+                      geometries ([longitude, latitude] coordinates)
+            capacity: Children per R-tree node
+        """
+        if capacity < 2:
+            raise ValueError(f"Node capacity must be at least 2, got {capacity}")
+        
+        rings = [_polygon_rings(feature.get('geometry')) for feature in features]
+        self.properties = pd.DataFrame([feature.get('properties') or {} for feature in features],
+                                       index=pd.RangeIndex(len(features)))
+        self.capacity = capacity
+        
+        # Edges of every feature as (x1, y1, x2, y2) rows, contiguous per feature
+        edges = [np.concatenate([np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in feature_rings])
+                 if feature_rings else np.empty((0, 4)) for feature_rings in rings]
+        self._edge_starts = np.concatenate([[0], np.cumsum([len(e) for e in edges])]).astype(np.int64)
+        self._edges = np.concatenate(edges) if edges else np.empty((0, 4))
+        
+        boxes = np.array([[e[:, [0, 2]].min(), e[:, [1, 3]].min(), e[:, [0, 2]].max(), e[:, [1, 3]].max()]
+                          if len(e) else [np.inf, np.inf, -np.inf, -np.inf] for e in edges]).reshape(-1, 4)
+        self.bounds = boxes
+        
+        # Leaf entries are the features in packed order; each level above
+        # holds node boxes and the (start, count) run of its children below
+        self._leaf_order = str_pack(boxes, capacity)
+        self._leaf_boxes = boxes[self._leaf_order]
+        self._levels = []
+        children = self._leaf_boxes
+        while len(children):
+            starts = np.arange(0, len(children), capacity)
+            counts = np.minimum(capacity, len(children) - starts)
+            nodes = np.column_stack([np.minimum.reduceat(children[:, 0], starts),
+                                     np.minimum.reduceat(children[:, 1], starts),
+                                     np.maximum.reduceat(children[:, 2], starts),
+                                     np.maximum.reduceat(children[:, 3], starts)])
+            packed = str_pack(nodes, capacity)
+            self._levels.append((nodes[packed], starts[packed], counts[packed]))
+            if len(nodes) == 1:
+                break
+            children = nodes[packed]
+    
+    @staticmethod
+    def _contains(boxes: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Whether each point lies in its box (boundaries included)."""
+        return (boxes[:, 0] <= x) & (x <= boxes[:, 2]) & (boxes[:, 1] <= y) & (y <= boxes[:, 3])
+    
+    def candidates(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pairs of points and features whose bounding box contains the point.
+        
+        Args:
+            x: Point longitudes
+            y: Point latitudes
+        
+        Returns:
+            Tuple of (point positions, feature positions) arrays
+        """
+        if not self._levels:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        points = np.arange(len(x))
+        nodes = np.zeros(len(x), dtype=np.int64)
+        
+        for boxes, starts, counts in reversed(self._levels):
+            keep = self._contains(boxes[nodes], x[points], y[points])
+            points, nodes = points[keep], nodes[keep]
+            
+            # Descend into every child of the remaining nodes
+            runs = counts[nodes]
+            points = np.repeat(points, runs)
+            nodes = np.repeat(starts[nodes] - np.cumsum(runs) + runs, runs) + np.arange(runs.sum())
+        
+        keep = self._contains(self._leaf_boxes[nodes], x[points], y[points])
+        return points[keep], self._leaf_order[nodes[keep]]
+    
+    def locate(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Feature containing each point.
+        
+        Points are tested against the edges of every candidate feature with
+        the even-odd rule, so holes and multi-part polygons are handled.
+        Where features overlap, the earliest feature wins.
+        
+        Args:
+            latitudes: Point latitudes in degrees (NaN = no location)
+            longitudes: Point longitudes in degrees (NaN = no location)
+        
+        Returns:
+            Array of feature positions (-1 outside every feature)
+        """
+        x = np.asarray(longitudes, dtype=float)
+        y = np.asarray(latitudes, dtype=float)
+        points, features = self.candidates(x, y)
+        
+        located = np.full(len(x), len(self.bounds), dtype=np.int64)
+        order = np.argsort(features, kind='stable')
+        points, features = points[order], features[order]
+        bounds = np.flatnonzero(np.diff(features, prepend=-1, append=len(self.bounds) + 1))
+        
+        for begin, end in zip(bounds[:-1], bounds[1:]):
+            feature = features[begin]
+            x1, y1, x2, y2 = self._edges[self._edge_starts[feature]:self._edge_starts[feature + 1]].T
+            step = max(1, EDGE_BLOCK // max(len(x1), 1))
+            
+            for block in range(begin, end, step):
+                rows = points[block:min(block + step, end)]
+                px, py = x[rows, np.newaxis], y[rows, np.newaxis]
+                
+                # Count edges crossed by a ray from the point towards +x
+                spans = (y1 > py) != (y2 > py)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    crossing = spans & (px < x1 + (py - y1) * (x2 - x1) / (y2 - y1))
+                inside = rows[crossing.sum(axis=1) % 2 == 1]
+                located[inside] = np.minimum(located[inside], feature)
+        
+        return np.where(located < len(self.bounds), located, -1)
+    
+    def locate_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Feature containing each row's latitude and longitude.
+        
+        Args:
+            df: DataFrame with latitude and longitude columns
+        
+        Returns:
+            Array of feature positions (-1 outside every feature)
+        """
+        missing_cols = [col for col in ['latitude', 'longitude'] if col not in df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing coordinate columns: {missing_cols}")
+        
+        return self.locate(pd.to_numeric(df['latitude'], errors='coerce').to_numpy(dtype=float),
+                           pd.to_numeric(df['longitude'], errors='coerce').to_numpy(dtype=float))
+    
+    @classmethod
+    def from_geojson(cls, filepath: str, capacity: int = NODE_CAPACITY) -> 'Geofence':
+        """
+        Load polygons from a GeoJSON FeatureCollection.
+        
+        Args:
+            filepath: Path to the GeoJSON file
+            capacity: Children per R-tree node
+        
+        Returns:
+            Geofence instance
+        """
+        with open(Path(filepath), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if data.get('type') == 'FeatureCollection':
+            features = data.get('features') or []
+        elif data.get('type') == 'Feature':
+            features = [data]
+        else:
+            raise ValueError(f"Expected a GeoJSON FeatureCollection in {filepath}")
+        return cls(features, capacity)
+
+
+if __name__ == "__main__":
+    # Example usage: two sectors, one with a park cut out of it
+    sectors = Geofence([
+        {'type': 'Feature', 'properties': {'name': 'F-6', 'department': 'Roads'},
+         'geometry': {'type': 'Polygon', 'coordinates': [
+             [[73.06, 33.72], [73.09, 33.72], [73.09, 33.74], [73.06, 33.74], [73.06, 33.72]],
+             [[73.07, 33.725], [73.08, 33.725], [73.08, 33.735], [73.07, 33.735], [73.07, 33.725]]]}},
+        {'type': 'Feature', 'properties': {'name': 'G-9', 'department': 'Water Supply'},
+         'geometry': {'type': 'Polygon', 'coordinates': [
+             [[73.02, 33.68], [73.05, 33.68], [73.05, 33.70], [73.02, 33.70], [73.02, 33.68]]]}},
+    ])
+    
+    points = pd.DataFrame({'latitude': [33.73, 33.722, 33.69, 33.60], 'longitude': [73.075, 73.065, 73.03, 73.0]})
+    located = sectors.locate_frame(points)
+    points['sector'] = [sectors.properties['name'][i] if i >= 0 else None for i in located]
+    print(points.to_string(index=False))
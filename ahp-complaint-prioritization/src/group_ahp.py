@@ -0,0 +1,233 @@
+"""
+Group AHP
+Aggregates pairwise comparisons from many evaluators into one set of criteria weights
+
+Evaluator judgments are stacked into an (evaluators x n x n) tensor so that
+weights, consistency ratios and both standard aggregations run as vectorized
+operations over all submissions at once:
+
+- AIJ (aggregation of individual judgments): element-wise weighted geometric
+  mean of the comparison matrices, then one eigenvector
+- AIP (aggregation of individual priorities): weighted geometric mean of each
+  evaluator's own priority vector
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from ahp_core import AHPCore
+
+
+class GroupAHP:
+    """
+    Group decision making over many evaluators' pairwise comparisons.
+    """
+    
+    AGGREGATION_METHODS = ('aij', 'aip')
+    INCONSISTENCY_POLICIES = ('keep', 'drop', 'downweight')
+    
+    def __init__(self, criteria: List[str]):
+        """
+        Initialize an empty group.
+        
+        Args:
+            criteria: List of criteria names
+        """
+        self.criteria = list(criteria)
+        self.n_criteria = len(criteria)
+        self._index = {criterion: i for i, criterion in enumerate(self.criteria)}
+        
+        self.evaluators = []
+        self._judgments = []
+        self._importance = []
+        
+        self.evaluator_summary = None
+        self._summary_method = None
+    
+    def add_evaluator(self, name: str, pairwise_comparisons: Dict[Tuple[str, str], float],
+                      importance: float = 1.0):
+        """
+        Add one evaluator's pairwise comparisons.
+        
+        Comparisons may be given in either orientation; (B, A) is stored as
+        the reciprocal of (A, B). Pairs that are not given default to 1, as in
+        AHPCore.create_comparison_matrix.
+        
+        Args:
+            name: Evaluator identifier
+            pairwise_comparisons: Dictionary of (criterion1, criterion2) to value (1-9 scale)
+            importance: Relative weight of this evaluator in the aggregation
+        """
+        if importance <= 0:
+            raise ValueError(f"Evaluator importance must be positive, got {importance}")
+        
+        matrix = np.ones((self.n_criteria, self.n_criteria))
+        for (first, second), value in pairwise_comparisons.items():
+            unknown = [c for c in (first, second) if c not in self._index]
+            if unknown:
+                raise ValueError(f"Unknown criteria for evaluator '{name}': {unknown}")
+            if value <= 0:
+                raise ValueError(f"Comparison values must be positive ({first} vs {second} = {value})")
+            
+            i, j = self._index[first], self._index[second]
+            matrix[i, j] = value
+            matrix[j, i] = 1.0 / value
+        
+        self.evaluators.append(name)
+        self._judgments.append(matrix[np.triu_indices(self.n_criteria, 1)])
+        self._importance.append(float(importance))
+        self.evaluator_summary = None
+    
+    def add_survey_responses(self, responses: pd.DataFrame, evaluator_col: str = 'evaluator',
+                             importance_col: Optional[str] = None):
+        """
+        Add many evaluators from a survey table in one step.
+        
+        Each row is one evaluator; comparison columns use the config's
+        "A vs B" naming. Missing answers default to 1.
+        
+        Args:
+            responses: DataFrame with one row per evaluator
+            evaluator_col: Column with evaluator identifiers
+            importance_col: Optional column with evaluator importance weights
+        """
+        upper_i, upper_j = np.triu_indices(self.n_criteria, 1)
+        position = {(i, j): k for k, (i, j) in enumerate(zip(upper_i, upper_j))}
+        
+        judgments = np.ones((len(responses), len(upper_i)))
+        for col in responses.columns:
+            if col in (evaluator_col, importance_col):
+                continue
+            
+            parts = [part.strip() for part in col.split(' vs ')]
+            if len(parts) != 2 or any(part not in self._index for part in parts):
+                raise ValueError(f"Invalid comparison column '{col}', expected 'A vs B' with known criteria")
+            
+            values = responses[col].fillna(1.0).to_numpy(dtype=float)
+            if (values <= 0).any():
+                raise ValueError(f"Comparison values must be positive in column '{col}'")
+            
+            i, j = self._index[parts[0]], self._index[parts[1]]
+            if i < j:
+                judgments[:, position[(i, j)]] = values
+            else:
+                judgments[:, position[(j, i)]] = 1.0 / values
+        
+        importance = (responses[importance_col].to_numpy(dtype=float) if importance_col
+                      else np.ones(len(responses)))
+        if (importance <= 0).any():
+            raise ValueError("Evaluator importance must be positive.")
+        
+        self.evaluators.extend(responses[evaluator_col].tolist())
+        self._judgments.extend(judgments)
+        self._importance.extend(importance.tolist())
+        self.evaluator_summary = None
+    
+    @property
+    def evaluator_matrices(self) -> np.ndarray:
+        """Stacked comparison matrices of shape (evaluators, n, n)."""
+        if not self._judgments:
+            raise ValueError("No evaluators added.")
+        
+        upper_i, upper_j = np.triu_indices(self.n_criteria, 1)
+        judgments = np.asarray(self._judgments)
+        
+        matrices = np.ones((len(judgments), self.n_criteria, self.n_criteria))
+        matrices[:, upper_i, upper_j] = judgments
+        matrices[:, upper_j, upper_i] = 1.0 / judgments
+        return matrices
+    
+    def evaluate(self, weight_method: str = 'eigen') -> pd.DataFrame:
+        """
+        Calculate every evaluator's weights and consistency ratio in one batch.
+        
+        Args:
+            weight_method: AHPCore weight derivation method
+        
+        Returns:
+            DataFrame indexed by evaluator with one weight column per
+            criterion, consistency_ratio and importance
+        """
+        weights, _, cr = AHPCore.calculate_weights_batch(self.evaluator_matrices, method=weight_method)
+        
+        summary = pd.DataFrame(weights, columns=self.criteria,
+                               index=pd.Index(self.evaluators, name='evaluator'))
+        summary['consistency_ratio'] = cr
+        summary['importance'] = self._importance
+        
+        self.evaluator_summary = summary
+        self._summary_method = weight_method
+        return summary
+    
+    def evaluator_weights(self, threshold: float = 0.1, policy: str = 'keep') -> np.ndarray:
+        """
+        Normalized evaluator weights after applying the inconsistency policy.
+        
+        Args:
+            threshold: CR at or above which an evaluator counts as inconsistent
+            policy: 'keep' ignores CR, 'drop' excludes inconsistent evaluators,
+                    'downweight' scales their importance by threshold / CR
+        
+        Returns:
+            Array of evaluator weights summing to 1
+        """
+        if policy not in self.INCONSISTENCY_POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'. Use one of {self.INCONSISTENCY_POLICIES}")
+        if self.evaluator_summary is None:
+            self.evaluate()
+        
+        importance = self.evaluator_summary['importance'].to_numpy(dtype=float)
+        cr = self.evaluator_summary['consistency_ratio'].to_numpy(dtype=float)
+        inconsistent = cr >= threshold
+        
+        if policy == 'drop':
+            importance = np.where(inconsistent, 0.0, importance)
+        elif policy == 'downweight':
+            with np.errstate(divide='ignore'):
+                importance = np.where(inconsistent, importance * threshold / cr, importance)
+        
+        if importance.sum() == 0:
+            raise ValueError(f"Every evaluator has CR >= {threshold}; nothing left to aggregate.")
+        
+        return importance / importance.sum()
+    
+    def aggregate(self, method: str = 'aij', threshold: float = 0.1, policy: str = 'keep',
+                  weight_method: str = 'eigen') -> AHPCore:
+        """
+        Aggregate all evaluators into a single AHP model.
+        
+        With 'aij' the group matrix is the weighted geometric mean of the
+        evaluator matrices (which keeps it reciprocal) and the weights are its
+        principal eigenvector. With 'aip' the weights are the normalized
+        weighted geometric mean of the evaluators' priority vectors; the group
+        matrix is still the AIJ matrix, so the reported CR describes the
+        combined judgments.
+        
+        Args:
+            method: 'aij' or 'aip'
+            threshold: CR at or above which an evaluator counts as inconsistent
+            policy: 'keep', 'drop' or 'downweight' (see evaluator_weights)
+            weight_method: AHPCore weight derivation method
+        
+        Returns:
+            AHPCore instance with matrix, weights and consistency ratio set
+        """
+        if method not in self.AGGREGATION_METHODS:
+            raise ValueError(f"Unknown aggregation method '{method}'. Use one of {self.AGGREGATION_METHODS}")
+        if self.evaluator_summary is None or self._summary_method != weight_method:
+            self.evaluate(weight_method)
+        
+        evaluator_weights = self.evaluator_weights(threshold, policy)
+        
+        ahp = AHPCore(self.criteria)
+        ahp.comparison_matrix = np.exp(np.einsum('k,kij->ij', evaluator_weights, np.log(self.evaluator_matrices)))
+        
+        if method == 'aij':
+            ahp.calculate_weights(method=weight_method)
+        else:
+            individual = self.evaluator_summary[self.criteria].to_numpy(dtype=float)
+            weights = np.exp(evaluator_weights @ np.log(individual))
+            ahp.weights = weights / weights.sum()
+        
+        ahp.calculate_consistency_ratio()
+        return ahp
@@ -0,0 +1,225 @@
+"""
+Hierarchical AHP
+Criteria with sub-criteria, each node weighting its own children
+
+Every node owns the pairwise comparisons between its children. Local weights
+are computed lazily and cached per node; changing one node's judgments only
+invalidates that node. Global leaf weights are the products of local weights
+along each root-to-leaf path, composed in a single traversal.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from ahp_core import AHPCore
+from config_loader import load_config, parse_pairwise_comparisons
+
+
+class HierarchyNode:
+    """
+    A criterion in an AHP hierarchy, with the comparisons between its children.
+    """
+    
+    def __init__(self, name: str, children: Optional[List['HierarchyNode']] = None,
+                 pairwise_comparisons: Optional[Dict[Tuple[str, str], float]] = None):
+        """
+        Initialize a node.
+        
+        Args:
+            name: Criterion name (unique within the hierarchy)
+            children: Optional sub-criteria nodes
+            pairwise_comparisons: Comparisons between the children (1-9 scale);
+                                  missing pairs count as equal importance
+        """
+        self.name = name
+        self.children = list(children or [])
+        self._comparisons = dict(pairwise_comparisons or {})
+        self._ahp = None
+    
+    @property
+    def is_leaf(self) -> bool:
+        """True if the node has no sub-criteria."""
+        return not self.children
+    
+    @property
+    def child_names(self) -> List[str]:
+        """Names of the children in weight order."""
+        return [child.name for child in self.children]
+    
+    def add_child(self, child: 'HierarchyNode'):
+        """
+        Add a sub-criterion, invalidating this node's cached weights.
+        
+        Args:
+            child: Node to add
+        """
+        self.children.append(child)
+        self._ahp = None
+    
+    def set_comparisons(self, pairwise_comparisons: Dict[Tuple[str, str], float]):
+        """
+        Replace the comparisons between the children, invalidating this node only.
+        
+        Args:
+            pairwise_comparisons: Comparisons between the children (1-9 scale)
+        """
+        self._comparisons = dict(pairwise_comparisons)
+        self._ahp = None
+    
+    @property
+    def ahp(self) -> AHPCore:
+        """AHP model of the children, built on first access and cached."""
+        if self._ahp is None:
+            unknown = {c for pair in self._comparisons for c in pair} - set(self.child_names)
+            if unknown:
+                raise ValueError(f"Unknown sub-criteria under '{self.name}': {sorted(unknown)}")
+            
+            ahp = AHPCore(self.child_names)
+            ahp.create_comparison_matrix(self._comparisons)
+            ahp.calculate_weights()
+            ahp.calculate_consistency_ratio()
+            self._ahp = ahp
+        return self._ahp
+    
+    @property
+    def local_weights(self) -> np.ndarray:
+        """Weights of the children relative to this node."""
+        if self.is_leaf:
+            return np.empty(0)
+        return self.ahp.weights
+
+
+class AHPHierarchy:
+    """
+    Tree of criteria and sub-criteria with global weight composition.
+    """
+    
+    def __init__(self, root: HierarchyNode):
+        """
+        Initialize the hierarchy.
+        
+        Args:
+            root: Goal node whose children are the top-level criteria
+        """
+        self.root = root
+        
+        names = [node.name for node in self.nodes()]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Criterion names must be unique in the hierarchy: {duplicates}")
+    
+    @classmethod
+    def from_config(cls, profile: str = 'default', config_path: Optional[str] = None,
+                    config: Optional[Dict] = None) -> 'AHPHierarchy':
+        """
+        Build a hierarchy from the configuration file.
+        
+        The top level uses the criteria and the named pairwise comparison
+        profile. The optional sub_criteria section maps a criterion to its
+        children and their "A vs B" comparisons, and may nest further.
+        
+        Args:
+            profile: Profile name under pairwise_comparisons
+            config_path: Path to JSON config (defaults to config/criteria_weights.json)
+            config: Already parsed configuration (skips reading config_path)
+        
+        Returns:
+            AHPHierarchy instance
+        """
+        config = config if config is not None else load_config(config_path)
+        profiles = config.get('pairwise_comparisons') or {}
+        if profile not in profiles:
+            raise ValueError(f"Unknown weight profile '{profile}'. Available: {list(profiles)}")
+        
+        sub_criteria = config.get('sub_criteria', {})
+        
+        def build(name: str) -> HierarchyNode:
+            spec = sub_criteria.get(name, {})
+            children = spec.get('children', [])
+            return HierarchyNode(name, [build(child) for child in children],
+                                 parse_pairwise_comparisons(spec.get('pairwise_comparisons', {}), children))
+        
+        criteria = config['criteria']['names']
+        root = HierarchyNode('Goal', [build(name) for name in criteria],
+                             parse_pairwise_comparisons(profiles[profile], criteria))
+        return cls(root)
+    
+    def nodes(self) -> List[HierarchyNode]:
+        """All nodes in depth-first order, root first."""
+        nodes, stack = [], [self.root]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(reversed(node.children))
+        return nodes
+    
+    def find(self, name: str) -> HierarchyNode:
+        """
+        Look up a node by name.
+        
+        Args:
+            name: Criterion name
+        
+        Returns:
+            Matching node
+        """
+        for node in self.nodes():
+            if node.name == name:
+                return node
+        raise KeyError(f"No criterion named '{name}' in the hierarchy")
+    
+    def global_weights(self) -> pd.Series:
+        """
+        Global weight of every leaf criterion.
+        
+        Returns:
+            Series of leaf name to global weight (sums to 1), in tree order
+        """
+        weights = {}
+        stack = [(self.root, 1.0)]
+        while stack:
+            node, weight = stack.pop()
+            if node.is_leaf:
+                weights[node.name] = weight
+                continue
+            stack.extend(reversed([(child, weight * local)
+                                   for child, local in zip(node.children, node.local_weights)]))
+        return pd.Series(weights, name='global_weight')
+    
+    def criterion_scores(self, leaf_scores: pd.DataFrame) -> pd.DataFrame:
+        """
+        Collapse leaf scores into scores for the top-level criteria.
+        
+        Each inner node's score is the weighted sum of its children's scores,
+        so the result can feed the usual criteria score columns.
+        
+        Args:
+            leaf_scores: DataFrame with one column per leaf criterion
+        
+        Returns:
+            DataFrame with one column per top-level criterion
+        """
+        def score(node: HierarchyNode) -> np.ndarray:
+            if node.is_leaf:
+                if node.name not in leaf_scores.columns:
+                    raise ValueError(f"Missing scores for leaf criterion '{node.name}'")
+                return leaf_scores[node.name].to_numpy(dtype=float)
+            return np.column_stack([score(child) for child in node.children]) @ node.local_weights
+        
+        return pd.DataFrame({child.name: score(child) for child in self.root.children},
+                            index=leaf_scores.index)
+    
+    def consistency_report(self) -> pd.DataFrame:
+        """
+        Consistency ratio of every node that has children.
+        
+        Returns:
+            DataFrame with node, n_children, consistency_ratio and is_consistent
+        """
+        rows = [{
+            'node': node.name,
+            'n_children': len(node.children),
+            'consistency_ratio': node.ahp.consistency_ratio,
+            'is_consistent': node.ahp.is_consistent()
+        } for node in self.nodes() if not node.is_leaf]
+        return pd.DataFrame(rows)
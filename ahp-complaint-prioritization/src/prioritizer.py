@@ -3,11 +3,29 @@ Complaint Prioritization Engine
 Applies AHP algorithm to complaint data for priority ranking
 """
 
+import heapq
+import pickle
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Optional
 from ahp_core import AHPCore
 from data_loader import ComplaintDataLoader
+from config_loader import (load_config, get_priority_percentiles, compile_profile,
+                           compile_profiles, parse_pairwise_comparisons, DEFAULT_CACHE_DIR)
+from quantile_sketch import KLLSketch
+from group_ahp import GroupAHP
+from hierarchy import AHPHierarchy
+from fuzzy_ahp import FuzzyAHP
+from rank_index import ScoreRankIndex
+
+
+# Scored state saved between incremental runs
+DEFAULT_STATE_PATH = Path(__file__).parent.parent / '.cache' / 'prioritizer_state.pkl'
+STATE_VERSION = 1
+
+# Department partition entries: priority order is ascending (negated score, state position)
+DEPARTMENT_MEMBER_DTYPE = np.dtype([('neg_score', 'f8'), ('position', 'i8')])
 
 
 class ComplaintPrioritizer:
@@ -24,17 +42,102 @@ class ComplaintPrioritizer:
         "Department Capacity"
     ]
     
-    def __init__(self, criteria: Optional[List[str]] = None):
+    # Score columns produced by ComplaintDataLoader, in criteria order
+    CRITERIA_COLUMNS = ['safety_score', 'impact_score', 'urgency_score',
+                        'resource_score', 'capacity_score']
+    
+    # Columns written by export_results
+    EXPORT_COLUMNS = ['id', 'title', 'type', 'department', 'status',
+                      'priority_score', 'priority_rank']
+    
+    # Built-in comparisons, used when config/criteria_weights.json is unavailable
+    DEFAULT_COMPARISONS = {
+        ("Public Safety Risk", "Scale of Impact"): 3,      # Safety moderately more important
+        ("Public Safety Risk", "Urgency Level"): 2,        # Safety slightly more important
+        ("Public Safety Risk", "Resource Requirements"): 5,  # Safety much more important
+        ("Public Safety Risk", "Department Capacity"): 4,   # Safety more important
+        ("Scale of Impact", "Urgency Level"): 1,           # Equal importance
+        ("Scale of Impact", "Resource Requirements"): 3,    # Impact moderately more important
+        ("Scale of Impact", "Department Capacity"): 2,      # Impact slightly more important
+        ("Urgency Level", "Resource Requirements"): 4,      # Urgency more important
+        ("Urgency Level", "Department Capacity"): 3,        # Urgency moderately more important
+        ("Resource Requirements", "Department Capacity"): 1 # Equal importance
+    }
+    
+    # Optional criterion added by add_hotspot_criterion (score from spatial.hotspot_scores)
+    HOTSPOT_CRITERION = "Spatial Hotspot"
+    HOTSPOT_COLUMN = 'hotspot_score'
+    
+    # Built-in judgments of the default criteria against the hotspot criterion
+    DEFAULT_HOTSPOT_COMPARISONS = {
+        ("Public Safety Risk", "Spatial Hotspot"): 3,      # Safety moderately more important
+        ("Scale of Impact", "Spatial Hotspot"): 2,         # Impact slightly more important
+        ("Urgency Level", "Spatial Hotspot"): 2,           # Urgency slightly more important
+        ("Resource Requirements", "Spatial Hotspot"): 1,   # Equal importance
+        ("Department Capacity", "Spatial Hotspot"): 1      # Equal importance
+    }
+    
+    # Lower percentile bound of each priority level, highest level first
+    # (mirrors priority_categories in config/criteria_weights.json)
+    DEFAULT_PRIORITY_PERCENTILES = {'critical': 75, 'high': 50, 'medium': 25, 'low': 0}
+    
+    def __init__(self, criteria: Optional[List[str]] = None,
+                 priority_percentiles: Optional[Dict[str, float]] = None):
         """
         Initialize prioritization engine.
         
         Args:
             criteria: List of criteria names (uses defaults if not provided)
+            priority_percentiles: Lower percentile bound per priority level
+                                  (uses defaults if not provided)
         """
         self.criteria = criteria or self.DEFAULT_CRITERIA
+        self.priority_percentiles = dict(priority_percentiles or self.DEFAULT_PRIORITY_PERCENTILES)
         self.ahp = AHPCore(self.criteria)
         self.data_loader = ComplaintDataLoader()
-        self.prioritized_complaints = None
+        self._scored_complaints = None
+        self._prioritized_complaints = None
+        self.top_complaints = None
+        self.stream_summary = None
+        self.profile_weights = None
+        self.profile_consistency = None
+        self.profile_results = None
+        self.hotspot_comparisons = None
+        self.hierarchy = None
+        self.rank_index = None
+        self.state_as_of = None
+        self._state_deleted = None
+        self._state_inserts = None
+        self._state_pending_ids = None
+        self._department_source = None
+        self._department_frame = None
+        self._department_slices = None
+        self._department_members = None
+    
+    @property
+    def prioritized_complaints(self) -> Optional[pd.DataFrame]:
+        """
+        All complaints ranked and sorted by priority.
+        
+        The full ranking is computed on first access after prioritize_complaints,
+        so callers that only need the top complaints never pay for the sort.
+        """
+        if self._prioritized_complaints is None and self.scored_complaints is not None:
+            result_df = self.scored_complaints.copy()
+            
+            # Rank complaints (1 = highest priority)
+            result_df['priority_rank'] = result_df['priority_score'].rank(ascending=False, method='dense')
+            
+            # Sort by priority (stable, so ties keep input order)
+            result_df = result_df.sort_values('priority_score', ascending=False, kind='mergesort')
+            
+            self._prioritized_complaints = result_df
+        
+        return self._prioritized_complaints
+    
+    @prioritized_complaints.setter
+    def prioritized_complaints(self, value: Optional[pd.DataFrame]):
+        self._prioritized_complaints = value
         
     def set_criteria_weights(self, pairwise_comparisons: Dict[Tuple[str, str], float]):
         """
@@ -46,130 +149,1030 @@ class ComplaintPrioritizer:
         self.ahp.create_comparison_matrix(pairwise_comparisons)
         self.ahp.calculate_weights()
         self.ahp.calculate_consistency_ratio()
+        self._report_consistency()
+    
+    def add_hotspot_criterion(self, pairwise_comparisons: Optional[Dict[Tuple[str, str], float]] = None):
+        """
+        Add the spatial hotspot score as an extra criterion.
+        
+        The current comparison matrix is kept and extended by one row and
+        column for the hotspot criterion, then weights are recomputed.
+        Complaints must afterwards carry a hotspot_score column, and weight
+        profiles loaded afterwards take the same hotspot judgments.
+        
+        Args:
+            pairwise_comparisons: Judgments of each current criterion against
+                                  the hotspot criterion, in either order
+                                  (uses DEFAULT_HOTSPOT_COMPARISONS if not provided)
+        """
+        if self.HOTSPOT_CRITERION in self.criteria:
+            raise ValueError("The hotspot criterion is already added.")
+        if self.ahp.comparison_matrix is None:
+            raise ValueError("Criteria weights not set. Call set_criteria_weights or load_default_weights first.")
+        
+        comparisons = pairwise_comparisons or self.DEFAULT_HOTSPOT_COMPARISONS
+        n = len(self.criteria)
+        matrix = np.ones((n + 1, n + 1))
+        matrix[:n, :n] = self.ahp.comparison_matrix
+        
+        for i, criterion in enumerate(self.criteria):
+            if (criterion, self.HOTSPOT_CRITERION) in comparisons:
+                value = comparisons[(criterion, self.HOTSPOT_CRITERION)]
+            elif (self.HOTSPOT_CRITERION, criterion) in comparisons:
+                value = 1.0 / comparisons[(self.HOTSPOT_CRITERION, criterion)]
+            else:
+                raise ValueError(f"Missing comparison of '{criterion}' with '{self.HOTSPOT_CRITERION}'")
+            matrix[i, n] = value
+            matrix[n, i] = 1.0 / value
+        
+        self.hotspot_comparisons = {(criterion, self.HOTSPOT_CRITERION): float(matrix[i, n])
+                                    for i, criterion in enumerate(self.criteria)}
+        self.criteria = [*self.criteria, self.HOTSPOT_CRITERION]
+        self.CRITERIA_COLUMNS = [*self.CRITERIA_COLUMNS, self.HOTSPOT_COLUMN]
+        self.ahp = AHPCore(self.criteria)
+        self.ahp.comparison_matrix = matrix
+        self.ahp.calculate_weights()
+        self.ahp.calculate_consistency_ratio()
+        self._report_consistency()
+    
+    def load_weights_from_config(self, profile: str = 'default', config_path: Optional[str] = None,
+                                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """
+        Set criteria weights from a pairwise comparison profile in the config.
+        
+        Compiled weights are cached on disk by profile content, so unchanged
+        profiles skip the eigen decomposition on later runs.
+        
+        Args:
+            profile: Profile name under pairwise_comparisons
+            config_path: Path to JSON config (defaults to config/criteria_weights.json)
+            cache_dir: Directory for cached weights (None disables caching)
+        """
+        profiles = load_config(config_path).get('pairwise_comparisons') or {}
+        if profile not in profiles:
+            raise ValueError(f"Unknown weight profile '{profile}'. Available: {list(profiles)}")
+        
+        self.ahp = compile_profile(profiles[profile], self.criteria, cache_dir)
+        self._report_consistency()
+    
+    def set_fuzzy_criteria_weights(self, pairwise_comparisons: Dict[Tuple[str, str], float],
+                                   spread: float = 1.0, defuzzify: str = 'centroid'):
+        """
+        Set criteria weights with fuzzy AHP (triangular fuzzy judgments).
+        
+        Scoring is unchanged; only the weights come from the defuzzified
+        fuzzy priorities.
+        
+        Args:
+            pairwise_comparisons: Crisp values (fuzzified with `spread`) or
+                                  explicit (l, m, u) tuples
+            spread: Half-width of each fuzzified judgment on the Saaty scale
+            defuzzify: 'centroid' or 'graded_mean'
+        """
+        fuzzy = FuzzyAHP(self.criteria)
+        fuzzy.create_fuzzy_matrix(pairwise_comparisons, spread=spread)
+        fuzzy.calculate_weights(method=defuzzify)
+        
+        self.ahp = fuzzy.to_ahp()
+        self._report_consistency()
+    
+    def load_fuzzy_weights(self, profile: str = 'default', spread: float = 1.0,
+                           config_path: Optional[str] = None):
+        """
+        Set fuzzy AHP criteria weights from a pairwise comparison profile in the config.
+        
+        Args:
+            profile: Profile name under pairwise_comparisons
+            spread: Half-width of each fuzzified judgment on the Saaty scale
+            config_path: Path to JSON config (defaults to config/criteria_weights.json)
+        """
+        profiles = load_config(config_path).get('pairwise_comparisons') or {}
+        if profile not in profiles:
+            raise ValueError(f"Unknown weight profile '{profile}'. Available: {list(profiles)}")
+        
+        self.set_fuzzy_criteria_weights(parse_pairwise_comparisons(profiles[profile], self.criteria), spread)
+    
+    def load_hierarchy(self, profile: str = 'default', config_path: Optional[str] = None) -> AHPHierarchy:
+        """
+        Load criteria and sub-criteria from the config as an AHP hierarchy.
         
+        The top-level criteria weights drive scoring as usual; the hierarchy
+        adds global weights for the sub-criteria.
+        
+        Args:
+            profile: Profile name under pairwise_comparisons for the top level
+            config_path: Path to JSON config (defaults to config/criteria_weights.json)
+        
+        Returns:
+            The loaded AHPHierarchy
+        """
+        hierarchy = AHPHierarchy.from_config(profile, config_path)
+        if hierarchy.root.child_names != self.criteria:
+            raise ValueError("Hierarchy top-level criteria do not match the prioritizer criteria.")
+        
+        self.hierarchy = hierarchy
+        self.ahp = hierarchy.root.ahp
+        self._report_consistency()
+        
+        for _, row in hierarchy.consistency_report().iloc[1:].iterrows():
+            if not row['is_consistent']:
+                print(f"WARNING: Inconsistent sub-criteria under '{row['node']}' "
+                      f"(CR = {row['consistency_ratio']:.4f})")
+        return hierarchy
+    
+    def set_group_weights(self, group: GroupAHP, method: str = 'aij', threshold: float = 0.1,
+                          policy: str = 'keep'):
+        """
+        Set criteria weights by aggregating many evaluators' comparisons.
+        
+        Args:
+            group: GroupAHP with every evaluator added (same criteria order)
+            method: 'aij' (aggregate judgments) or 'aip' (aggregate priorities)
+            threshold: CR at or above which an evaluator counts as inconsistent
+            policy: 'keep', 'drop' or 'downweight' inconsistent evaluators
+        """
+        if group.criteria != self.criteria:
+            raise ValueError("Group criteria do not match the prioritizer criteria.")
+        
+        self.ahp = group.aggregate(method=method, threshold=threshold, policy=policy)
+        
+        n_inconsistent = int((group.evaluator_summary['consistency_ratio'] >= threshold).sum())
+        print(f"[OK] Aggregated {len(group.evaluators)} evaluators ({method.upper()}, "
+              f"{n_inconsistent} with CR >= {threshold}, policy '{policy}')")
+        self._report_consistency()
+    
+    def repair_criteria_weights(self, threshold: float = 0.1, snap_to_scale: bool = True) -> List[Dict]:
+        """
+        Adjust inconsistent pairwise comparisons until CR is below the threshold.
+        
+        Args:
+            threshold: Target consistency ratio
+            snap_to_scale: Keep adjusted judgments on the Saaty scale
+        
+        Returns:
+            List of applied adjustments (see AHPCore.repair_consistency)
+        """
+        changes = self.ahp.repair_consistency(threshold=threshold, snap_to_scale=snap_to_scale, apply=True)
+        
+        for change in changes:
+            print(f"  Adjusted {change['criterion_i']} vs {change['criterion_j']}: "
+                  f"{change['old_value']:.3g} -> {change['new_value']:.3g}")
+        self._report_consistency()
+        return changes
+    
+    def _report_consistency(self):
+        """Print the consistency check result for the current weights."""
         # Validate consistency
         if not self.ahp.is_consistent():
             print(f"WARNING: Inconsistent comparisons detected (CR = {self.ahp.consistency_ratio:.4f})")
             print("Please review your pairwise comparisons.")
+            
+            if self.ahp.comparison_matrix is not None:
+                changes = self.ahp.repair_consistency()
+                if changes:
+                    print("Suggested adjustments:")
+                    for change in changes:
+                        print(f"  {change['criterion_i']} vs {change['criterion_j']}: "
+                              f"{change['old_value']:.3g} -> {change['new_value']:.3g} "
+                              f"(CR = {change['consistency_ratio']:.4f})")
         else:
             print(f"[OK] Consistent comparisons (CR = {self.ahp.consistency_ratio:.4f})")
     
+    def load_priority_categories(self, config_path: Optional[str] = None):
+        """
+        Load priority level thresholds from the configuration file.
+        
+        Args:
+            config_path: Path to JSON config (defaults to config/criteria_weights.json)
+        """
+        self.priority_percentiles = get_priority_percentiles(load_config(config_path))
+    
     def load_default_weights(self):
         """
         Load default pairwise comparisons based on typical municipal priorities.
-        """
-        # Default comparisons favoring public safety and urgency
-        default_comparisons = {
-            ("Public Safety Risk", "Scale of Impact"): 3,      # Safety moderately more important
-            ("Public Safety Risk", "Urgency Level"): 2,        # Safety slightly more important
-            ("Public Safety Risk", "Resource Requirements"): 5,  # Safety much more important
-            ("Public Safety Risk", "Department Capacity"): 4,   # Safety more important
-            ("Scale of Impact", "Urgency Level"): 1,           # Equal importance
-            ("Scale of Impact", "Resource Requirements"): 3,    # Impact moderately more important
-            ("Scale of Impact", "Department Capacity"): 2,      # Impact slightly more important
-            ("Urgency Level", "Resource Requirements"): 4,      # Urgency more important
-            ("Urgency Level", "Department Capacity"): 3,        # Urgency moderately more important
-            ("Resource Requirements", "Department Capacity"): 1 # Equal importance
-        }
         
-        self.set_criteria_weights(default_comparisons)
+        Uses the 'default' profile from config/criteria_weights.json, falling
+        back to the built-in DEFAULT_COMPARISONS if the config is unavailable.
+        """
+        try:
+            self.load_weights_from_config('default')
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Using built-in default weights: {e}")
+            self.set_criteria_weights(self.DEFAULT_COMPARISONS)
     
-    def prioritize_complaints(self, complaints_df: pd.DataFrame) -> pd.DataFrame:
+    def prioritize_complaints(self, complaints_df: pd.DataFrame,
+                              top_k: Optional[int] = None) -> pd.DataFrame:
         """
         Calculate priority scores for all complaints.
         
         Args:
             complaints_df: DataFrame with complaint data and criteria scores
+            top_k: Only rank the top K complaints now and defer the full
+                   ranking until it is needed (None = rank everything)
             
         Returns:
             DataFrame with added priority_score and priority_rank columns
+            (only the top K rows when top_k is given)
+        """
+        priority_scores = self.calculate_priority_scores(complaints_df)
+        
+        # Add to DataFrame
+        result_df = complaints_df.copy()
+        result_df['priority_score'] = priority_scores
+        
+        self.scored_complaints = result_df
+        self._prioritized_complaints = None
+        self.top_complaints = None
+        self.stream_summary = None
+        
+        if top_k is not None:
+            return self.get_top_priorities(top_k)
+        
+        return self.prioritized_complaints
+    
+    def calculate_priority_scores(self, complaints_df: pd.DataFrame) -> np.ndarray:
+        """
+        Calculate weighted priority scores without copying or ranking.
+        
+        Args:
+            complaints_df: DataFrame with criteria score columns
+            
+        Returns:
+            Array of priority scores in row order
         """
         if self.ahp.weights is None:
             raise ValueError("Criteria weights not set. Call set_criteria_weights or load_default_weights first.")
         
-        # Get criteria scores
-        criteria_cols = ['safety_score', 'impact_score', 'urgency_score', 
-                        'resource_score', 'capacity_score']
-        
         # Ensure all criteria columns exist
-        missing_cols = [col for col in criteria_cols if col not in complaints_df.columns]
+        missing_cols = [col for col in self.CRITERIA_COLUMNS if col not in complaints_df.columns]
         if missing_cols:
             raise ValueError(f"Missing criteria columns: {missing_cols}")
         
         # Calculate weighted priority scores
-        scores_matrix = complaints_df[criteria_cols].values
-        priority_scores = np.dot(scores_matrix, self.ahp.weights)
+        return self._weighted_scores(complaints_df[self.CRITERIA_COLUMNS].to_numpy(dtype=float), self.ahp.weights)
+    
+    @staticmethod
+    def _weighted_scores(scores_matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Weighted sum of each row, independent of how many rows are scored at once.
         
-        # Add to DataFrame
-        result_df = complaints_df.copy()
-        result_df['priority_score'] = priority_scores
+        A BLAS matrix product may round differently for different batch
+        sizes, which would leave delta-scored and fully rescored complaints
+        with identical criteria a last bit apart and on different dense ranks.
         
-        # Rank complaints (1 = highest priority)
-        result_df['priority_rank'] = result_df['priority_score'].rank(ascending=False, method='dense')
+        Args:
+            scores_matrix: (complaints x criteria) score matrix
+            weights: Criteria weights
+            
+        Returns:
+            Array of weighted scores in row order
+        """
+        return (np.ascontiguousarray(scores_matrix) * weights).sum(axis=1)
+    
+    def prioritize_stream(self, chunks: Iterable[pd.DataFrame], output_path: str,
+                          top_n: int = 10, include_scores: bool = True) -> pd.DataFrame:
+        """
+        Score complaint chunks one at a time, writing results incrementally.
         
-        # Sort by priority
-        result_df = result_df.sort_values('priority_score', ascending=False)
+        Only the top N complaints and running score statistics are kept in
+        memory. Scored rows are appended to output_path in input order and
+        carry no priority_rank, since global ranks are unknown until the end.
         
-        self.prioritized_complaints = result_df
-        return result_df
+        Args:
+            chunks: Iterable of DataFrames with criteria score columns
+            output_path: Output CSV file path
+            top_n: Number of top complaints to keep
+            include_scores: Whether to include individual criteria scores
+            
+        Returns:
+            DataFrame with the top N complaints, ranked
+        """
+        if top_n < 1:
+            raise ValueError(f"top_n must be at least 1, got {top_n}")
+        
+        export_cols = self._export_columns(include_scores)
+        summary = StreamingScoreSummary()
+        heap = []
+        seq = 0
+        
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        first = True
+        
+        for chunk in chunks:
+            chunk['priority_score'] = self.calculate_priority_scores(chunk)
+            summary.update(chunk['priority_score'].to_numpy())
+            
+            # Write scored rows
+            available_cols = [col for col in export_cols if col in chunk.columns]
+            chunk[available_cols].to_csv(output_path, mode='w' if first else 'a',
+                                         header=first, index=False)
+            first = False
+            
+            # Only this chunk's own top N can enter the global top N
+            scores = chunk['priority_score'].to_numpy()
+            candidates = self._top_positions(scores, top_n)
+            
+            for pos in candidates:
+                item = (scores[pos], -(seq + pos), chunk.iloc[pos].to_dict())
+                if len(heap) < top_n:
+                    heapq.heappush(heap, item)
+                elif item[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, item)
+            seq += len(chunk)
+        
+        if first:
+            raise ValueError("No complaint data in input.")
+        
+        top_df = pd.DataFrame([row for _, _, row in sorted(heap, key=lambda x: x[:2], reverse=True)])
+        
+        # Every score above a top-N score is itself in the top N, so dense
+        # ranks computed within the heap are the global dense ranks
+        top_df['priority_rank'] = top_df['priority_score'].rank(ascending=False, method='dense')
+        
+        self.scored_complaints = None
+        self._prioritized_complaints = None
+        self.top_complaints = top_df
+        self.stream_summary = summary
+        print(f"[OK] Results exported to {output_path}")
+        return top_df
+    
+    def apply_delta(self, delta_df: Optional[pd.DataFrame] = None, deleted_ids: Iterable = (),
+                    as_of=None, refresh_urgency: bool = True) -> Dict[str, int]:
+        """
+        Apply a batch of new, updated and deleted complaints to the scored state.
+        
+        Only the delta rows are enriched and scored. Complaints already in the
+        state are matched by id and overwritten in place, and urgency is
+        re-aged against as_of from the stored creation times, rescoring just
+        the rows whose urgency changed. The rank index is updated in place, so
+        ranks, thresholds and level counts stay current without re-sorting the
+        backlog. Deletions and insertions are buffered and folded into
+        scored_complaints the next time it is read.
+        
+        Args:
+            delta_df: Raw complaint rows (new ids are inserted, known ids replaced)
+            deleted_ids: Ids of complaints to remove
+            as_of: Reference time for urgency scoring (defaults to now)
+            refresh_urgency: Re-age the urgency of unchanged complaints too
+        
+        Returns:
+            Dictionary with inserted, updated, deleted and rescored counts
+        """
+        base = self._incremental_state()
+        as_of = self.data_loader.resolve_as_of(as_of)
+        if 'priority_level' in base.columns:
+            base = self._scored_complaints = base.drop(columns='priority_level')
+        counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'rescored': 0}
+        moved, moved_from = [], []
+        
+        # Deletions only tombstone rows until the state is compacted
+        deleted = self._state_positions(pd.Index(list(deleted_ids)).unique())
+        deleted = deleted[deleted >= 0]
+        if deleted.size:
+            moved.append(deleted)
+            moved_from.append(self._state_values(deleted, 'department'))
+            self.rank_index.remove(self._state_values(deleted, 'priority_score'), deleted)
+            self._state_deleted[deleted] = True
+            for position in deleted[deleted >= len(base)]:
+                del self._state_pending_ids[self._state_inserts.index[position - len(base)]]
+            counts['deleted'] = int(deleted.size)
+        
+        if delta_df is not None and len(delta_df):
+            delta = self._prepare_state_frame(self.data_loader.enrich_frame(delta_df.copy(), as_of=as_of))
+            delta['priority_score'] = self.calculate_priority_scores(delta)
+            
+            # Known complaints are overwritten in place, keeping their position
+            positions = self._state_positions(delta.index)
+            known = positions >= 0
+            if known.any():
+                rows, updates = positions[known], delta[known]
+                moved.append(rows)
+                moved_from.append(self._state_values(rows, 'department'))
+                self.rank_index.update(self._state_values(rows, 'priority_score'),
+                                       updates['priority_score'].to_numpy(), rows)
+                self._write_state_rows(rows, updates)
+                counts['updated'] = int(known.sum())
+            
+            inserts = delta[~known]
+            if len(inserts):
+                pending = self._state_inserts
+                keys = np.arange(len(base) + len(pending), len(base) + len(pending) + len(inserts))
+                self.rank_index.insert(inserts['priority_score'].to_numpy(), keys)
+                moved.append(keys)
+                moved_from.append(np.full(len(keys), None, dtype=object))
+                
+                self._state_inserts = pd.concat([pending, inserts]) if len(pending) else inserts
+                self._state_deleted = np.concatenate([self._state_deleted, np.zeros(len(inserts), dtype=bool)])
+                self._state_pending_ids.update(zip(inserts.index, (keys - len(base)).tolist()))
+                counts['inserted'] = len(inserts)
+        
+        if refresh_urgency:
+            keys, old_scores, new_scores = self._refresh_urgency(as_of)
+            
+            # Rebuilding is cheaper than many single updates once most rows move
+            if new_scores.size > len(self.rank_index) // 16:
+                live = np.flatnonzero(~self._state_deleted)
+                self.rank_index = ScoreRankIndex.from_scores(self._state_values(live, 'priority_score'), keys=live)
+                self._department_members = None
+            else:
+                self.rank_index.update(old_scores, new_scores, keys)
+                moved.append(keys)
+                moved_from.append(self._state_values(keys, 'department'))
+            counts['rescored'] = int(new_scores.size)
+        
+        if moved:
+            self._move_department_members(np.concatenate(moved), np.concatenate(moved_from))
+        
+        self._prioritized_complaints = None
+        self.top_complaints = None
+        self.state_as_of = as_of
+        return counts
+    
+    def _refresh_urgency(self, as_of) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Re-age urgency scores and rescore only the complaints whose urgency changed.
+        
+        Args:
+            as_of: Reference time for urgency scoring
+        
+        Returns:
+            Tuple of (positions, old_scores, new_scores) of the rescored complaints
+        """
+        positions, old_scores, new_scores = [np.empty(0, dtype=np.int64)], [np.empty(0)], [np.empty(0)]
+        offset = 0
+        for df in (self._scored_complaints, self._state_inserts):
+            if len(df) and 'created_at_utc' in df.columns and 'urgency_score' in df.columns:
+                urgency = self.data_loader.calculate_urgency_from_created(df['created_at_utc'], as_of=as_of)
+                live = ~self._state_deleted[offset:offset + len(df)]
+                changed = np.flatnonzero((urgency != df['urgency_score'].to_numpy()) & live)
+                df['urgency_score'] = urgency
+                
+                if changed.size:
+                    scores = df['priority_score'].to_numpy(dtype=float).copy()
+                    old_scores.append(scores[changed])
+                    scores[changed] = self._weighted_scores(df[self.CRITERIA_COLUMNS].to_numpy(dtype=float)[changed],
+                                                            self.ahp.weights)
+                    df['priority_score'] = scores
+                    positions.append(changed + offset)
+                    new_scores.append(scores[changed])
+            offset += len(df)
+        
+        return np.concatenate(positions), np.concatenate(old_scores), np.concatenate(new_scores)
+    
+    def _state_positions(self, ids: pd.Index) -> np.ndarray:
+        """
+        Positions of live complaints in the state (base rows, then buffered inserts).
+        
+        Args:
+            ids: Complaint ids
+        
+        Returns:
+            Array of positions, -1 for unknown or deleted ids
+        """
+        positions = self._scored_complaints.index.get_indexer(ids)
+        if self._state_pending_ids:
+            pending = np.array([self._state_pending_ids.get(i, -1) for i in ids], dtype=np.int64)
+            positions = np.where(pending >= 0, pending + len(self._scored_complaints), positions)
+        
+        live = positions >= 0
+        live[live] = ~self._state_deleted[positions[live]]
+        return np.where(live, positions, -1)
+    
+    def _state_values(self, positions: np.ndarray, column: str) -> np.ndarray:
+        """Values of one column at state positions."""
+        values = self._scored_complaints[column].to_numpy()
+        if len(self._state_inserts):
+            values = np.concatenate([values, self._state_inserts[column].to_numpy()])
+        return values[positions]
+    
+    def _state_rows(self, positions: np.ndarray) -> pd.DataFrame:
+        """
+        Rows at state positions, in the given order.
+        
+        Args:
+            positions: State positions
+        
+        Returns:
+            DataFrame of the selected complaints
+        """
+        base = self._scored_complaints
+        in_base = positions < len(base)
+        if in_base.all():
+            return base.iloc[positions]
+        
+        order = np.argsort(~in_base, kind='stable')
+        rows = pd.concat([base.iloc[positions[in_base]],
+                          self._state_inserts.iloc[positions[~in_base] - len(base)]])
+        return rows.iloc[np.argsort(order, kind='stable')]
+    
+    def _write_state_rows(self, positions: np.ndarray, rows: pd.DataFrame):
+        """
+        Overwrite complaints at state positions in place.
+        
+        Args:
+            positions: State positions
+            rows: Replacement rows, aligned with positions
+        """
+        offset = 0
+        for df in (self._scored_complaints, self._state_inserts):
+            selected = (positions >= offset) & (positions < offset + len(df))
+            if selected.any():
+                columns = [col for col in rows.columns if col in df.columns]
+                df.iloc[positions[selected] - offset, df.columns.get_indexer(columns)] = \
+                    rows.loc[selected, columns].to_numpy()
+            offset += len(df)
+    
+    @property
+    def scored_complaints(self) -> Optional[pd.DataFrame]:
+        """
+        All scored complaints in input order (unsorted).
+        
+        Buffered incremental deletions and insertions are applied on access.
+        """
+        if self.rank_index is not None and (len(self._state_inserts) or self._state_deleted.any()):
+            df = self._scored_complaints
+            if len(self._state_inserts):
+                df = pd.concat([df, self._state_inserts])
+            if self._state_deleted.any():
+                df = df[~self._state_deleted]
+            self._reset_state(df)
+        
+        return self._scored_complaints
+    
+    @scored_complaints.setter
+    def scored_complaints(self, value: Optional[pd.DataFrame]):
+        self._scored_complaints = value
+        self.rank_index = None
+    
+    def _incremental_state(self) -> pd.DataFrame:
+        """
+        Prepare the scored complaints for incremental updates and rank queries.
+        
+        On first use the results are keyed by complaint id, creation times are
+        parsed once and the rank index is built from the current scores.
+        
+        Returns:
+            The base frame of scored complaints, indexed by id
+        """
+        if self._scored_complaints is None:
+            raise ValueError("No scored state. Run prioritize_complaints or load_state first.")
+        
+        if self.rank_index is None:
+            self._reset_state(self._prepare_state_frame(self._scored_complaints))
+            self._prioritized_complaints = None
+            self.top_complaints = None
+        
+        return self._scored_complaints
+    
+    def _reset_state(self, df: pd.DataFrame):
+        """Make df the compacted state and rebuild the rank index keyed by row position."""
+        self._scored_complaints = df
+        self._state_deleted = np.zeros(len(df), dtype=bool)
+        self._state_inserts = df.iloc[:0]
+        self._state_pending_ids = {}
+        self._department_members = None
+        self.rank_index = ScoreRankIndex.from_scores(df['priority_score'].to_numpy(), keys=np.arange(len(df)))
+    
+    def _prepare_state_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Key complaints by id and store parsed creation times.
+        
+        Args:
+            df: Complaint data with an id column
+        
+        Returns:
+            The same DataFrame, indexed by id
+        """
+        if 'id' not in df.columns:
+            raise ValueError("Incremental prioritization requires an id column.")
+        
+        duplicates = df['id'][df['id'].duplicated()].unique()
+        if len(duplicates):
+            raise ValueError(f"Duplicate complaint ids: {list(duplicates[:5])}")
+        
+        df.index = pd.Index(df['id'], name=None)
+        if 'created_at' in df.columns and 'created_at_utc' not in df.columns:
+            df['created_at_utc'] = self.data_loader.parse_created_dates(df['created_at']).array
+        return df
+    
+    def save_state(self, path=DEFAULT_STATE_PATH):
+        """
+        Persist the scored complaints for later incremental runs.
+        
+        Args:
+            path: Output pickle file
+        """
+        self._incremental_state()
+        df = self.scored_complaints
+        state = {
+            'version': STATE_VERSION,
+            'criteria': list(self.criteria),
+            'weights': np.asarray(self.ahp.weights, dtype=float),
+            'as_of': self.state_as_of,
+            'complaints': df.drop(columns='priority_level', errors='ignore')
+        }
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def load_state(self, path=DEFAULT_STATE_PATH) -> pd.DataFrame:
+        """
+        Restore scored complaints saved by save_state.
+        
+        Scores are recomputed only if the current criteria weights differ
+        from the ones the state was scored with.
+        
+        Args:
+            path: Pickle file written by save_state
+        
+        Returns:
+            The scored complaints, indexed by id
+        """
+        if self.ahp.weights is None:
+            raise ValueError("Criteria weights not set. Call set_criteria_weights or load_default_weights first.")
+        
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported state version {state.get('version')} in {path}")
+        if state['criteria'] != list(self.criteria):
+            raise ValueError("Saved state criteria do not match the prioritizer criteria.")
+        
+        df = state['complaints']
+        if not np.allclose(state['weights'], self.ahp.weights):
+            print("[INFO] Criteria weights changed since the state was saved, rescoring all complaints")
+            df['priority_score'] = self.calculate_priority_scores(df)
+        
+        self.scored_complaints = df
+        self._prioritized_complaints = None
+        self.top_complaints = None
+        self.stream_summary = None
+        self.state_as_of = state['as_of']
+        return self._incremental_state()
+    
+    @property
+    def priority_levels(self) -> List[str]:
+        """Priority level names, lowest level first."""
+        return sorted(self.priority_percentiles, key=self.priority_percentiles.get)
+    
+    def get_priority_thresholds(self, scores: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get the priority score threshold of each level above the lowest.
+        
+        Args:
+            scores: Priority scores (defaults to the current results)
+            
+        Returns:
+            Ascending array of thresholds, one per level after the lowest
+        """
+        percentiles = [self.priority_percentiles[level] / 100 for level in self.priority_levels[1:]]
+        
+        if scores is None:
+            if self.rank_index is not None and len(self.rank_index):
+                return self.rank_index.quantiles(percentiles)
+            if self.scored_complaints is None:
+                if self.stream_summary is None:
+                    raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
+                return self.stream_summary.sketch.quantiles(percentiles)
+            scores = self.scored_complaints['priority_score'].to_numpy()
+        
+        # One quantile call for all levels
+        return np.quantile(scores, percentiles)
+    
+    def assign_priority_levels(self) -> pd.Series:
+        """
+        Label every complaint with its priority level in a single pass.
+        
+        Adds a categorical priority_level column to the results.
+        
+        Returns:
+            Categorical Series of priority levels
+        """
+        if self.scored_complaints is None:
+            raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
+        
+        scores = self.scored_complaints['priority_score'].to_numpy()
+        thresholds = self.get_priority_thresholds(scores)
+        
+        # A score equal to a threshold belongs to the higher level
+        codes = np.searchsorted(thresholds, scores, side='right')
+        levels = pd.Series(
+            pd.Categorical.from_codes(codes, categories=self.priority_levels, ordered=True),
+            index=self.scored_complaints.index, name='priority_level'
+        )
+        
+        self.scored_complaints['priority_level'] = levels
+        if self._prioritized_complaints is not None:
+            self._prioritized_complaints['priority_level'] = levels
+        if self._department_frame is not None and self._department_source is self._prioritized_complaints:
+            self._department_frame['priority_level'] = levels
+        
+        return levels
+    
+    def get_priority_level_counts(self) -> Dict[str, int]:
+        """
+        Count complaints per priority level without building sub-frames.
+        
+        Counts are exact for in-memory results and after apply_delta, where
+        the keyed rank index counts exact scores; they are approximate only
+        after prioritize_stream.
+        
+        Returns:
+            Dictionary of priority level to count, highest level first
+        """
+        if self._scored_complaints is None:
+            if self.stream_summary is None:
+                raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
+            counts = self.stream_summary.level_counts(self.get_priority_thresholds())
+        elif self.rank_index is not None and 'priority_level' not in self._scored_complaints.columns:
+            counts = self.rank_index.level_counts(self.get_priority_thresholds())
+        else:
+            if 'priority_level' not in self.scored_complaints.columns:
+                self.assign_priority_levels()
+            counts = np.bincount(self.scored_complaints['priority_level'].cat.codes,
+                                 minlength=len(self.priority_levels))
+        
+        return {level: int(counts[i]) for i, level in reversed(list(enumerate(self.priority_levels)))}
     
     def get_priority_categories(self) -> Dict[str, pd.DataFrame]:
         """
         Categorize complaints into priority levels.
         
+        Use get_priority_level_counts when only the sizes are needed.
+        
         Returns:
             Dictionary with 'critical', 'high', 'medium', 'low' priority DataFrames
         """
         if self.prioritized_complaints is None:
             raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
         
-        df = self.prioritized_complaints
-        
-        # Define thresholds
-        q75 = df['priority_score'].quantile(0.75)
-        q50 = df['priority_score'].quantile(0.50)
-        q25 = df['priority_score'].quantile(0.25)
+        if 'priority_level' not in self.prioritized_complaints.columns:
+            self.assign_priority_levels()
         
-        return {
-            'critical': df[df['priority_score'] >= q75],
-            'high': df[(df['priority_score'] >= q50) & (df['priority_score'] < q75)],
-            'medium': df[(df['priority_score'] >= q25) & (df['priority_score'] < q50)],
-            'low': df[df['priority_score'] < q25]
-        }
+        df = self.prioritized_complaints
+        return {level: df[df['priority_level'] == level] for level in reversed(self.priority_levels)}
     
     def get_top_priorities(self, n: int = 10) -> pd.DataFrame:
         """
         Get top N highest priority complaints.
         
+        Uses the rank index in O(N log n) when it exists, otherwise a partial
+        selection in O(n + N log N) unless the full ranking has already been
+        computed.
+        
         Args:
             n: Number of top complaints to return
             
         Returns:
             DataFrame with top N complaints
         """
-        if self.prioritized_complaints is None:
+        if self._prioritized_complaints is not None:
+            return self._prioritized_complaints.head(n)
+        
+        if self.rank_index is not None:
+            positions, scores = self.rank_index.top(n)
+            top_df = self._state_rows(positions).copy()
+            top_df['priority_rank'] = self.rank_index.dense_rank(scores).astype(float)
+            return top_df
+        
+        if self.top_complaints is not None and n <= len(self.top_complaints):
+            return self.top_complaints.head(n)
+        
+        if self.scored_complaints is None:
             raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
         
-        return self.prioritized_complaints.head(n)
+        self.top_complaints = self._select_top(self.scored_complaints, n)
+        return self.top_complaints
+    
+    @staticmethod
+    def _top_positions(scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Positions of the K highest scores, highest first and ties in input order.
+        
+        Every score tied with the K-th largest is kept as a candidate before
+        the final sort, so the result matches the head of a stable full sort.
+        
+        Args:
+            scores: Array of priority scores
+            k: Number of positions to return
+            
+        Returns:
+            Array of at most K positions
+        """
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        
+        threshold = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(~(scores < threshold))
+        return candidates[np.lexsort((candidates, -scores[candidates]))][:k]
     
-    def get_department_priorities(self, department: str) -> pd.DataFrame:
+    @staticmethod
+    def _select_top(scored_df: pd.DataFrame, k: int) -> pd.DataFrame:
+        """
+        Select and rank the K highest scoring complaints without a full sort.
+        
+        Args:
+            scored_df: DataFrame with a priority_score column
+            k: Number of complaints to select
+            
+        Returns:
+            DataFrame with the top K complaints, sorted and ranked
+        """
+        order = ComplaintPrioritizer._top_positions(scored_df['priority_score'].to_numpy(), k)
+        top_df = scored_df.iloc[order].copy()
+        
+        # Every score above a selected score is also selected, so dense ranks
+        # within the selection equal the global dense ranks
+        top_df['priority_rank'] = top_df['priority_score'].rank(ascending=False, method='dense')
+        return top_df
+    
+    def rank_of(self, complaint_id) -> int:
+        """
+        Current dense priority rank of one complaint in O(log n).
+        
+        Builds the rank index on first use; later calls and apply_delta keep
+        it current without re-ranking the other complaints.
+        
+        Args:
+            complaint_id: Complaint id
+        
+        Returns:
+            Rank (1 = highest priority)
+        """
+        self._incremental_state()
+        position = self._state_positions(pd.Index([complaint_id]))[0]
+        if position < 0:
+            raise KeyError(f"Unknown complaint id '{complaint_id}'")
+        
+        return int(self.rank_index.dense_rank(self._state_values(np.array([position]), 'priority_score'))[0])
+    
+    def kth_complaint(self, k: int) -> pd.Series:
+        """
+        The complaint in position k of the priority order (k = 1 is the highest).
+        
+        Args:
+            k: 1-based position, ties in input order
+        
+        Returns:
+            Series with the complaint's data and priority_rank
+        """
+        self._incremental_state()
+        position, score = self.rank_index.kth_key(k)
+        
+        row = self._state_rows(np.array([position])).iloc[0].copy()
+        row['priority_rank'] = float(self.rank_index.dense_rank(score)[0])
+        return row
+    
+    def _department_partitions(self) -> Tuple[pd.DataFrame, Dict[str, Tuple[int, int]]]:
+        """
+        Complaints grouped by department, each group in priority order.
+        
+        Built once per ranking with a stable sort of the prioritized results
+        by department, so every department is one contiguous block that can
+        be sliced without scanning or re-sorting the other complaints.
+        
+        Returns:
+            Tuple of (frame sorted by department then priority,
+            dict of department to (start, stop) row positions)
+        """
+        ranked = self.prioritized_complaints
+        if ranked is None:
+            raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
+        
+        if self._department_source is not ranked:
+            # Missing departments get code -1 and sort ahead of every block
+            codes, departments = pd.factorize(ranked['department'], sort=True)
+            order = np.argsort(codes, kind='stable')
+            
+            sizes = np.bincount(codes[codes >= 0], minlength=len(departments))
+            bounds = np.concatenate([[0], np.cumsum(sizes)]) + np.count_nonzero(codes < 0)
+            
+            self._department_frame = ranked.iloc[order]
+            self._department_slices = {department: (int(bounds[i]), int(bounds[i + 1]))
+                                       for i, department in enumerate(departments)}
+            self._department_source = ranked
+        
+        return self._department_frame, self._department_slices
+    
+    def _state_department_members(self) -> Dict[str, np.ndarray]:
+        """
+        Live complaints of each department in priority order, by state position.
+        
+        Built from the scored state once per rank index, then kept current by
+        apply_delta, which only re-files the complaints a delta touched.
+        
+        Returns:
+            Dict of department to DEPARTMENT_MEMBER_DTYPE array in priority
+            order (ties in input order)
+        """
+        if self._department_members is None:
+            live = np.flatnonzero(~self._state_deleted)
+            scores = self._state_values(live, 'priority_score')
+            codes, departments = pd.factorize(self._state_values(live, 'department'), sort=True)
+            
+            # Missing departments get code -1 and sort ahead of every block
+            order = np.lexsort((live, -scores, codes))
+            bounds = np.searchsorted(codes[order], np.arange(len(departments) + 1))
+            
+            self._department_members = {}
+            for i, department in enumerate(departments):
+                block = order[bounds[i]:bounds[i + 1]]
+                members = np.empty(len(block), dtype=DEPARTMENT_MEMBER_DTYPE)
+                members['neg_score'] = -scores[block]
+                members['position'] = live[block]
+                self._department_members[department] = members
+        
+        return self._department_members
+    
+    def _move_department_members(self, positions: np.ndarray, old_departments: np.ndarray):
+        """
+        Re-file changed complaints in the department partitions.
+        
+        Each affected department drops the changed positions and takes back
+        the live ones by binary search, so nothing is re-sorted.
+        
+        Args:
+            positions: State positions whose score, department or liveness changed
+            old_departments: Their departments before the change (None if new)
+        """
+        if self._department_members is None or not len(positions):
+            return
+        
+        # A position changed twice in one delta keeps its original department
+        positions, first = np.unique(positions, return_index=True)
+        old_departments = old_departments[first]
+        
+        live = positions[~self._state_deleted[positions]]
+        refiled = np.empty(len(live), dtype=DEPARTMENT_MEMBER_DTYPE)
+        refiled['neg_score'] = -self._state_values(live, 'priority_score')
+        refiled['position'] = live
+        new_departments = self._state_values(live, 'department')
+        
+        for department in pd.unique(np.concatenate([old_departments, new_departments])):
+            if pd.isna(department):
+                continue
+            members = self._department_members.get(department, np.empty(0, dtype=DEPARTMENT_MEMBER_DTYPE))
+            members = members[~np.isin(members['position'], positions)]
+            
+            added = np.sort(refiled[new_departments == department], order=['neg_score', 'position'])
+            members = np.insert(members, np.searchsorted(members, added), added)
+            
+            if len(members):
+                self._department_members[department] = members
+            else:
+                self._department_members.pop(department, None)
+    
+    def get_department_priorities(self, department: str, n: Optional[int] = None) -> pd.DataFrame:
         """
         Get prioritized complaints for a specific department.
         
+        With a rank index (after apply_delta or load_state) the department's
+        complaints come from partitions kept current by each delta, and ranks
+        from the index, so no complaint outside the department is re-ranked.
+        Otherwise this is a slice of a partition of the full ranking, O(1)
+        for the whole department and O(N) for its top N after the first call.
+        
         Args:
             department: Department name
+            n: Only return the department's top N complaints (None = all)
             
         Returns:
             DataFrame with department complaints sorted by priority
+            (ties in input order)
         """
-        if self.prioritized_complaints is None:
-            raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
+        if self.rank_index is not None:
+            members = self._state_department_members().get(department, np.empty(0, dtype=DEPARTMENT_MEMBER_DTYPE))
+            if n is not None:
+                members = members[:max(n, 0)]
+            
+            dept_complaints = self._state_rows(members['position']).copy()
+            dept_complaints['priority_rank'] = self.rank_index.dense_rank(-members['neg_score']).astype(float)
+            return dept_complaints
         
-        dept_complaints = self.prioritized_complaints[
-            self.prioritized_complaints['department'] == department
-        ]
+        dept_frame, slices = self._department_partitions()
+        start, stop = slices.get(department, (0, 0))
+        if n is not None:
+            stop = min(stop, start + max(n, 0))
         
-        return dept_complaints.sort_values('priority_score', ascending=False)
+        return dept_frame.iloc[start:stop]
+    
+    def get_department_counts(self) -> Dict[str, int]:
+        """
+        Number of complaints per department, without scanning the results.
+        
+        Returns:
+            Dictionary of department to count, in department name order
+        """
+        if self.rank_index is not None:
+            members = self._state_department_members()
+            return {department: len(members[department]) for department in sorted(members)}
+        
+        _, slices = self._department_partitions()
+        return {department: stop - start for department, (start, stop) in slices.items()}
     
     def export_results(self, filepath: str, include_scores: bool = True):
         """
@@ -182,24 +1185,164 @@ class ComplaintPrioritizer:
         if self.prioritized_complaints is None:
             raise ValueError("No prioritized complaints. Run prioritize_complaints first.")
         
-        # Select columns to export
-        base_cols = ['id', 'title', 'type', 'department', 'status', 
-                    'priority_score', 'priority_rank']
-        
-        if include_scores:
-            score_cols = ['safety_score', 'impact_score', 'urgency_score',
-                         'resource_score', 'capacity_score']
-            export_cols = base_cols + score_cols
-        else:
-            export_cols = base_cols
-        
         # Filter to available columns
+        export_cols = self._export_columns(include_scores)
         available_cols = [col for col in export_cols if col in self.prioritized_complaints.columns]
         
         # Export
         self.prioritized_complaints[available_cols].to_csv(filepath, index=False)
         print(f"[OK] Results exported to {filepath}")
     
+    def _export_columns(self, include_scores: bool) -> List[str]:
+        """Columns to export, optionally with individual criteria scores."""
+        if include_scores:
+            return self.EXPORT_COLUMNS + self.CRITERIA_COLUMNS
+        return list(self.EXPORT_COLUMNS)
+    
+    def set_weight_profiles(self, profiles: Dict[str, Dict[Tuple[str, str], float]]) -> pd.DataFrame:
+        """
+        Derive a weight matrix from several pairwise comparison profiles.
+        
+        After add_hotspot_criterion, profiles without their own hotspot
+        judgments take the ones the hotspot criterion was added with.
+        
+        Args:
+            profiles: Dictionary of profile name to pairwise comparisons
+            
+        Returns:
+            DataFrame of weights (profiles x criteria)
+        """
+        compiled = {}
+        for name, comparisons in profiles.items():
+            ahp = AHPCore(self.criteria)
+            ahp.create_comparison_matrix({**(self.hotspot_comparisons or {}), **comparisons})
+            ahp.calculate_weights()
+            ahp.calculate_consistency_ratio()
+            compiled[name] = ahp
+        
+        return self._set_compiled_profiles(compiled)
+    
+    def load_weight_profiles(self, config_path: Optional[str] = None,
+                             cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+        """
+        Load every pairwise comparison profile from the configuration file.
+        
+        After add_hotspot_criterion, the config profiles (which only compare
+        the default criteria) take the judgments the hotspot criterion was
+        added with, rather than treating it as equal to every criterion.
+        
+        Args:
+            config_path: Path to JSON config (defaults to config/criteria_weights.json)
+            cache_dir: Directory for cached weights (None disables caching)
+            
+        Returns:
+            DataFrame of weights (profiles x criteria)
+        """
+        config = load_config(config_path)
+        if self.hotspot_comparisons is not None and config.get('pairwise_comparisons'):
+            hotspot = {f"{a} vs {b}": value for (a, b), value in self.hotspot_comparisons.items()}
+            config = {**config, 'pairwise_comparisons': {name: {**hotspot, **profile} for name, profile
+                                                         in config['pairwise_comparisons'].items()}}
+        
+        return self._set_compiled_profiles(compile_profiles(config, self.criteria, cache_dir))
+    
+    def _set_compiled_profiles(self, compiled: Dict[str, AHPCore]) -> pd.DataFrame:
+        """
+        Store the weight matrix of compiled profiles.
+        
+        Args:
+            compiled: Dictionary of profile name to AHPCore with weights set
+            
+        Returns:
+            DataFrame of weights (profiles x criteria)
+        """
+        if not compiled:
+            raise ValueError("At least one weight profile is required.")
+        
+        for name, ahp in compiled.items():
+            if not ahp.is_consistent():
+                print(f"WARNING: Inconsistent comparisons in profile '{name}' (CR = {ahp.consistency_ratio:.4f})")
+        
+        names = list(compiled)
+        self.profile_weights = pd.DataFrame([compiled[name].weights for name in names],
+                                            index=names, columns=self.criteria)
+        self.profile_consistency = pd.Series([compiled[name].consistency_ratio for name in names],
+                                             index=names, name='consistency_ratio')
+        return self.profile_weights
+    
+    def prioritize_profiles(self, complaints_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score and rank all complaints under every weight profile at once.
+        
+        Args:
+            complaints_df: DataFrame with complaint data and criteria scores
+            
+        Returns:
+            DataFrame with priority_score_<profile> and priority_rank_<profile>
+            columns for each profile
+        """
+        if self.profile_weights is None:
+            raise ValueError("Weight profiles not set. Call set_weight_profiles or load_weight_profiles first.")
+        
+        missing_cols = [col for col in self.CRITERIA_COLUMNS if col not in complaints_df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing criteria columns: {missing_cols}")
+        
+        # One matrix product for all profiles: (complaints x criteria) @ (criteria x profiles)
+        scores_matrix = complaints_df[self.CRITERIA_COLUMNS].to_numpy(dtype=float)
+        profile_scores = pd.DataFrame(scores_matrix @ self.profile_weights.to_numpy().T,
+                                      index=complaints_df.index, columns=self.profile_weights.index)
+        profile_ranks = profile_scores.rank(ascending=False, method='dense')
+        
+        result_df = complaints_df.copy()
+        for name in self.profile_weights.index:
+            result_df[f'priority_score_{name}'] = profile_scores[name]
+            result_df[f'priority_rank_{name}'] = profile_ranks[name]
+        
+        self.profile_results = result_df
+        return result_df
+    
+    def compare_profile_rankings(self, top_k: int = 10) -> pd.DataFrame:
+        """
+        Summarize how much the profile rankings agree, pair by pair.
+        
+        Args:
+            top_k: Size of the top list used for the overlap measure
+            
+        Returns:
+            DataFrame with one row per profile pair: Spearman rank correlation,
+            share of common complaints in both top K lists, and mean/max
+            absolute rank shift
+        """
+        if self.profile_results is None:
+            raise ValueError("No profile results. Run prioritize_profiles first.")
+        
+        names = list(self.profile_weights.index)
+        scores = self.profile_results[[f'priority_score_{name}' for name in names]].to_numpy()
+        ranks = self.profile_results[[f'priority_rank_{name}' for name in names]].to_numpy()
+        
+        # Spearman correlation is the Pearson correlation of (average) ranks
+        average_ranks = pd.DataFrame(scores).rank(method='average').to_numpy()
+        spearman = np.atleast_2d(np.corrcoef(average_ranks, rowvar=False))
+        
+        k = min(top_k, len(scores))
+        top_sets = [set(np.argsort(-scores[:, p], kind='mergesort')[:k]) for p in range(len(names))]
+        
+        rows = []
+        for a in range(len(names)):
+            for b in range(a + 1, len(names)):
+                shift = np.abs(ranks[:, a] - ranks[:, b])
+                rows.append({
+                    'profile_a': names[a],
+                    'profile_b': names[b],
+                    'spearman': spearman[a, b],
+                    f'top_{top_k}_overlap': len(top_sets[a] & top_sets[b]) / k if k else np.nan,
+                    'mean_rank_shift': shift.mean(),
+                    'max_rank_shift': shift.max()
+                })
+        
+        return pd.DataFrame(rows)
+    
     def generate_summary_report(self) -> str:
         """
         Generate text summary of prioritization results.
@@ -207,10 +1350,10 @@ class ComplaintPrioritizer:
         Returns:
             Formatted summary report string
         """
-        if self.prioritized_complaints is None:
+        if self._scored_complaints is None and self.stream_summary is None:
             return "No prioritization results available."
         
-        categories = self.get_priority_categories()
+        counts = self.get_priority_level_counts()
         
         report = []
         report.append("=" * 60)
@@ -234,11 +1377,9 @@ class ComplaintPrioritizer:
         # Statistics
         report.append("PRIORITIZATION STATISTICS:")
         report.append("-" * 60)
-        report.append(f"  Total Complaints: {len(self.prioritized_complaints)}")
-        report.append(f"  Critical Priority: {len(categories['critical'])}")
-        report.append(f"  High Priority: {len(categories['high'])}")
-        report.append(f"  Medium Priority: {len(categories['medium'])}")
-        report.append(f"  Low Priority: {len(categories['low'])}")
+        report.append(f"  Total Complaints: {sum(counts.values())}")
+        for level, count in counts.items():
+            report.append(f"  {level.capitalize()} Priority: {count}")
         report.append("")
         
         # Top 5 complaints
@@ -260,6 +1401,75 @@ class ComplaintPrioritizer:
         return "\n".join(report)
 
 
+class StreamingScoreSummary:
+    """
+    Running priority score statistics for chunked prioritization.
+    
+    Keeps exact count, mean and range plus a KLL quantile sketch, so
+    priority level thresholds and counts are available in bounded memory.
+    """
+    
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        Initialize empty statistics.
+        
+        Args:
+            k: Sketch accuracy parameter
+            seed: Optional seed for the sketch
+        """
+        self.sketch = KLLSketch(k=k, seed=seed)
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+    
+    def update(self, scores: np.ndarray):
+        """
+        Add a batch of priority scores.
+        
+        Args:
+            scores: Array of priority scores
+        """
+        scores = np.asarray(scores, dtype=float)
+        if scores.size == 0:
+            return
+        
+        self.sketch.update(scores)
+        self.count += scores.size
+        self.total += float(scores.sum())
+        self.min = min(self.min, float(scores.min()))
+        self.max = max(self.max, float(scores.max()))
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+    
+    def quantile(self, q: float) -> float:
+        """
+        Approximate score quantile.
+        
+        Args:
+            q: Quantile in [0, 1]
+            
+        Returns:
+            Approximate quantile value
+        """
+        return self.sketch.quantile(q)
+    
+    def level_counts(self, thresholds: np.ndarray) -> np.ndarray:
+        """
+        Approximate counts between ascending score thresholds.
+        
+        Args:
+            thresholds: Ascending level thresholds
+            
+        Returns:
+            Counts per level, lowest level first
+        """
+        below = np.concatenate([[0], self.sketch.rank(thresholds), [self.count]])
+        return np.diff(below)
+
+
 if __name__ == "__main__":
     # Example usage
     print("Complaint Prioritization Engine - Example")
@@ -0,0 +1,155 @@
+"""
+Streaming Quantile Sketch
+KLL-style mergeable sketch for approximate quantiles of priority scores
+
+Used for chunked and incremental runs, where the full score column is
+never held in memory at once.
+"""
+
+import numpy as np
+from typing import Optional, Sequence
+
+
+class KLLSketch:
+    """
+    Approximate quantile sketch (Karnin, Lang and Liberty, 2016).
+    
+    Items are stored in a stack of compactors. When a compactor overflows it
+    is sorted and every other item (random offset) is promoted to the next
+    level with twice the weight, so memory grows only with log(n / k).
+    """
+    
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            k: Accuracy parameter (rank error is roughly 1.7 / k)
+            seed: Optional seed for the compaction coin flips
+        """
+        if k < 8:
+            raise ValueError("k must be at least 8.")
+        
+        self.k = k
+        self.count = 0
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    def update(self, values: Sequence[float]):
+        """
+        Add a batch of values.
+        
+        Args:
+            values: Values to add (NaN values are ignored)
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.count += values.size
+        self._compress()
+    
+    def merge(self, other: 'KLLSketch'):
+        """
+        Merge another sketch into this one.
+        
+        Args:
+            other: Sketch built over a disjoint set of values
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        
+        self.count += other.count
+        self._compress()
+    
+    def _capacity(self, level: int) -> int:
+        """Capacity of a compactor, shrinking geometrically below the top level."""
+        depth = len(self.compactors) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+    
+    def _compress(self):
+        """Compact every overflowing level, bottom up."""
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                
+                items = np.sort(items)
+                
+                # Compact an even number of items so total weight is preserved
+                n_compact = len(items) - len(items) % 2
+                offset = self._rng.integers(2)
+                promoted = items[offset:n_compact:2]
+                
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                self.compactors[level] = items[n_compact:]
+            level += 1
+    
+    def _weighted_items(self):
+        """All retained items, sorted, with their cumulative weights."""
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([
+            np.full(len(c), 2 ** level, dtype=np.int64) for level, c in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind='mergesort')
+        return items[order], np.cumsum(weights[order])
+    
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """
+        Approximate quantiles.
+        
+        Args:
+            qs: Quantiles in [0, 1]
+        
+        Returns:
+            Array of approximate quantile values
+        """
+        if self.count == 0:
+            raise ValueError("No values recorded.")
+        
+        items, cumulative = self._weighted_items()
+        targets = np.asarray(qs, dtype=float) * cumulative[-1]
+        idx = np.searchsorted(cumulative, targets, side='left')
+        return items[np.minimum(idx, len(items) - 1)]
+    
+    def quantile(self, q: float) -> float:
+        """
+        Approximate quantile.
+        
+        Args:
+            q: Quantile in [0, 1]
+        
+        Returns:
+            Approximate quantile value
+        """
+        return float(self.quantiles([q])[0])
+    
+    def rank(self, values: Sequence[float]) -> np.ndarray:
+        """
+        Approximate number of recorded values strictly below each value.
+        
+        Args:
+            values: Query values
+        
+        Returns:
+            Integer array of approximate counts
+        """
+        if self.count == 0:
+            return np.zeros(len(np.atleast_1d(values)), dtype=np.int64)
+        
+        items, cumulative = self._weighted_items()
+        cumulative = np.concatenate([[0], cumulative])
+        idx = np.searchsorted(items, np.atleast_1d(values), side='left')
+        return cumulative[idx]
+    
+    @property
+    def size(self) -> int:
+        """Number of retained items."""
+        return sum(len(c) for c in self.compactors)
@@ -0,0 +1,524 @@
+"""
+Score Rank Index
+Order-statistics structure over quantized priority scores
+
+Scores in [0, 1] are quantized into a fixed number of buckets and counted in
+Fenwick (binary indexed) trees, so inserting, removing, ranking a score and
+finding the k-th highest score all take O(log buckets). Without keys,
+scores closer than one bucket width (1 / resolution) are treated as tied.
+
+When built with keys (e.g. row positions), the index also tracks which key
+sits in which bucket and counts distinct exact scores per bucket, so ranks
+and quantiles are exact and the k-th highest item and the top N items can be
+looked up without scanning all scores. Members are stored bucket by bucket
+in flat arrays, with later changes kept in a small overlay that is folded
+back in once it grows.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+
+class ScoreRankIndex:
+    """
+    Fenwick-tree order statistics for priority scores.
+    """
+    
+    # Query batches larger than this are answered from one sorted pass
+    BULK_QUERY_SIZE = 256
+    
+    def __init__(self, resolution: int = 2 ** 20):
+        """
+        Initialize an empty index.
+        
+        Args:
+            resolution: Number of score buckets over [0, 1]
+        """
+        if resolution < 2:
+            raise ValueError("resolution must be at least 2.")
+        
+        self.resolution = resolution
+        self.count = 0
+        self._counts = np.zeros(resolution, dtype=np.int64)
+        
+        # 1-based trees: one over complaint counts, one over occupied buckets
+        self._tree = np.zeros(resolution + 1, dtype=np.int64)
+        self._distinct_tree = np.zeros(resolution + 1, dtype=np.int64)
+        self._top_bit = 1 << (resolution.bit_length() - 1)
+        
+        # Bucket members (only when built with keys): keys and exact scores
+        # sorted by bucket, plus keys added or removed since
+        self._keys = None
+        self._scores = None
+        self._starts = None
+        self._slots = None
+        self._removed = None
+        self._n_removed = 0
+        self._added: Dict[int, Dict[int, float]] = {}
+        self._n_added = 0
+        
+        # Multiplicity of each exact score, for distinct counts (keyed only)
+        self._multiplicity: Dict[float, int] = {}
+    
+    @classmethod
+    def from_scores(cls, scores: Sequence[float], keys: Optional[Sequence[int]] = None,
+                    resolution: int = 2 ** 20) -> 'ScoreRankIndex':
+        """
+        Build an index in O(n + resolution), or O(n log n) with keys.
+        
+        Args:
+            scores: Priority scores in [0, 1]
+            keys: Optional unique non-negative integer key per score (e.g.
+                  row positions); required for kth_key and top. Ties within
+                  a bucket are ordered by exact score, then by ascending key.
+            resolution: Number of score buckets over [0, 1]
+        
+        Returns:
+            ScoreRankIndex instance
+        """
+        index = cls(resolution)
+        scores = np.asarray(scores, dtype=float)
+        buckets = index.bucket(scores)
+        
+        index._counts = np.bincount(buckets, minlength=resolution).astype(np.int64)
+        index.count = int(index._counts.sum())
+        index._tree = index._build(index._counts)
+        
+        if keys is None:
+            index._distinct_tree = index._build((index._counts > 0).astype(np.int64))
+        else:
+            keys = np.asarray(keys, dtype=np.int64)
+            if keys.shape != scores.shape:
+                raise ValueError("keys and scores must have the same length.")
+            if keys.size and keys.min() < 0:
+                raise ValueError("keys must be non-negative.")
+            index._set_members(keys, scores, buckets)
+            
+            values, counts = np.unique(scores, return_counts=True)
+            index._multiplicity = dict(zip(values.tolist(), counts.tolist()))
+        return index
+    
+    @staticmethod
+    def _build(values: np.ndarray) -> np.ndarray:
+        """Fenwick tree of `values` from prefix sums, in O(n)."""
+        prefix = np.concatenate([[0], np.cumsum(values)])
+        positions = np.arange(1, len(values) + 1)
+        return np.concatenate([[0], prefix[positions] - prefix[positions - (positions & -positions)]])
+    
+    def _set_members(self, keys: np.ndarray, scores: np.ndarray, buckets: np.ndarray):
+        """Store bucket members in flat arrays, count distinct scores and clear the overlay."""
+        order = np.lexsort((keys, -scores, buckets))
+        self._keys = keys[order]
+        self._scores = scores[order]
+        self._starts = np.concatenate([[0], np.cumsum(np.bincount(buckets, minlength=self.resolution))])
+        
+        # A member starts a new distinct score if its bucket or score differs from the previous one
+        buckets = buckets[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (buckets[1:] != buckets[:-1]) | (self._scores[1:] != self._scores[:-1])
+        self._distinct_tree = self._build(np.bincount(buckets[first], minlength=self.resolution))
+        
+        # Slot of each key in the flat arrays, for marking removals
+        self._slots = np.full(int(self._keys.max()) + 1 if len(keys) else 0, -1, dtype=np.int64)
+        self._slots[self._keys] = np.arange(len(self._keys))
+        self._removed = np.zeros(len(self._keys), dtype=bool)
+        self._n_removed = 0
+        self._added = {}
+        self._n_added = 0
+    
+    @property
+    def tracks_keys(self) -> bool:
+        """True if the index was built with keys."""
+        return self._keys is not None
+    
+    def bucket(self, scores: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Bucket number of each score (scores outside [0, 1] are clipped).
+        
+        Args:
+            scores: Priority scores
+        
+        Returns:
+            Integer array of bucket numbers
+        """
+        scores = np.clip(np.atleast_1d(np.asarray(scores, dtype=float)), 0.0, 1.0)
+        return np.minimum((scores * self.resolution).astype(np.int64), self.resolution - 1)
+    
+    def bucket_floor(self, buckets: np.ndarray) -> np.ndarray:
+        """Lowest score that falls into each bucket."""
+        return np.asarray(buckets, dtype=float) / self.resolution
+    
+    def _update(self, tree: np.ndarray, buckets: np.ndarray, deltas: np.ndarray):
+        """Add deltas at bucket positions, for all positions at once."""
+        positions = buckets + 1
+        while positions.size:
+            np.add.at(tree, positions, deltas)
+            positions = positions + (positions & -positions)
+            keep = positions <= self.resolution
+            positions, deltas = positions[keep], deltas[keep]
+    
+    def _prefix(self, tree: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+        """Sum of the first `buckets` positions, for all queries at once."""
+        positions = np.asarray(buckets, dtype=np.int64).copy()
+        totals = np.zeros(positions.shape, dtype=np.int64)
+        while positions.any():
+            active = positions > 0
+            totals[active] += tree[positions[active]]
+            positions[active] -= positions[active] & -positions[active]
+        return totals
+    
+    def _apply(self, buckets: np.ndarray, sign: int):
+        """Insert (sign 1) or remove (sign -1) one item per bucket entry."""
+        if buckets.size == 0:
+            return
+        
+        unique, counts = np.unique(buckets, return_counts=True)
+        before = self._counts[unique] > 0
+        
+        self._counts[unique] += sign * counts
+        if (self._counts[unique] < 0).any():
+            self._counts[unique] -= sign * counts
+            raise ValueError("Cannot remove scores that are not in the index.")
+        
+        self._update(self._tree, unique, sign * counts)
+        self.count += sign * int(counts.sum())
+        
+        # Buckets that became occupied or empty change the distinct counts
+        # (keyed indexes count distinct exact scores in _track instead)
+        if not self.tracks_keys:
+            flipped = before != (self._counts[unique] > 0)
+            self._update(self._distinct_tree, unique[flipped], np.where(before[flipped], -1, 1))
+    
+    def _track(self, buckets: np.ndarray, keys: np.ndarray, scores: np.ndarray, sign: int):
+        """Record keyed inserts (sign 1) or removals (sign -1) and update distinct counts."""
+        distinct_changes = []
+        for bucket, key, score in zip(buckets.tolist(), keys.tolist(), scores.tolist()):
+            added = self._added.get(bucket)
+            if sign > 0:
+                self._added.setdefault(bucket, {})[key] = score
+                self._n_added += 1
+            elif added is not None and key in added:
+                del added[key]
+                self._n_added -= 1
+            else:
+                self._removed[self._slots[key]] = True
+                self._n_removed += 1
+            
+            # A score value appearing or disappearing changes its bucket's distinct count
+            multiplicity = self._multiplicity.get(score, 0) + sign
+            if multiplicity:
+                self._multiplicity[score] = multiplicity
+            else:
+                del self._multiplicity[score]
+            if multiplicity == (1 if sign > 0 else 0):
+                distinct_changes.append(bucket)
+        
+        if distinct_changes:
+            self._update(self._distinct_tree, np.asarray(distinct_changes, dtype=np.int64),
+                         np.full(len(distinct_changes), sign, dtype=np.int64))
+        if self._n_removed + self._n_added > max(1024, self.count // 8):
+            self._compact()
+    
+    def _check_keys(self, scores: np.ndarray, keys) -> Optional[np.ndarray]:
+        """Validate keys against the tracking mode of the index."""
+        if keys is None:
+            if self.tracks_keys:
+                raise ValueError("This index tracks keys; pass the keys of the scores.")
+            return None
+        
+        if not self.tracks_keys:
+            raise ValueError("This index was built without keys.")
+        keys = np.atleast_1d(np.asarray(keys, dtype=np.int64))
+        if keys.shape != scores.shape:
+            raise ValueError("keys and scores must have the same length.")
+        return keys
+    
+    def insert(self, scores: Union[float, Sequence[float]], keys: Optional[Sequence[int]] = None):
+        """
+        Add scores to the index.
+        
+        Args:
+            scores: Priority scores
+            keys: Keys of the scores (required if the index tracks keys)
+        """
+        scores = np.atleast_1d(np.asarray(scores, dtype=float))
+        keys = self._check_keys(scores, keys)
+        buckets = self.bucket(scores)
+        self._apply(buckets, 1)
+        
+        if keys is not None:
+            self._track(buckets, keys, scores, 1)
+    
+    def remove(self, scores: Union[float, Sequence[float]], keys: Optional[Sequence[int]] = None):
+        """
+        Remove previously inserted scores.
+        
+        Args:
+            scores: Priority scores
+            keys: Keys of the scores (required if the index tracks keys)
+        """
+        scores = np.atleast_1d(np.asarray(scores, dtype=float))
+        keys = self._check_keys(scores, keys)
+        buckets = self.bucket(scores)
+        self._apply(buckets, -1)
+        
+        if keys is not None:
+            self._track(buckets, keys, scores, -1)
+    
+    def update(self, old_scores: Union[float, Sequence[float]], new_scores: Union[float, Sequence[float]],
+               keys: Optional[Sequence[int]] = None):
+        """
+        Replace scores (e.g. after rescoring changed complaints).
+        
+        Args:
+            old_scores: Scores currently in the index
+            new_scores: Replacement scores
+            keys: Keys of the scores (required if the index tracks keys)
+        """
+        self.remove(old_scores, keys)
+        self.insert(new_scores, keys)
+    
+    def _live_members(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Keys and exact scores of every indexed item, unordered."""
+        keys, scores = [self._keys[~self._removed]], [self._scores[~self._removed]]
+        
+        for added in self._added.values():
+            if added:
+                keys.append(np.fromiter(added.keys(), dtype=np.int64, count=len(added)))
+                scores.append(np.fromiter(added.values(), dtype=float, count=len(added)))
+        return np.concatenate(keys), np.concatenate(scores)
+    
+    def _compact(self):
+        """Fold the overlay back into the flat member arrays."""
+        keys, scores = self._live_members()
+        self._set_members(keys, scores, self.bucket(scores))
+    
+    def members(self, bucket: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Keys and exact scores in one bucket, highest score first.
+        
+        Args:
+            bucket: Bucket number
+        
+        Returns:
+            Tuple of (keys, scores), ties ordered by ascending key
+        """
+        if not self.tracks_keys:
+            raise ValueError("This index was built without keys.")
+        
+        start, stop = self._starts[bucket], self._starts[bucket + 1]
+        keys, scores = self._keys[start:stop], self._scores[start:stop]
+        if self._n_removed:
+            keep = ~self._removed[start:stop]
+            keys, scores = keys[keep], scores[keep]
+        
+        added = self._added.get(bucket)
+        if added:
+            keys = np.concatenate([keys, np.fromiter(added.keys(), dtype=np.int64, count=len(added))])
+            scores = np.concatenate([scores, np.fromiter(added.values(), dtype=float, count=len(added))])
+            order = np.lexsort((keys, -scores))
+            keys, scores = keys[order], scores[order]
+        return keys, scores
+    
+    def count_above(self, scores: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Number of indexed scores in a strictly higher bucket.
+        
+        Args:
+            scores: Query scores
+        
+        Returns:
+            Integer array of counts
+        """
+        return self.count - self._prefix(self._tree, self.bucket(scores) + 1)
+    
+    def _greater_in_bucket(self, scores: np.ndarray, distinct: bool) -> np.ndarray:
+        """Members in each query's own bucket with a strictly higher exact score."""
+        buckets = self.bucket(scores)
+        counts = np.zeros(len(scores), dtype=np.int64)
+        order = np.argsort(buckets, kind='stable')
+        groups = np.flatnonzero(np.diff(buckets[order])) + 1
+        for group in np.split(order, groups):
+            if group.size == 0:
+                continue
+            _, member_scores = self.members(int(buckets[group[0]]))
+            ascending = np.unique(member_scores) if distinct else member_scores[::-1]
+            counts[group] = len(ascending) - np.searchsorted(ascending, scores[group], side='right')
+        return counts
+    
+    def _greater_bulk(self, scores: np.ndarray, distinct: bool) -> np.ndarray:
+        """Exact counts of higher (distinct) scores from one sorted pass over all items."""
+        _, live = self._live_members()
+        ascending = np.unique(live) if distinct else np.sort(live)
+        return len(ascending) - np.searchsorted(ascending, scores, side='right')
+    
+    def rank(self, scores: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Competition rank of each score (1 + number of higher scores).
+        
+        Exact for keyed indexes, to within one bucket otherwise.
+        
+        Args:
+            scores: Query scores
+        
+        Returns:
+            Integer array of ranks
+        """
+        if not self.tracks_keys:
+            return self.count_above(scores) + 1
+        
+        scores = np.atleast_1d(np.asarray(scores, dtype=float))
+        if len(scores) > self.BULK_QUERY_SIZE:
+            return self._greater_bulk(scores, distinct=False) + 1
+        return self.count_above(scores) + self._greater_in_bucket(scores, distinct=False) + 1
+    
+    def dense_rank(self, scores: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Dense rank of each score (1 + number of distinct higher scores).
+        
+        Exact for keyed indexes, to within one bucket otherwise.
+        
+        Args:
+            scores: Query scores
+        
+        Returns:
+            Integer array of ranks
+        """
+        scores = np.atleast_1d(np.asarray(scores, dtype=float))
+        if self.tracks_keys and len(scores) > self.BULK_QUERY_SIZE:
+            return self._greater_bulk(scores, distinct=True) + 1
+        
+        distinct = self._prefix(self._distinct_tree, np.array([self.resolution]))[0]
+        ranks = distinct - self._prefix(self._distinct_tree, self.bucket(scores) + 1) + 1
+        if self.tracks_keys:
+            ranks += self._greater_in_bucket(scores, distinct=True)
+        return ranks
+    
+    def kth_bucket(self, k: int) -> int:
+        """
+        Bucket of the k-th highest score (k = 1 is the highest).
+        
+        Args:
+            k: 1-based position from the top
+        
+        Returns:
+            Bucket number
+        """
+        if not 1 <= k <= self.count:
+            raise IndexError(f"k must be between 1 and {self.count}, got {k}")
+        
+        # Binary lifting for the (count - k + 1)-th smallest item
+        target = self.count - k + 1
+        position = 0
+        step = self._top_bit
+        while step:
+            nxt = position + step
+            if nxt <= self.resolution and self._tree[nxt] < target:
+                position = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return position
+    
+    def kth_key(self, k: int) -> Tuple[int, float]:
+        """
+        Key and score of the k-th highest item (k = 1 is the highest).
+        
+        Args:
+            k: 1-based position from the top
+        
+        Returns:
+            Tuple of (key, score)
+        """
+        bucket = self.kth_bucket(k)
+        keys, scores = self.members(bucket)
+        offset = k - 1 - int(self.count_above(self.bucket_floor(bucket))[0])
+        return int(keys[offset]), float(scores[offset])
+    
+    def top(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Keys and scores of the N highest items, in order.
+        
+        Walks buckets from the top, so the cost grows with N rather than
+        with the number of indexed items.
+        
+        Args:
+            n: Number of items
+        
+        Returns:
+            Tuple of (keys, scores) arrays
+        """
+        n = min(n, self.count)
+        keys, scores = [np.empty(0, dtype=np.int64)], [np.empty(0)]
+        taken = 0
+        while taken < n:
+            bucket_keys, bucket_scores = self.members(self.kth_bucket(taken + 1))
+            keys.append(bucket_keys)
+            scores.append(bucket_scores)
+            taken += len(bucket_keys)
+        
+        return np.concatenate(keys)[:n], np.concatenate(scores)[:n]
+    
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """
+        Score quantiles (linear interpolation, as np.quantile).
+        
+        Keyed indexes interpolate between the exact neighbouring order
+        statistics with np.quantile's own arithmetic, so thresholds are
+        identical. Without keys, each quantile is the lower edge of the
+        bucket holding the order statistic just above the interpolation
+        point, so counting scores at or above it matches np.quantile
+        thresholds up to bucket ties.
+        
+        Args:
+            qs: Quantiles in [0, 1]
+        
+        Returns:
+            Array of quantile values
+        """
+        if self.count == 0:
+            raise ValueError("No scores indexed.")
+        
+        qs = np.asarray(qs, dtype=float)
+        if self.tracks_keys:
+            # Virtual index and lerp of numpy's 'linear' method
+            virtual = self.count * qs + (1 - qs) - 1
+            lower = np.clip(np.floor(virtual), 0, self.count - 1).astype(np.int64)
+            upper = np.minimum(lower + 1, self.count - 1)
+            gamma = virtual - np.floor(virtual)
+            
+            below = np.array([self.kth_key(self.count - int(p))[1] for p in lower])
+            above = np.array([self.kth_key(self.count - int(p))[1] for p in upper])
+            diff = above - below
+            return np.where(gamma >= 0.5, above - diff * (1 - gamma), below + diff * gamma)
+        
+        # Upper order statistic of the linear interpolation (no score lies
+        # strictly between it and the interpolated value)
+        positions = np.ceil(qs * (self.count - 1)).astype(np.int64)
+        buckets = [self.kth_bucket(self.count - int(p)) for p in positions]
+        return self.bucket_floor(buckets)
+    
+    def level_counts(self, thresholds: Sequence[float]) -> np.ndarray:
+        """
+        Counts between ascending score thresholds.
+        
+        A score equal to a threshold counts towards the level above it, as
+        with searchsorted(side='right'). Without keys, so does any score in
+        the same bucket as the threshold.
+        
+        Args:
+            thresholds: Ascending level thresholds
+        
+        Returns:
+            Counts per level, lowest level first
+        """
+        thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        below = self._prefix(self._tree, self.bucket(thresholds))
+        if self.tracks_keys:
+            # Members of the threshold's own bucket that lie below it
+            for i, (bucket, threshold) in enumerate(zip(self.bucket(thresholds).tolist(), thresholds.tolist())):
+                _, member_scores = self.members(bucket)
+                below[i] += np.count_nonzero(member_scores < threshold)
+        return np.diff(np.concatenate([[0], below, [self.count]]))
+    
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,370 @@
+"""
+Route Batching
+Priority-weighted visit sequences for field agents
+
+The top ranked open complaints of each department are split among its agents
+and ordered into routes that reach high-priority stops early. Stops are laid
+out along a Hilbert curve, so each agent gets a contiguous, compact stretch
+of it; stretches longer than MAX_ROUTE_STOPS are routed in consecutive chunks
+so no distance matrix grows beyond a chunk. Each chunk is routed by a
+priority-weighted nearest-neighbour tour improved with 2-opt moves, where the
+objective is the weighted latency: the sum over stops of priority times the
+distance travelled before reaching the stop.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from spatial import haversine_m
+from workload import AGENT_COLUMNS
+
+
+# Stops routed together with one dense distance matrix
+MAX_ROUTE_STOPS = 150
+
+# Upper bound on improving 2-opt moves per chunk, as a multiple of its stops
+MAX_2OPT_MOVES_PER_STOP = 10
+
+# Bits per axis of the Hilbert curve used to order stops
+HILBERT_ORDER = 16
+
+ROUTE_COLUMNS = ['agent_id', 'department', 'visit_order', 'leg_m', 'cumulative_m']
+
+
+def hilbert_index(x: np.ndarray, y: np.ndarray, order: int = HILBERT_ORDER) -> np.ndarray:
+    """
+    Position of grid points along a Hilbert curve.
+    
+    Args:
+        x: Integer x coordinates in [0, 2^order)
+        y: Integer y coordinates in [0, 2^order)
+        order: Bits per axis
+    
+    Returns:
+        Array of curve positions (int64)
+    """
+    x = np.asarray(x, dtype=np.int64).copy()
+    y = np.asarray(y, dtype=np.int64).copy()
+    side = 1 << order
+    d = np.zeros(len(x), dtype=np.int64)
+    
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    
+    return d
+
+
+def spatial_order(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Order points along a Hilbert curve over their bounding box.
+    
+    Args:
+        latitudes: Point latitudes in degrees
+        longitudes: Point longitudes in degrees
+    
+    Returns:
+        Permutation of point positions (ties in input order)
+    """
+    lat = np.asarray(latitudes, dtype=float)
+    lon = np.asarray(longitudes, dtype=float)
+    if not len(lat):
+        return np.empty(0, dtype=np.int64)
+    
+    # Equirectangular projection keeps the box roughly square on the ground
+    x = lon * np.cos(np.radians(lat.mean()))
+    y = lat
+    extent = max(np.ptp(x), np.ptp(y)) or 1.0
+    scale = ((1 << HILBERT_ORDER) - 1) / extent
+    cells_x = ((x - x.min()) * scale).astype(np.int64)
+    cells_y = ((y - y.min()) * scale).astype(np.int64)
+    
+    return np.argsort(hilbert_index(cells_x, cells_y), kind='stable')
+
+
+def weighted_latency(route: np.ndarray, distances: np.ndarray, weights: np.ndarray) -> float:
+    """
+    Sum of weight times distance travelled before each stop.
+    
+    Args:
+        route: Node sequence starting at the start node
+        distances: Distance matrix between nodes
+        weights: Weight per node (the start node should weigh 0)
+    
+    Returns:
+        Weighted latency of the route
+    """
+    arrival = np.concatenate([[0.0], np.cumsum(distances[route[:-1], route[1:]])])
+    return float(weights[route] @ arrival)
+
+
+def two_opt(route: np.ndarray, distances: np.ndarray, weights: np.ndarray,
+            max_moves: Optional[int] = None) -> np.ndarray:
+    """
+    Improve an open route by reversing segments, best move first.
+    
+    The route's first node stays fixed. A reversal of positions a+1..b
+    changes the arrival of each reversed stop k from t_k to
+    t_a + d(a, b) + t_b - t_k and shifts every later stop by the change in
+    route length, so with prefix sums of weights and weighted arrivals all
+    O(n^2) moves are scored at once.
+    
+    Args:
+        route: Node sequence starting at the start node
+        distances: Symmetric distance matrix between nodes
+        weights: Weight per node
+        max_moves: Maximum number of moves applied (defaults to
+                   MAX_2OPT_MOVES_PER_STOP per stop)
+    
+    Returns:
+        Improved route
+    """
+    route = np.asarray(route).copy()
+    m = len(route) - 1
+    if m < 2:
+        return route
+    if max_moves is None:
+        max_moves = MAX_2OPT_MOVES_PER_STOP * m
+    
+    a, b = np.triu_indices(m + 1, k=2)
+    for _ in range(max_moves):
+        legs = distances[route[:-1], route[1:]]
+        arrival = np.concatenate([[0.0], np.cumsum(legs)])
+        w = weights[route]
+        weight_prefix = np.concatenate([[0.0], np.cumsum(w)])
+        weighted_prefix = np.concatenate([[0.0], np.cumsum(w * arrival)])
+        
+        segment_weight = weight_prefix[b + 1] - weight_prefix[a + 1]
+        segment_weighted = weighted_prefix[b + 1] - weighted_prefix[a + 1]
+        new_first = distances[route[a], route[b]]
+        
+        # Route length change, with no closing edge when b is the last stop
+        following = route[np.minimum(b + 1, m)]
+        closing = np.where(b < m, distances[route[a + 1], following] - distances[route[b], following], 0.0)
+        length_change = new_first + closing - legs[a]
+        
+        delta = (segment_weight * (arrival[a] + new_first + arrival[b]) - 2 * segment_weighted
+                 + (weight_prefix[-1] - weight_prefix[b + 1]) * length_change)
+        
+        best = int(np.argmin(delta))
+        if delta[best] >= -1e-9 * max(abs(weighted_prefix[-1]), 1.0):
+            break
+        route[a[best] + 1:b[best] + 1] = route[a[best] + 1:b[best] + 1][::-1].copy()
+    
+    return route
+
+
+def nearest_neighbour_route(distances: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Greedy route from node 0, always to the stop with least distance per unit of weight.
+    
+    Args:
+        distances: Distance matrix between nodes (node 0 is the start)
+        weights: Positive weight per stop (node 0 ignored)
+    
+    Returns:
+        Node sequence starting at 0
+    """
+    m = len(distances)
+    visited = np.zeros(m, dtype=bool)
+    visited[0] = True
+    route = [0]
+    
+    for _ in range(m - 1):
+        cost = (distances[route[-1]] + 1.0) / weights
+        cost[visited] = np.inf
+        nxt = int(np.argmin(cost))
+        route.append(nxt)
+        visited[nxt] = True
+    
+    return np.asarray(route)
+
+
+def route_stops(latitudes: np.ndarray, longitudes: np.ndarray, weights: np.ndarray,
+                start: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    """
+    Priority-weighted visit order of one batch of stops.
+    
+    Args:
+        latitudes: Stop latitudes
+        longitudes: Stop longitudes
+        weights: Positive priority weight per stop
+        start: Optional (latitude, longitude) the agent sets out from; without
+               it the route may begin at any stop
+    
+    Returns:
+        Permutation of stop positions in visit order
+    """
+    lat = np.asarray(latitudes, dtype=float)
+    lon = np.asarray(longitudes, dtype=float)
+    if len(lat) <= 1:
+        return np.arange(len(lat))
+    
+    distances = np.zeros((len(lat) + 1, len(lat) + 1))
+    distances[1:, 1:] = haversine_m(lat[:, np.newaxis], lon[:, np.newaxis], lat, lon)
+    if start is not None:
+        # Node 0 is the start location; otherwise a free start at distance 0
+        distances[0, 1:] = distances[1:, 0] = haversine_m(start[0], start[1], lat, lon)
+    
+    node_weights = np.concatenate([[0.0], np.maximum(np.asarray(weights, dtype=float), 1e-9)])
+    route = nearest_neighbour_route(distances, np.where(node_weights > 0, node_weights, 1.0))
+    route = two_opt(route, distances, node_weights)
+    return route[1:] - 1
+
+
+class RoutePlanner:
+    """
+    Route batching of top-priority complaints across field agents.
+    """
+    
+    def __init__(self, agents: Optional[pd.DataFrame] = None, agents_per_department: int = 1,
+                 start: Optional[Tuple[float, float]] = None):
+        """
+        Initialize the planner with the available agents.
+        
+        Args:
+            agents: DataFrame with agent_id, department and capacity; each
+                    agent's share of its department's stops follows capacity
+            agents_per_department: Agents per department when no agents are given
+            start: Optional (latitude, longitude) every route sets out from
+        """
+        if agents is not None:
+            missing_cols = [col for col in AGENT_COLUMNS if col not in agents.columns]
+            if missing_cols:
+                raise ValueError(f"Missing agent columns: {missing_cols}")
+            agents = agents[AGENT_COLUMNS].reset_index(drop=True)
+        if agents_per_department < 1:
+            raise ValueError(f"Need at least one agent per department, got {agents_per_department}")
+        
+        self.agents = agents
+        self.agents_per_department = agents_per_department
+        self.start = start
+        self.routes = None
+        self.unrouted = None
+    
+    def _department_agents(self, department: str) -> Tuple[list, np.ndarray]:
+        """Agent ids and capacity shares of one department."""
+        if self.agents is None:
+            ids = [f"{department}-{i + 1}" for i in range(self.agents_per_department)]
+            return ids, np.ones(len(ids))
+        
+        staff = self.agents[(self.agents['department'] == department) & (self.agents['capacity'] > 0)]
+        return staff['agent_id'].tolist(), staff['capacity'].to_numpy(dtype=float)
+    
+    def plan(self, complaints_df: pd.DataFrame, top_k: int = 20) -> pd.DataFrame:
+        """
+        Build routes for the top K complaints of every department.
+        
+        Args:
+            complaints_df: Ranked complaints with priority_score, department,
+                           latitude and longitude (highest priority first)
+            top_k: Stops per department
+        
+        Returns:
+            Routed complaints ordered by agent and visit_order, with agent_id,
+            visit_order, leg_m and cumulative_m
+        """
+        missing_cols = [col for col in ['priority_score', 'department', 'latitude', 'longitude']
+                        if col not in complaints_df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing columns: {missing_cols}")
+        
+        ranked = complaints_df.sort_values('priority_score', ascending=False, kind='stable')
+        top = ranked.groupby('department', sort=False).head(top_k)
+        
+        lat = pd.to_numeric(top['latitude'], errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(top['longitude'], errors='coerce').to_numpy(dtype=float)
+        located = ~(np.isnan(lat) | np.isnan(lon))
+        self.unrouted = top[~located]
+        top, lat, lon = top[located], lat[located], lon[located]
+        priority = top['priority_score'].to_numpy(dtype=float)
+        departments = top['department'].to_numpy()
+        
+        frames = []
+        for department in pd.unique(departments):
+            rows = np.flatnonzero(departments == department)
+            agent_ids, shares = self._department_agents(department)
+            if not agent_ids:
+                self.unrouted = pd.concat([self.unrouted, top.iloc[rows]])
+                continue
+            
+            # Contiguous stretches of the Hilbert order, sized by capacity share
+            rows = rows[spatial_order(lat[rows], lon[rows])]
+            bounds = np.round(np.concatenate([[0], np.cumsum(shares)]) / shares.sum() * len(rows)).astype(int)
+            
+            for agent_id, begin, end in zip(agent_ids, bounds[:-1], bounds[1:]):
+                stretch = rows[begin:end]
+                if not len(stretch):
+                    continue
+                sequence, start = [], self.start
+                for chunk_begin in range(0, len(stretch), MAX_ROUTE_STOPS):
+                    chunk = stretch[chunk_begin:chunk_begin + MAX_ROUTE_STOPS]
+                    chunk = chunk[route_stops(lat[chunk], lon[chunk], priority[chunk], start)]
+                    sequence.append(chunk)
+                    start = (lat[chunk[-1]], lon[chunk[-1]])
+                sequence = np.concatenate(sequence)
+                
+                legs = haversine_m(lat[sequence[:-1]], lon[sequence[:-1]], lat[sequence[1:]], lon[sequence[1:]])
+                first_leg = 0.0 if self.start is None else float(
+                    haversine_m(self.start[0], self.start[1], lat[sequence[0]], lon[sequence[0]]))
+                legs = np.concatenate([[first_leg], legs])
+                
+                frame = top.iloc[sequence].copy()
+                frame['agent_id'] = agent_id
+                frame['visit_order'] = np.arange(1, len(sequence) + 1)
+                frame['leg_m'] = legs
+                frame['cumulative_m'] = np.cumsum(legs)
+                frames.append(frame)
+        
+        columns = ROUTE_COLUMNS + [col for col in top.columns if col not in ROUTE_COLUMNS]
+        self.routes = pd.concat(frames)[columns] if frames else pd.DataFrame(columns=columns)
+        return self.routes
+    
+    def get_route_summary(self) -> pd.DataFrame:
+        """
+        Length and priority-weighted latency of every agent's route.
+        
+        Returns:
+            DataFrame with agent_id, department, stops, route_m and
+            weighted_latency (sum of priority_score x cumulative_m)
+        """
+        if self.routes is None:
+            raise ValueError("No routes. Run plan first.")
+        
+        routes = self.routes.assign(weighted=self.routes['priority_score'] * self.routes['cumulative_m'])
+        return routes.groupby(['agent_id', 'department'], sort=False).agg(
+            stops=('visit_order', 'size'),
+            route_m=('cumulative_m', 'max'),
+            weighted_latency=('weighted', 'sum'),
+        ).reset_index()
+
+
+if __name__ == "__main__":
+    # Example usage
+    from data_loader import ComplaintDataLoader
+    from prioritizer import ComplaintPrioritizer
+    
+    loader = ComplaintDataLoader()
+    loader.load_from_csv('../data/sample_complaints.csv')
+    enriched = loader.enrich_complaint_data()
+    
+    prioritizer = ComplaintPrioritizer()
+    prioritizer.load_default_weights()
+    ranked = prioritizer.prioritize_complaints(enriched)
+    
+    planner = RoutePlanner(agents_per_department=2)
+    routes = planner.plan(ranked[ranked['status'] != 'resolved'], top_k=6)
+    print(planner.get_route_summary().round(1).to_string(index=False))
+    print()
+    print(routes[['agent_id', 'visit_order', 'id', 'location_name', 'priority_score', 'cumulative_m']]
+          .head(12).round(3).to_string(index=False))
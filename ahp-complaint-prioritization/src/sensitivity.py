@@ -0,0 +1,245 @@
+"""
+Sensitivity Analysis
+One-at-a-time sweeps of criteria weights and rank-reversal detection
+
+Each sweep fixes one criterion's weight at every point of a grid and rescales
+the remaining weights proportionally so they still sum to 1. Because every
+priority score is linear in the swept weight, the weight at which two
+complaints swap places can be solved exactly rather than read off the grid.
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+from uncertainty import competition_ranks
+
+
+DEFAULT_GRID = np.linspace(0.0, 1.0, 21)
+
+
+def sweep_weights(base_weights: np.ndarray, index: int, grid: Sequence[float]) -> np.ndarray:
+    """
+    Weight vectors with one criterion fixed at each grid value.
+    
+    Args:
+        base_weights: Baseline criteria weights (sum to 1)
+        index: Position of the swept criterion
+        grid: Weights to assign to the swept criterion
+    
+    Returns:
+        Array of shape (grid points, criteria)
+    """
+    base_weights = np.asarray(base_weights, dtype=float)
+    grid = np.asarray(grid, dtype=float)
+    
+    others = base_weights.copy()
+    others[index] = 0.0
+    if others.sum() > 0:
+        others /= others.sum()
+    else:
+        others = np.full(len(base_weights), 1.0 / (len(base_weights) - 1))
+        others[index] = 0.0
+    
+    weights = (1.0 - grid)[:, np.newaxis] * others
+    weights[:, index] = grid
+    return weights
+
+
+def _sweep_criterion(scores: np.ndarray, base_weights: np.ndarray, index: int,
+                     grid: np.ndarray, tracked: np.ndarray, top_k: int):
+    """
+    Score every complaint at every grid point of one criterion.
+    
+    Module-level so it can run in a worker process.
+    
+    Returns:
+        Tuple of (tracked scores, tracked ranks, top-K retained count), the
+        first two of shape (grid points, tracked complaints)
+    """
+    priority = sweep_weights(base_weights, index, grid) @ scores.T
+    ranks = competition_ranks(priority)
+    
+    tracked_ranks = ranks[:, tracked]
+    retained = (tracked_ranks[:, :top_k] <= top_k).sum(axis=1)
+    return priority[:, tracked], tracked_ranks, retained
+
+
+class SensitivityAnalyzer:
+    """
+    One-at-a-time sensitivity analysis of AHP criteria weights.
+    """
+    
+    def __init__(self, criteria: List[str], base_weights: np.ndarray):
+        """
+        Initialize the analyzer.
+        
+        Args:
+            criteria: List of criteria names
+            base_weights: Baseline criteria weights, e.g. AHPCore.weights
+        """
+        if len(criteria) != len(base_weights):
+            raise ValueError("criteria and base_weights must have the same length.")
+        
+        self.criteria = list(criteria)
+        self.base_weights = np.asarray(base_weights, dtype=float)
+        
+        self.results = None
+        self.reversals = None
+    
+    def run(self, criteria_scores: np.ndarray, ids: Optional[Sequence] = None, top_k: int = 10,
+            grid: Sequence[float] = DEFAULT_GRID, n_jobs: int = 1) -> pd.DataFrame:
+        """
+        Sweep every criterion and track the baseline top-K complaints.
+        
+        Args:
+            criteria_scores: Array of shape (complaints, criteria)
+            ids: Optional complaint identifiers (defaults to row positions)
+            top_k: Number of baseline top complaints to track
+            grid: Weights to assign to the swept criterion
+            n_jobs: Worker processes for the sweeps (1 runs in-process)
+        
+        Returns:
+            Long DataFrame with one row per criterion, grid point and tracked
+            complaint: criterion, weight, id, baseline_rank, priority_score,
+            priority_rank and top_k_retained
+        """
+        scores = np.asarray(criteria_scores, dtype=float)
+        if scores.ndim != 2 or scores.shape[1] != len(self.criteria):
+            raise ValueError(f"Expected criteria scores of shape (complaints, {len(self.criteria)})")
+        
+        ids = np.arange(len(scores)) if ids is None else np.asarray(ids)
+        grid = np.asarray(grid, dtype=float)
+        top_k = min(top_k, len(scores))
+        
+        baseline = scores @ self.base_weights
+        tracked = np.argsort(-baseline, kind='stable')[:top_k]
+        baseline_ranks = competition_ranks(baseline[np.newaxis])[0, tracked]
+        
+        jobs = [(scores, self.base_weights, i, grid, tracked, top_k) for i in range(len(self.criteria))]
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                sweeps = list(executor.map(_sweep_criterion, *zip(*jobs)))
+        else:
+            sweeps = [_sweep_criterion(*job) for job in jobs]
+        
+        frames = []
+        for criterion, (priority, ranks, retained) in zip(self.criteria, sweeps):
+            frames.append(pd.DataFrame({
+                'criterion': criterion,
+                'weight': np.repeat(grid, top_k),
+                'id': np.tile(ids[tracked], len(grid)),
+                'baseline_rank': np.tile(baseline_ranks, len(grid)),
+                'priority_score': priority.ravel(),
+                'priority_rank': ranks.ravel(),
+                'top_k_retained': np.repeat(retained, top_k)
+            }))
+        
+        self.results = pd.concat(frames, ignore_index=True)
+        self.reversals = self._find_rank_reversals(scores, ids, tracked, grid)
+        return self.results
+    
+    def run_complaints(self, complaints_df: pd.DataFrame, score_columns: List[str],
+                       **kwargs) -> pd.DataFrame:
+        """
+        Run the sweeps on the criteria score columns of a complaints DataFrame.
+        
+        Args:
+            complaints_df: DataFrame with criteria score columns
+            score_columns: Score columns in criteria order
+            **kwargs: Passed to run
+        
+        Returns:
+            Sweep results DataFrame (see run)
+        """
+        missing_cols = [col for col in score_columns if col not in complaints_df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing criteria columns: {missing_cols}")
+        
+        ids = complaints_df['id'] if 'id' in complaints_df.columns else complaints_df.index
+        return self.run(complaints_df[score_columns].to_numpy(dtype=float), ids=ids, **kwargs)
+    
+    def _find_rank_reversals(self, scores: np.ndarray, ids: np.ndarray,
+                             tracked: np.ndarray, grid: np.ndarray) -> pd.DataFrame:
+        """
+        Exact weights at which pairs of tracked complaints swap order.
+        
+        With the swept weight g, score(g) = g * s_i + (1 - g) * o, where o is
+        the complaint's score under the renormalized remaining weights, so the
+        crossing point of two complaints solves a linear equation.
+        
+        Returns:
+            DataFrame of criterion, higher_id, lower_id, base_weight,
+            reversal_weight and weight_change, smallest changes first
+        """
+        first, second = np.triu_indices(len(tracked), 1)
+        higher, lower = tracked[first], tracked[second]
+        
+        frames = []
+        for index, criterion in enumerate(self.criteria):
+            # Scores at g = 0 (others only) and g = 1 (swept criterion only)
+            at_zero, at_one = (sweep_weights(self.base_weights, index, [0.0, 1.0]) @ scores.T)
+            
+            diff_zero = at_zero[higher] - at_zero[lower]
+            diff_one = at_one[higher] - at_one[lower]
+            slope = diff_one - diff_zero
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                crossing = -diff_zero / slope
+            
+            # Crossings at a grid end are ties there, not reversals
+            found = (slope != 0) & (crossing > grid.min()) & (crossing < grid.max())
+            found &= ~np.isclose(crossing, grid.min()) & ~np.isclose(crossing, grid.max())
+            found &= ~np.isclose(crossing, self.base_weights[index])
+            
+            frames.append(pd.DataFrame({
+                'criterion': criterion,
+                'higher_id': ids[higher[found]],
+                'lower_id': ids[lower[found]],
+                'base_weight': self.base_weights[index],
+                'reversal_weight': crossing[found],
+                'weight_change': crossing[found] - self.base_weights[index]
+            }))
+        
+        reversals = pd.concat(frames, ignore_index=True)
+        order = np.argsort(reversals['weight_change'].abs().to_numpy(), kind='stable')
+        return reversals.iloc[order].reset_index(drop=True)
+    
+    def get_critical_changes(self) -> pd.DataFrame:
+        """
+        Smallest weight change per criterion that reorders the tracked complaints.
+        
+        Returns:
+            DataFrame indexed by criterion with the closest reversal in each
+            direction (NaN where none falls inside the grid)
+        """
+        if self.reversals is None:
+            raise ValueError("Run the sensitivity sweep first.")
+        
+        changes = self.reversals['weight_change']
+        increase = changes.where(changes > 0).groupby(self.reversals['criterion']).min()
+        decrease = changes.where(changes < 0).groupby(self.reversals['criterion']).max()
+        
+        return pd.DataFrame({
+            'base_weight': pd.Series(self.base_weights, index=self.criteria),
+            'increase_to_reverse': increase,
+            'decrease_to_reverse': decrease
+        }, index=pd.Index(self.criteria, name='criterion'))
+    
+    def export_results(self, output_path: str):
+        """
+        Export sweep results and rank reversals to CSV.
+        
+        The reversals are written next to output_path with a _reversals suffix.
+        
+        Args:
+            output_path: Path for the sweep results CSV
+        """
+        if self.results is None:
+            raise ValueError("Run the sensitivity sweep first.")
+        
+        output_path = Path(output_path)
+        self.results.to_csv(output_path, index=False)
+        self.reversals.to_csv(output_path.with_name(output_path.stem + '_reversals.csv'), index=False)
+        print(f"[OK] Sensitivity analysis exported to {output_path}")
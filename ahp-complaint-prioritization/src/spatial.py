@@ -0,0 +1,351 @@
+"""
+Spatial Analysis
+Grid index and hotspot statistics over complaint coordinates
+
+Complaints are bucketed once into square grid cells and stored sorted by cell,
+so the complaints of a cell are one contiguous slice. A radius query only
+compares complaints in cells close enough to hold neighbours, one batch of
+cell pairs at a time, which keeps the work proportional to the number of
+nearby pairs instead of all n^2 pairs. Neighbourhood sums over those pairs
+give Getis-Ord Gi* z-scores of priority, which flag clusters of high-priority
+complaints (hotspots) and can feed back into the ranking as a criterion.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+from typing import Iterator, Optional, Tuple
+
+
+EARTH_RADIUS_M = 6_371_000.0
+
+# Great-circle meters per degree of latitude; grid offsets measured with it
+# never exceed the haversine distance between two points
+ARC_METERS_PER_DEGREE = np.pi * EARTH_RADIUS_M / 180
+
+# Longitude cells are sized at the highest latitude plus this margin, which
+# covers great circles bulging poleward between two points
+LATITUDE_MARGIN_DEG = 1.0
+
+# Default hotspot neighbourhood radius and grid cell size (radius queries
+# are fastest with cells of about half the radius)
+DEFAULT_HOTSPOT_RADIUS_M = 500.0
+DEFAULT_CELL_M = 250.0
+
+# Maximum number of candidate pairs compared per batch
+PAIR_BLOCK = 1 << 20
+
+KERNELS = ('uniform', 'epanechnikov')
+
+
+def haversine_m(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distance in meters between coordinate arrays.
+    
+    Args:
+        lat1, lon1: Latitudes and longitudes of the first points (degrees)
+        lat2, lon2: Latitudes and longitudes of the second points (degrees)
+    
+    Returns:
+        Array of distances in meters
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(values, dtype=float)) for values in (lat1, lon1, lat2, lon2))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+class SpatialGridIndex:
+    """
+    Points bucketed into square grid cells for radius queries.
+    """
+    
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, cell_m: float = DEFAULT_CELL_M,
+                 groups: Optional[np.ndarray] = None):
+        """
+        Build the index.
+        
+        Args:
+            latitudes: Point latitudes in degrees (NaN = no location)
+            longitudes: Point longitudes in degrees (NaN = no location)
+            cell_m: Grid cell side in meters; queries are fastest with a
+                    radius of about two cells
+            groups: Optional label per point (e.g. complaint type); points
+                    are only neighbours of points with the same label
+        
+        Points without coordinates are kept in the row numbering but never
+        returned by queries.
+        """
+        if cell_m <= 0:
+            raise ValueError(f"Cell size must be positive, got {cell_m}")
+        
+        lat = np.asarray(latitudes, dtype=float)
+        lon = np.asarray(longitudes, dtype=float)
+        if lat.shape != lon.shape or lat.ndim != 1:
+            raise ValueError("Latitudes and longitudes must be 1-D arrays of equal length.")
+        
+        self.n = len(lat)
+        self.cell_m = float(cell_m)
+        self.valid = ~(np.isnan(lat) | np.isnan(lon))
+        points = np.flatnonzero(self.valid)
+        
+        max_lat = min(float(np.abs(lat[points]).max(initial=0.0)) + LATITUDE_MARGIN_DEG, 89.9)
+        cos_lat = np.cos(np.radians(max_lat))
+        cell_y = np.floor(lat[points] * ARC_METERS_PER_DEGREE / self.cell_m).astype(np.int64)
+        cell_x = np.floor(lon[points] * ARC_METERS_PER_DEGREE * cos_lat / self.cell_m).astype(np.int64)
+        if len(points):
+            cell_x -= cell_x.min()
+            cell_y -= cell_y.min()
+        self._span_x = int(cell_x.max(initial=-1)) + 1
+        self._span_y = int(cell_y.max(initial=-1)) + 1
+        
+        # Each group gets its own copy of the grid (missing labels form one group)
+        group_codes = np.zeros(len(points), dtype=np.int64)
+        if groups is not None:
+            if len(groups) != self.n:
+                raise ValueError(f"Expected {self.n} group labels, got {len(groups)}")
+            group_codes = pd.factorize(pd.Series(groups).iloc[points])[0].astype(np.int64) + 1
+        
+        # CSR layout: rows sorted by cell, with the slice of each occupied cell
+        codes = (group_codes * self._span_x + cell_x) * self._span_y + cell_y
+        order = np.argsort(codes, kind='stable')
+        self.order = points[order]
+        self.cells, counts = np.unique(codes[order], return_counts=True)
+        self.starts = np.concatenate([[0], np.cumsum(counts)])
+        
+        # Unit vectors in cell order give distances from a chord length,
+        # without trigonometry per pair and with mostly local memory access
+        phi, lam = np.radians(lat[self.order]), np.radians(lon[self.order])
+        self._unit = (np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi))
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cell_m: float = DEFAULT_CELL_M,
+                   group_column: Optional[str] = None) -> 'SpatialGridIndex':
+        """
+        Index the latitude and longitude columns of a DataFrame.
+        
+        Args:
+            df: DataFrame with latitude and longitude columns
+            cell_m: Grid cell side in meters
+            group_column: Optional column whose values must match for two
+                          rows to be neighbours (e.g. 'type')
+        
+        Returns:
+            SpatialGridIndex over the rows of df, in row order
+        """
+        missing_cols = [col for col in ['latitude', 'longitude', group_column]
+                        if col is not None and col not in df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing columns: {missing_cols}")
+        
+        return cls(pd.to_numeric(df['latitude'], errors='coerce').to_numpy(dtype=float),
+                   pd.to_numeric(df['longitude'], errors='coerce').to_numpy(dtype=float), cell_m,
+                   None if group_column is None else df[group_column].to_numpy())
+    
+    def _cell_pairs(self, radius_m: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions (in self.cells) of the pairs of occupied cells that can hold
+        neighbours, each unordered pair once (a cell is paired with itself).
+        """
+        ring = int(np.ceil(radius_m / self.cell_m))
+        group_x, cell_y = np.divmod(self.cells, self._span_y)
+        cell_x = group_x % self._span_x
+        
+        # Half of the offsets; the mirrored offsets are covered from the other cell
+        offsets = [(dx, dy) for dx in range(ring + 1) for dy in range(-ring, ring + 1) if dx > 0 or dy >= 0]
+        
+        sources, targets = [], []
+        for dx, dy in offsets:
+            x, y = cell_x + dx, cell_y + dy
+            inside = np.flatnonzero((x < self._span_x) & (y >= 0) & (y < self._span_y))
+            code = (group_x[inside] + dx) * self._span_y + y[inside]
+            position = np.minimum(np.searchsorted(self.cells, code), len(self.cells) - 1)
+            found = self.cells[position] == code
+            sources.append(inside[found])
+            targets.append(position[found])
+        
+        return np.concatenate(sources), np.concatenate(targets)
+    
+    def query_pairs(self, radius_m: float) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        All ordered pairs of points within a radius, in batches.
+        
+        Every pair is returned in both directions, and every point is paired
+        with itself.
+        
+        Args:
+            radius_m: Maximum great-circle distance in meters
+        
+        Yields:
+            Tuples of (row i, row j, distance in meters) arrays
+        """
+        if radius_m < 0:
+            raise ValueError(f"Radius must be non-negative, got {radius_m}")
+        if not len(self.cells):
+            return
+        
+        # A chord shorter than this is an arc shorter than the radius
+        angle = min(radius_m / EARTH_RADIUS_M, np.pi)
+        max_chord_sq = (2 * np.sin(angle / 2)) ** 2
+        
+        sizes = np.diff(self.starts)
+        sources, targets = self._cell_pairs(radius_m)
+        pair_counts = sizes[sources] * sizes[targets]
+        batch_ends = np.cumsum(pair_counts)
+        
+        begin = 0
+        while begin < len(sources):
+            # Take cell pairs until the batch holds PAIR_BLOCK point pairs (at least one)
+            base = batch_ends[begin - 1] if begin else 0
+            end = max(int(np.searchsorted(batch_ends, base + PAIR_BLOCK, side='right')), begin + 1)
+            source, target = sources[begin:end], targets[begin:end]
+            counts = pair_counts[begin:end]
+            begin = end
+            
+            # Positions in cell order of every point pair of every cell pair
+            owner = np.repeat(np.arange(len(counts)), counts)
+            local = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+            row, column = np.divmod(local, sizes[target][owner])
+            i = self.starts[source][owner] + row
+            j = self.starts[target][owner] + column
+            
+            chord_sq = sum((axis[i] - axis[j]) ** 2 for axis in self._unit)
+            near = np.flatnonzero(chord_sq <= max_chord_sq)
+            distance = 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(np.sqrt(chord_sq[near]) / 2, 1.0))
+            
+            # Pairs across two cells were found once; add their mirror images
+            i, j = self.order[i[near]], self.order[j[near]]
+            cross = source[owner[near]] != target[owner[near]]
+            yield (np.concatenate([i, j[cross]]), np.concatenate([j, i[cross]]),
+                   np.concatenate([distance, distance[cross]]))
+    
+    def neighbourhood_sums(self, values: np.ndarray, radius_m: float,
+                           kernel: str = 'uniform') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Kernel-weighted sums over each point's neighbourhood (itself included).
+        
+        Args:
+            values: Array of shape (n,) or (n, k) in row order
+            radius_m: Neighbourhood radius in meters
+            kernel: 'uniform' (weight 1) or 'epanechnikov' (1 - (d / radius)^2)
+        
+        Returns:
+            Tuple of (sum of weights, weighted sum of values, sum of squared
+            weights) per row; rows without coordinates get zeros
+        """
+        if kernel not in KERNELS:
+            raise ValueError(f"Unknown kernel '{kernel}'. Available: {list(KERNELS)}")
+        
+        values = np.asarray(values, dtype=float)
+        if values.shape[0] != self.n:
+            raise ValueError(f"Expected {self.n} values, got {values.shape[0]}")
+        columns = values.reshape(self.n, -1)
+        
+        weight_sum = np.zeros(self.n)
+        squared_sum = np.zeros(self.n)
+        value_sum = np.zeros(columns.shape)
+        
+        for i, j, distance in self.query_pairs(radius_m):
+            if kernel == 'uniform':
+                weight = np.ones(len(i))
+            else:
+                weight = 1 - (distance / radius_m) ** 2 if radius_m > 0 else np.ones(len(i))
+            weight_sum += np.bincount(i, weights=weight, minlength=self.n)
+            squared_sum += np.bincount(i, weights=weight ** 2, minlength=self.n)
+            for column in range(columns.shape[1]):
+                value_sum[:, column] += np.bincount(i, weights=weight * columns[j, column], minlength=self.n)
+        
+        return weight_sum, value_sum.reshape(values.shape), squared_sum
+
+
+def getis_ord_gi(index: SpatialGridIndex, values: np.ndarray, radius_m: float,
+                 kernel: str = 'uniform') -> np.ndarray:
+    """
+    Getis-Ord Gi* z-score of each point's neighbourhood.
+    
+    Positive scores mean the values around a point are higher than the
+    study-wide mean by more than chance would explain (a hotspot); above
+    1.96 is significant at the 5% level.
+    
+    Args:
+        index: Spatial index of the points
+        values: Value per row (e.g. priority_score)
+        radius_m: Neighbourhood radius in meters
+        kernel: Neighbour weighting ('uniform' or 'epanechnikov')
+    
+    Returns:
+        Array of z-scores (NaN for rows without coordinates, 0 when the
+        statistic is undefined, e.g. for constant values)
+    """
+    values = np.asarray(values, dtype=float)
+    if not np.isfinite(values[index.valid]).all():
+        raise ValueError("Values must be finite for every point with coordinates.")
+    
+    x = values[index.valid]
+    n = len(x)
+    mean = x.mean() if n else 0.0
+    std = np.sqrt(max((x ** 2).mean() - mean ** 2, 0.0)) if n else 0.0
+    
+    weight_sum, value_sum, squared_sum = index.neighbourhood_sums(np.where(index.valid, values, 0.0),
+                                                                  radius_m, kernel)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = std * np.sqrt((n * squared_sum - weight_sum ** 2) / max(n - 1, 1))
+        z = (value_sum - mean * weight_sum) / spread
+    
+    z = np.where(np.isfinite(z), z, 0.0)
+    return np.where(index.valid, z, np.nan)
+
+
+def hotspot_scores(df: pd.DataFrame, values: Optional[np.ndarray] = None,
+                   radius_m: float = DEFAULT_HOTSPOT_RADIUS_M, kernel: str = 'uniform',
+                   index: Optional[SpatialGridIndex] = None) -> pd.Series:
+    """
+    Hotspot score on a 0-1 scale for use as a criterion.
+    
+    The score is the standard normal probability of the complaint's Gi*
+    z-score, so 0.5 is an average neighbourhood and 0.975 marks a
+    significant hotspot. Complaints without coordinates score 0.5.
+    
+    Args:
+        df: DataFrame with latitude and longitude columns
+        values: Value per row (defaults to df['priority_score'])
+        radius_m: Neighbourhood radius in meters
+        kernel: Neighbour weighting ('uniform' or 'epanechnikov')
+        index: Prebuilt index over the rows of df (built if not given)
+    
+    Returns:
+        Series of hotspot scores aligned with df
+    """
+    if values is None:
+        if 'priority_score' not in df.columns:
+            raise ValueError("No values given and no priority_score column to score.")
+        values = df['priority_score'].to_numpy(dtype=float)
+    if index is None:
+        index = SpatialGridIndex.from_frame(df, cell_m=radius_m / 2 if radius_m > 0 else DEFAULT_CELL_M)
+    elif index.n != len(df):
+        raise ValueError(f"Index covers {index.n} rows, DataFrame has {len(df)}")
+    
+    z = getis_ord_gi(index, values, radius_m, kernel)
+    return pd.Series(np.where(index.valid, ndtr(np.nan_to_num(z)), 0.5), index=df.index, name='hotspot_score')
+
+
+if __name__ == "__main__":
+    # Example usage
+    from data_loader import ComplaintDataLoader
+    from prioritizer import ComplaintPrioritizer
+    
+    loader = ComplaintDataLoader()
+    loader.load_from_csv('../data/sample_complaints.csv')
+    enriched = loader.enrich_complaint_data()
+    
+    prioritizer = ComplaintPrioritizer()
+    prioritizer.load_default_weights()
+    enriched['hotspot_score'] = hotspot_scores(enriched, prioritizer.calculate_priority_scores(enriched))
+    
+    print("Complaints in the strongest hotspots:")
+    print(enriched.nlargest(5, 'hotspot_score')[['id', 'title', 'hotspot_score']].to_string(index=False))
+    print()
+    
+    prioritizer.add_hotspot_criterion()
+    ranked = prioritizer.prioritize_complaints(enriched)
+    print(ranked.head(5)[['id', 'title', 'hotspot_score', 'priority_score']].to_string(index=False))
@@ -0,0 +1,235 @@
+"""
+Weight Uncertainty Analysis
+Monte Carlo perturbation of pairwise judgments and rank stability of complaints
+
+Each sample perturbs the Saaty-scale judgments of the comparison matrix,
+derives new criteria weights and re-ranks every complaint. Samples are
+processed in chunks so the (samples x complaints) score matrix never has to
+fit in memory at once.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from ahp_core import AHPCore
+
+
+def competition_ranks(scores: np.ndarray) -> np.ndarray:
+    """
+    Competition ranks (highest score = 1) for each row of a score matrix.
+    
+    Args:
+        scores: Array of shape (samples, complaints)
+    
+    Returns:
+        Integer array of ranks with the same shape
+    """
+    n = scores.shape[1]
+    order = np.argsort(-scores, axis=1, kind='stable')
+    sorted_scores = np.take_along_axis(scores, order, axis=1)
+    
+    # Start position of each run of tied scores
+    new_group = np.ones(sorted_scores.shape, dtype=bool)
+    new_group[:, 1:] = sorted_scores[:, 1:] != sorted_scores[:, :-1]
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(n), 0), axis=1)
+    
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, group_start + 1, axis=1)
+    return ranks
+
+
+class WeightUncertaintyAnalyzer:
+    """
+    Monte Carlo rank-stability analysis for AHP criteria weights.
+    """
+    
+    # Saaty scale as a ladder of steps: 1/9 ... 1/2, 1, 2 ... 9
+    SAATY_LADDER = AHPCore.SAATY_SCALE
+    
+    PERTURBATIONS = ('step', 'lognormal')
+    
+    def __init__(self, criteria: List[str], pairwise_comparisons: Dict[Tuple[str, str], float],
+                 perturbation: str = 'step', spread: float = 1, seed: Optional[int] = None):
+        """
+        Initialize the analyzer around a base set of judgments.
+        
+        Args:
+            criteria: List of criteria names
+            pairwise_comparisons: Base pairwise comparison values (1-9 scale)
+            perturbation: 'step' moves each judgment up to `spread` steps along
+                          the Saaty scale; 'lognormal' multiplies it by
+                          exp(N(0, spread))
+            spread: Maximum step count or log-normal sigma
+            seed: Optional random seed for reproducible samples
+        """
+        if perturbation not in self.PERTURBATIONS:
+            raise ValueError(f"Unknown perturbation '{perturbation}'. Use one of {self.PERTURBATIONS}")
+        
+        self.ahp = AHPCore(criteria)
+        self.base_matrix = self.ahp.create_comparison_matrix(pairwise_comparisons)
+        self.perturbation = perturbation
+        self.spread = spread
+        self.rng = np.random.default_rng(seed)
+        
+        self.sample_weights = None
+        self.sample_consistency = None
+        self.results = None
+    
+    @classmethod
+    def from_matrix(cls, criteria: List[str], comparison_matrix: np.ndarray,
+                    **kwargs) -> 'WeightUncertaintyAnalyzer':
+        """
+        Create an analyzer from an existing comparison matrix.
+        
+        Args:
+            criteria: List of criteria names
+            comparison_matrix: n x n reciprocal comparison matrix
+            **kwargs: Passed to the constructor
+        
+        Returns:
+            WeightUncertaintyAnalyzer instance
+        """
+        comparisons = {
+            (criteria[i], criteria[j]): float(comparison_matrix[i, j])
+            for i in range(len(criteria)) for j in range(i + 1, len(criteria))
+        }
+        return cls(criteria, comparisons, **kwargs)
+    
+    def sample_matrices(self, n_samples: int) -> np.ndarray:
+        """
+        Draw perturbed reciprocal comparison matrices.
+        
+        Args:
+            n_samples: Number of matrices to draw
+        
+        Returns:
+            Array of shape (n_samples, n, n)
+        """
+        n = self.ahp.n_criteria
+        upper = np.triu_indices(n, 1)
+        base = self.base_matrix[upper]
+        
+        if self.perturbation == 'step':
+            # Position of each judgment on the ladder (log scale nearest step)
+            base_steps = np.abs(np.log(self.SAATY_LADDER)[:, np.newaxis] - np.log(base)).argmin(axis=0)
+            spread = int(self.spread)
+            offsets = self.rng.integers(-spread, spread + 1, size=(n_samples, len(base)))
+            steps = np.clip(base_steps + offsets, 0, len(self.SAATY_LADDER) - 1)
+            values = self.SAATY_LADDER[steps]
+        else:
+            noise = self.rng.lognormal(0.0, self.spread, size=(n_samples, len(base)))
+            values = np.clip(base * noise, 1/9, 9)
+        
+        matrices = np.ones((n_samples, n, n))
+        matrices[:, upper[0], upper[1]] = values
+        matrices[:, upper[1], upper[0]] = 1.0 / values
+        return matrices
+    
+    def sample_criteria_weights(self, n_samples: int, weight_method: str = 'eigen',
+                                max_cr: Optional[float] = None) -> np.ndarray:
+        """
+        Draw criteria weight vectors from perturbed judgments.
+        
+        Args:
+            n_samples: Number of samples to draw
+            weight_method: AHPCore weight derivation method
+            max_cr: Optionally discard samples with CR >= max_cr
+        
+        Returns:
+            Array of shape (samples, criteria)
+        """
+        weights, _, cr = AHPCore.calculate_weights_batch(self.sample_matrices(n_samples), method=weight_method)
+        
+        if max_cr is not None:
+            keep = cr < max_cr
+            if not keep.any():
+                raise ValueError(f"No sampled matrix has CR < {max_cr}; reduce the perturbation spread.")
+            weights, cr = weights[keep], cr[keep]
+        
+        self.sample_weights = weights
+        self.sample_consistency = cr
+        return weights
+    
+    def analyze(self, criteria_scores: np.ndarray, n_samples: int = 1000, top_k: int = 10,
+                memory_budget_mb: float = 256, weight_method: str = 'eigen',
+                max_cr: Optional[float] = None, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        """
+        Rank-stability statistics of every complaint under weight uncertainty.
+        
+        Ranks are competition ranks (1 + number of strictly higher scores),
+        so complaints with identical criteria scores always share a rank.
+        
+        Args:
+            criteria_scores: Array of shape (complaints, criteria)
+            n_samples: Number of Monte Carlo samples
+            top_k: K for the probability-of-top-K column
+            memory_budget_mb: Approximate memory budget for one chunk of samples
+            weight_method: AHPCore weight derivation method
+            max_cr: Optionally discard samples with CR >= max_cr
+            index: Optional index for the result (e.g. the complaints index)
+        
+        Returns:
+            DataFrame with baseline_rank, rank_mean, rank_std, rank_min,
+            rank_max and prob_top_k per complaint
+        """
+        scores = np.asarray(criteria_scores, dtype=float)
+        n_complaints = scores.shape[0]
+        if scores.ndim != 2 or scores.shape[1] != self.ahp.n_criteria:
+            raise ValueError(f"Expected criteria scores of shape (complaints, {self.ahp.n_criteria})")
+        
+        weights = self.sample_criteria_weights(n_samples, weight_method, max_cr)
+        
+        base_weights = self.ahp.calculate_weights()
+        baseline_rank = competition_ranks(base_weights[np.newaxis] @ scores.T)[0]
+        
+        # About five (chunk x complaints) 8-byte arrays are alive per chunk
+        chunk_size = max(1, int(memory_budget_mb * 1024 ** 2 // (max(n_complaints, 1) * 8 * 5)))
+        
+        rank_sum = np.zeros(n_complaints)
+        rank_sq_sum = np.zeros(n_complaints)
+        rank_min = np.full(n_complaints, np.iinfo(np.int64).max)
+        rank_max = np.zeros(n_complaints, dtype=np.int64)
+        top_k_count = np.zeros(n_complaints, dtype=np.int64)
+        
+        for start in range(0, len(weights), chunk_size):
+            # (samples x criteria) @ (criteria x complaints)
+            ranks = competition_ranks(weights[start:start + chunk_size] @ scores.T)
+            
+            rank_sum += ranks.sum(axis=0)
+            rank_sq_sum += (ranks.astype(float) ** 2).sum(axis=0)
+            np.minimum(rank_min, ranks.min(axis=0), out=rank_min)
+            np.maximum(rank_max, ranks.max(axis=0), out=rank_max)
+            top_k_count += (ranks <= top_k).sum(axis=0)
+        
+        n_used = len(weights)
+        rank_mean = rank_sum / n_used
+        
+        self.results = pd.DataFrame({
+            'baseline_rank': baseline_rank,
+            'rank_mean': rank_mean,
+            'rank_std': np.sqrt(np.maximum(rank_sq_sum / n_used - rank_mean ** 2, 0.0)),
+            'rank_min': rank_min,
+            'rank_max': rank_max,
+            f'prob_top_{top_k}': top_k_count / n_used
+        }, index=index)
+        return self.results
+    
+    def analyze_complaints(self, complaints_df: pd.DataFrame, score_columns: List[str],
+                           **kwargs) -> pd.DataFrame:
+        """
+        Run analyze on the criteria score columns of a complaints DataFrame.
+        
+        Args:
+            complaints_df: DataFrame with criteria score columns
+            score_columns: Score columns in criteria order
+            **kwargs: Passed to analyze
+        
+        Returns:
+            Rank-stability DataFrame aligned with complaints_df
+        """
+        missing_cols = [col for col in score_columns if col not in complaints_df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing criteria columns: {missing_cols}")
+        
+        return self.analyze(complaints_df[score_columns].to_numpy(dtype=float),
+                            index=complaints_df.index, **kwargs)
@@ -7,16 +7,147 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
+import json
+from typing import List, Dict, Optional, Union
 try:
     import folium
     from folium import plugins
+    from branca.element import Element, MacroElement
+    from jinja2 import Template
     FOLIUM_AVAILABLE = True
 except ImportError:
     FOLIUM_AVAILABLE = False
     print("Warning: folium not installed. Map visualization will not be available.")
 
 
+# Map render modes; 'auto' switches to the GeoJSON layer above this many complaints
+MAP_MODES = ('auto', 'markers', 'geojson')
+GEOJSON_MAP_THRESHOLD = 100
+
+# Number of highest-priority complaints that get a rank label on the map
+MAP_LABEL_COUNT = 10
+
+# Complaint fields carried as GeoJSON feature properties, with their fallbacks
+MAP_PROPERTIES = {
+    'id': 'N/A',
+    'title': 'Unknown Complaint',
+    'severity': 'N/A',
+    'type': 'N/A',
+    'department': 'N/A',
+    'affected_people': 'N/A',
+    'location_name': 'Unknown Location',
+    'description': 'No description',
+}
+
+# One FeatureCollection for every complaint; markers, colors, popups and the
+# top-rank labels are built in the browser by a single function, and popup
+# HTML only on click
+GEOJSON_LAYER_TEMPLATE = """
+{% macro script(this, kwargs) %}
+    (function() {
+        function escapeHtml(value) {
+            return String(value).replace(/[&<>"']/g, function(c) {
+                return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+            });
+        }
+        function rankColor(rank) {
+            return rank <= 10 ? 'red' : rank <= 25 ? 'orange' : rank <= 50 ? 'yellow' : 'green';
+        }
+        function rankSize(rank) {
+            return rank <= 10 ? 12 : rank <= 25 ? 10 : rank <= 50 ? 8 : 6;
+        }
+        function complaintPopup(p, color) {
+            var severity = String(p.severity);
+            var severityColor = severity === 'critical' ? 'red' : severity === 'high' ? 'orange' : 'blue';
+            var type = String(p.type).replace(/_/g, ' ').replace(/\\w\\S*/g, function(w) {
+                return w.charAt(0).toUpperCase() + w.slice(1).toLowerCase();
+            });
+            var rows = [['Priority Score', p.priority_score.toFixed(4)],
+                        ['Location', escapeHtml(p.location_name)],
+                        ['Type', escapeHtml(type)],
+                        ['Severity', '<span style="color: ' + severityColor + ';">'
+                                     + escapeHtml(severity.toUpperCase()) + '</span>'],
+                        ['Department', escapeHtml(p.department)],
+                        ['Affected People', escapeHtml(p.affected_people)]];
+            var html = '<div style="font-family: Arial, sans-serif; width: 300px;">'
+                + '<h4 style="color: ' + color + '; margin-bottom: 8px;">#' + p.priority_rank + ' - '
+                + escapeHtml(p.id) + '</h4><h5 style="margin: 4px 0;">' + escapeHtml(p.title) + '</h5>'
+                + '<hr style="margin: 8px 0;"><table style="width: 100%; font-size: 12px;">';
+            rows.forEach(function(row) {
+                html += '<tr><td><b>' + row[0] + ':</b></td><td>' + row[1] + '</td></tr>';
+            });
+            return html + '</table><hr style="margin: 8px 0;"><p style="font-size: 11px; margin: 4px 0;"><i>'
+                + escapeHtml(String(p.description).slice(0, 150)) + '...</i></p></div>';
+        }
+        var layer = L.geoJson({{ this.get_name() }}_data, {
+            pointToLayer: function(feature, latlng) {
+                var p = feature.properties;
+                var color = rankColor(p.priority_rank);
+                return L.circleMarker(latlng, {
+                    radius: rankSize(p.priority_rank), color: color, fillColor: color,
+                    fillOpacity: 0.7, weight: 2
+                }).bindPopup(function() { return complaintPopup(p, color); }, {maxWidth: 350});
+            }
+        });
+        {{ this._parent.get_name() }}.addLayers(layer.getLayers());
+        {{ this.labels_json }}.forEach(function(i) {
+            var feature = {{ this.get_name() }}_data.features[i];
+            var rank = feature.properties.priority_rank;
+            L.marker(feature.geometry.coordinates.slice().reverse(), {
+                icon: L.divIcon({
+                    className: 'empty',
+                    html: '<div style="font-size: 10px; font-weight: bold; color: white; '
+                        + 'background-color: ' + rankColor(rank) + '; padding: 2px 5px; border-radius: 3px; '
+                        + 'border: 1px solid white;">#' + rank + '</div>'
+                })
+            }).addTo({{ this.label_map.get_name() }});
+        });
+    })();
+{% endmacro %}
+"""
+
+
+if FOLIUM_AVAILABLE:
+    class _InlineScript(Element):
+        """Script text added to the page verbatim, never parsed as a template."""
+        
+        def __init__(self, text: str):
+            super().__init__()
+            self.text = text
+        
+        def render(self, **kwargs):
+            return self.text
+    
+    class GeoJsonComplaintLayer(MacroElement):
+        """
+        Complaint points drawn into the parent marker cluster from one
+        embedded GeoJSON FeatureCollection, with rank labels for the
+        features at label_positions drawn onto label_map.
+        """
+        
+        _template = Template(GEOJSON_LAYER_TEMPLATE)
+        
+        def __init__(self, geojson: Dict, label_positions=(), label_map=None):
+            super().__init__()
+            self._name = 'GeoJsonComplaintLayer'
+            self.labels_json = json.dumps([int(i) for i in label_positions])
+            self.label_map = label_map
+            
+            # Escape HTML-significant characters so text cannot close the script
+            self.data_json = json.dumps(geojson, separators=(',', ':'))
+            for char, escaped in (('<', '\\u003c'), ('>', '\\u003e'), ('&', '\\u0026')):
+                self.data_json = self.data_json.replace(char, escaped)
+        
+        def render(self, **kwargs):
+            # branca compiles every rendered script as a template, which is
+            # slow for megabytes of data and would expand template syntax in
+            # complaint text, so the data goes in as a plain script
+            figure = self.get_root()
+            figure.script.add_child(_InlineScript(f"var {self.get_name()}_data = {self.data_json};"),
+                                    name=self.get_name() + '_data')
+            super().render(**kwargs)
+
+
 class PrioritizationVisualizer:
     """
     Creates visualizations for complaint prioritization results.
@@ -214,17 +345,19 @@ class PrioritizationVisualizer:
         
         plt.show()
     
-    def plot_priority_levels(self, priority_categories: Dict[str, pd.DataFrame],
+    def plot_priority_levels(self, priority_categories: Dict[str, Union[pd.DataFrame, int]],
                            save_path: Optional[str] = None):
         """
         Create pie chart of priority level distribution.
         
         Args:
-            priority_categories: Dictionary with priority levels and DataFrames
+            priority_categories: Dictionary with priority levels and either
+                                 DataFrames or complaint counts
             save_path: Optional path to save figure
         """
         # Count complaints in each category
-        counts = {level: len(df) for level, df in priority_categories.items()}
+        counts = {level: value if isinstance(value, (int, np.integer)) else len(value)
+                  for level, value in priority_categories.items()}
         
         fig, ax = plt.subplots(figsize=(10, 7))
         
@@ -259,6 +392,55 @@ class PrioritizationVisualizer:
         
         plt.show()
     
+    def plot_sensitivity_analysis(self, sensitivity_df: pd.DataFrame,
+                                  base_weights: Optional[Dict[str, float]] = None,
+                                  save_path: Optional[str] = None):
+        """
+        Plot rank of the tracked complaints as each criterion weight is swept.
+        
+        Args:
+            sensitivity_df: Results of SensitivityAnalyzer.run
+            base_weights: Optional baseline weight per criterion, drawn as a marker
+            save_path: Optional path to save figure
+        """
+        criteria = list(dict.fromkeys(sensitivity_df['criterion']))
+        n_cols = min(3, len(criteria))
+        n_rows = int(np.ceil(len(criteria) / n_cols))
+        
+        fig, axes = plt.subplots(n_rows, n_cols, figsize=(5 * n_cols, 4 * n_rows),
+                                 sharey=True, squeeze=False)
+        max_rank = sensitivity_df['priority_rank'].max()
+        
+        for ax, criterion in zip(axes.flat, criteria):
+            sweep = sensitivity_df[sensitivity_df['criterion'] == criterion]
+            for complaint_id, line in sweep.groupby('id', sort=False):
+                ax.plot(line['weight'], line['priority_rank'], marker='o', markersize=3,
+                        linewidth=1.5, alpha=0.8, label=str(complaint_id))
+            
+            if base_weights is not None and criterion in base_weights:
+                ax.axvline(base_weights[criterion], color='black', linestyle='--', linewidth=1)
+            
+            ax.set_title(criterion, fontsize=11, fontweight='bold')
+            ax.set_xlabel('Criterion Weight', fontsize=10)
+            ax.set_ylim(max_rank + 0.5, 0.5)
+        
+        for ax in axes[:, 0]:
+            ax.set_ylabel('Priority Rank', fontsize=10, fontweight='bold')
+        for ax in list(axes.flat)[len(criteria):]:
+            ax.set_visible(False)
+        
+        handles, labels = axes.flat[0].get_legend_handles_labels()
+        fig.legend(handles, labels, loc='center right', fontsize=8, title='Complaint')
+        fig.suptitle('Rank Sensitivity to Criteria Weights', fontsize=14, fontweight='bold')
+        
+        plt.tight_layout(rect=(0, 0, 0.9, 0.96))
+        
+        if save_path:
+            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            print(f"[OK] Sensitivity chart saved to {save_path}")
+        
+        plt.show()
+    
     def create_comparison_matrix_visualization(self, comparison_matrix: np.ndarray,
                                               criteria: List[str],
                                               save_path: Optional[str] = None):
@@ -305,22 +487,79 @@ class PrioritizationVisualizer:
         
         plt.show()
     
+    def complaints_to_geojson(self, complaints_df: pd.DataFrame) -> Dict:
+        """
+        Convert complaints to a GeoJSON FeatureCollection of points.
+        
+        Columns are converted whole rather than row by row; rows without
+        coordinates are dropped and missing values take the map's fallbacks.
+        
+        Args:
+            complaints_df: DataFrame with latitude, longitude and priority_score
+        
+        Returns:
+            FeatureCollection dict with priority_score, priority_rank and the
+            MAP_PROPERTIES fields as feature properties
+        """
+        df = complaints_df.dropna(subset=['latitude', 'longitude'])
+        
+        coordinates = np.column_stack([pd.to_numeric(df['longitude']).to_numpy(dtype=float),
+                                       pd.to_numeric(df['latitude']).to_numpy(dtype=float)]).round(6).tolist()
+        properties = {
+            'priority_score': pd.to_numeric(df['priority_score']).fillna(0).to_numpy(dtype=float).round(4).tolist(),
+            'priority_rank': (pd.to_numeric(df['priority_rank'], errors='coerce').fillna(0).astype(int).tolist()
+                              if 'priority_rank' in df.columns else [0] * len(df)),
+        }
+        for column, fallback in MAP_PROPERTIES.items():
+            if column in df.columns:
+                values = df[column].astype(object)
+                properties[column] = values.where(values.notna(), fallback).map(
+                    lambda value: value.item() if isinstance(value, np.generic) else value).tolist()
+                if column == 'description':
+                    # Popups only show the first 150 characters
+                    properties[column] = [str(value)[:150] for value in properties[column]]
+            else:
+                properties[column] = [fallback] * len(df)
+        
+        names = list(properties)
+        return {
+            'type': 'FeatureCollection',
+            'features': [{'type': 'Feature',
+                          'geometry': {'type': 'Point', 'coordinates': point},
+                          'properties': dict(zip(names, values))}
+                         for point, *values in zip(coordinates, *properties.values())],
+        }
+    
     def plot_priority_map(self, complaints_df: pd.DataFrame,
                          save_path: Optional[str] = None,
-                         top_n: Optional[int] = None):
+                         top_n: Optional[int] = None,
+                         mode: str = 'auto'):
         """
         Create an interactive map visualization of complaints based on priority.
         
+        In 'markers' mode every complaint becomes its own folium marker with
+        an inline popup, which is fine for a few hundred complaints. In
+        'geojson' mode all complaints are embedded once as a GeoJSON
+        FeatureCollection and drawn into a marker cluster by one browser-side
+        function, so the HTML grows by a few hundred bytes per complaint.
+        Rank labels go on the first MAP_LABEL_COUNT complaints by rank only,
+        however many share a rank.
+        
         Args:
             complaints_df: DataFrame with complaints including latitude/longitude
             save_path: Optional path to save HTML map file
             top_n: Optional number of top priority complaints to show (None = all)
+            mode: 'markers', 'geojson', or 'auto' (GeoJSON above
+                  GEOJSON_MAP_THRESHOLD complaints)
         """
         if not FOLIUM_AVAILABLE:
             print("[ERROR] folium package is required for map visualization")
             print("  Install it with: pip install folium")
             return
         
+        if mode not in MAP_MODES:
+            raise ValueError(f"Unknown map mode '{mode}'. Use one of {MAP_MODES}")
+        
         # Check for required columns
         required_cols = ['latitude', 'longitude', 'priority_score']
         missing_cols = [col for col in required_cols if col not in complaints_df.columns]
@@ -341,6 +580,9 @@ class PrioritizationVisualizer:
             print("[ERROR] No complaints with valid coordinates found")
             return
         
+        if mode == 'auto':
+            mode = 'geojson' if len(map_df) > GEOJSON_MAP_THRESHOLD else 'markers'
+        
         # Calculate center of map (Islamabad center as default)
         center_lat = map_df['latitude'].mean() if not map_df.empty else 33.6844
         center_lon = map_df['longitude'].mean() if not map_df.empty else 73.0479
@@ -349,7 +591,8 @@ class PrioritizationVisualizer:
         m = folium.Map(
             location=[center_lat, center_lon],
             zoom_start=12,
-            tiles='OpenStreetMap'
+            tiles='OpenStreetMap',
+            prefer_canvas=(mode == 'geojson')
         )
         
         # Add additional tile layers
@@ -379,82 +622,108 @@ class PrioritizationVisualizer:
             else:
                 return 6
         
-        # Add markers for each complaint
-        for idx, row in map_df.iterrows():
-            lat = row['latitude']
-            lon = row['longitude']
-            priority_score = row['priority_score']
-            priority_rank = int(row.get('priority_rank', 0))
-            
-            # Get complaint details
-            complaint_id = row.get('id', 'N/A')
-            title = row.get('title', 'Unknown Complaint')
-            severity = row.get('severity', 'N/A')
-            complaint_type = row.get('type', 'N/A')
-            department = row.get('department', 'N/A')
-            affected_people = row.get('affected_people', 'N/A')
-            location_name = row.get('location_name', 'Unknown Location')
-            description = row.get('description', 'No description')
-            
-            # Determine color and size
-            color = get_marker_color(priority_score, priority_rank)
-            size = get_marker_size(priority_score, priority_rank)
-            
-            # Create popup HTML
-            popup_html = f"""
-            <div style="font-family: Arial, sans-serif; width: 300px;">
-                <h4 style="color: {color}; margin-bottom: 8px;">
-                    #{priority_rank} - {complaint_id}
-                </h4>
-                <h5 style="margin: 4px 0;">{title}</h5>
-                <hr style="margin: 8px 0;">
-                <table style="width: 100%; font-size: 12px;">
-                    <tr>
-                        <td><b>Priority Score:</b></td>
-                        <td>{priority_score:.4f}</td>
-                    </tr>
-                    <tr>
-                        <td><b>Location:</b></td>
-                        <td>{location_name}</td>
-                    </tr>
-                    <tr>
-                        <td><b>Type:</b></td>
-                        <td>{complaint_type.replace('_', ' ').title()}</td>
-                    </tr>
-                    <tr>
-                        <td><b>Severity:</b></td>
-                        <td><span style="color: {'red' if severity == 'critical' else 'orange' if severity == 'high' else 'blue'};">
-                            {severity.upper()}
-                        </span></td>
-                    </tr>
-                    <tr>
-                        <td><b>Department:</b></td>
-                        <td>{department}</td>
-                    </tr>
-                    <tr>
-                        <td><b>Affected People:</b></td>
-                        <td>{affected_people}</td>
-                    </tr>
-                </table>
-                <hr style="margin: 8px 0;">
-                <p style="font-size: 11px; margin: 4px 0;"><i>{description[:150]}...</i></p>
-            </div>
-            """
-            
-            # Add marker
-            folium.CircleMarker(
-                location=[lat, lon],
-                radius=size,
-                popup=folium.Popup(popup_html, max_width=350),
-                color=color,
-                fill=True,
-                fillColor=color,
-                fillOpacity=0.7,
-                weight=2
+        # Group markers into clusters for better performance with many markers
+        marker_layer = m
+        if mode == 'geojson' or len(map_df) > 100:
+            marker_layer = plugins.MarkerCluster(
+                name='Complaints',
+                options={'chunkedLoading': True}
             ).add_to(m)
+        
+        if 'priority_rank' in map_df.columns:
+            ranks = pd.to_numeric(map_df['priority_rank'], errors='coerce')
+        else:
+            ranks = pd.Series(np.nan, index=map_df.index)
+        
+        # Label the first MAP_LABEL_COUNT ranked rows; ranks are dense, so
+        # ties could otherwise label any number of rows
+        rank_values = ranks.to_numpy(dtype=float)
+        label_positions = np.argsort(rank_values, kind='stable')[:MAP_LABEL_COUNT]
+        label_positions = label_positions[~np.isnan(rank_values[label_positions])]
+        ranks = ranks.fillna(0).astype(int)
+        
+        if mode == 'geojson':
+            # One embedded FeatureCollection, drawn by a single browser-side function
+            GeoJsonComplaintLayer(self.complaints_to_geojson(map_df),
+                                  label_positions=label_positions, label_map=m).add_to(marker_layer)
+        else:
+            # Add markers for each complaint
+            for (idx, row), priority_rank in zip(map_df.iterrows(), ranks.tolist()):
+                lat = row['latitude']
+                lon = row['longitude']
+                priority_score = row['priority_score']
+                
+                # Get complaint details
+                complaint_id = row.get('id', 'N/A')
+                title = row.get('title', 'Unknown Complaint')
+                severity = row.get('severity', 'N/A')
+                complaint_type = row.get('type', 'N/A')
+                department = row.get('department', 'N/A')
+                affected_people = row.get('affected_people', 'N/A')
+                location_name = row.get('location_name', 'Unknown Location')
+                description = row.get('description', 'No description')
+                
+                # Determine color and size
+                color = get_marker_color(priority_score, priority_rank)
+                size = get_marker_size(priority_score, priority_rank)
+                
+                # Create popup HTML
+                popup_html = f"""
+                <div style="font-family: Arial, sans-serif; width: 300px;">
+                    <h4 style="color: {color}; margin-bottom: 8px;">
+                        #{priority_rank} - {complaint_id}
+                    </h4>
+                    <h5 style="margin: 4px 0;">{title}</h5>
+                    <hr style="margin: 8px 0;">
+                    <table style="width: 100%; font-size: 12px;">
+                        <tr>
+                            <td><b>Priority Score:</b></td>
+                            <td>{priority_score:.4f}</td>
+                        </tr>
+                        <tr>
+                            <td><b>Location:</b></td>
+                            <td>{location_name}</td>
+                        </tr>
+                        <tr>
+                            <td><b>Type:</b></td>
+                            <td>{complaint_type.replace('_', ' ').title()}</td>
+                        </tr>
+                        <tr>
+                            <td><b>Severity:</b></td>
+                            <td><span style="color: {'red' if severity == 'critical' else 'orange' if severity == 'high' else 'blue'};">
+                                {severity.upper()}
+                            </span></td>
+                        </tr>
+                        <tr>
+                            <td><b>Department:</b></td>
+                            <td>{department}</td>
+                        </tr>
+                        <tr>
+                            <td><b>Affected People:</b></td>
+                            <td>{affected_people}</td>
+                        </tr>
+                    </table>
+                    <hr style="margin: 8px 0;">
+                    <p style="font-size: 11px; margin: 4px 0;"><i>{description[:150]}...</i></p>
+                </div>
+                """
+                
+                # Add marker
+                folium.CircleMarker(
+                    location=[lat, lon],
+                    radius=size,
+                    popup=folium.Popup(popup_html, max_width=350),
+                    color=color,
+                    fill=True,
+                    fillColor=color,
+                    fillOpacity=0.7,
+                    weight=2
+                ).add_to(marker_layer)
             
             # Add label for top 10 complaints
-            if priority_rank <= 10:
+            for (lat, lon), priority_rank in zip(map_df[['latitude', 'longitude']].to_numpy()[label_positions],
+                                                 ranks.to_numpy()[label_positions]):
+                color = get_marker_color(None, priority_rank)
                 folium.Marker(
                     location=[lat, lon],
                     icon=folium.DivIcon(html=f"""
@@ -486,10 +755,6 @@ class PrioritizationVisualizer:
         '''
         m.get_root().html.add_child(folium.Element(legend_html))
         
-        # Add marker cluster for better performance with many markers
-        if len(map_df) > 100:
-            marker_cluster = plugins.MarkerCluster().add_to(m)
-        
         # Add fullscreen button
         plugins.Fullscreen(position='topleft').add_to(m)
         
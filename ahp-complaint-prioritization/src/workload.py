@@ -0,0 +1,269 @@
+"""
+Workload Balancing
+Capacity-aware assignment of ranked complaints to departments and field agents
+
+Complaints are assigned greedily, highest effective priority first. Every
+assignment adds to its department's load, which can lower the department's
+capacity score and therefore the priority of its remaining complaints.
+Because that priority only ever falls as load grows, each department keeps a
+heap of stored upper bounds that are re-scored lazily when they reach the top,
+and a heap of department heads picks the next complaint in O(log n). Within a
+department, each complaint goes to the least utilized agent with room left.
+"""
+
+import heapq
+import numpy as np
+import pandas as pd
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+from data_loader import ComplaintDataLoader
+
+
+AGENT_COLUMNS = ['agent_id', 'department', 'capacity']
+
+
+class WorkloadBalancer:
+    """
+    Greedy assignment of complaints under per-department and per-agent capacity.
+    """
+    
+    def __init__(self, agents: Optional[pd.DataFrame] = None,
+                 department_capacity: Optional[Dict[str, int]] = None):
+        """
+        Initialize the balancer with the available capacity.
+        
+        Args:
+            agents: DataFrame with agent_id, department and capacity (the
+                    number of complaints each agent can take)
+            department_capacity: Maximum new assignments per department; with
+                                 agents, caps the sum of their capacities
+        
+        Departments without agents or capacity take no assignments.
+        """
+        if agents is None and department_capacity is None:
+            raise ValueError("Provide agents, department_capacity or both.")
+        
+        if agents is not None:
+            missing_cols = [col for col in AGENT_COLUMNS if col not in agents.columns]
+            if missing_cols:
+                raise ValueError(f"Missing agent columns: {missing_cols}")
+            if (agents['capacity'] < 0).any():
+                raise ValueError("Agent capacities must be non-negative.")
+            agents = agents[AGENT_COLUMNS].reset_index(drop=True)
+        
+        self.agents = agents
+        self.department_capacity = dict(department_capacity or {})
+        self.assignments = None
+        self.department_summary = None
+    
+    @classmethod
+    def from_csv(cls, filepath: str, department_capacity: Optional[Dict[str, int]] = None) -> 'WorkloadBalancer':
+        """
+        Load agents from a CSV file with agent_id, department and capacity columns.
+        
+        Args:
+            filepath: Path to the agents CSV
+            department_capacity: Optional cap per department
+        
+        Returns:
+            WorkloadBalancer instance
+        """
+        return cls(pd.read_csv(filepath), department_capacity)
+    
+    def _department_limits(self, departments: pd.Index) -> np.ndarray:
+        """Assignment limit of each department (agent capacity and/or department cap)."""
+        limits = np.full(len(departments), np.inf)
+        
+        if self.agents is not None:
+            totals = self.agents.groupby('department')['capacity'].sum()
+            limits = totals.reindex(departments, fill_value=0).to_numpy(dtype=float)
+        if self.department_capacity:
+            caps = pd.Series(self.department_capacity, dtype=float).reindex(departments)
+            limits = np.minimum(limits, caps.fillna(np.inf if self.agents is not None else 0).to_numpy())
+        
+        return limits
+    
+    def _agent_queues(self, departments: pd.Index) -> Optional[List[list]]:
+        """Heap of (utilization, agent position) per department."""
+        if self.agents is None:
+            return None
+        
+        queues = [[] for _ in departments]
+        codes = departments.get_indexer(self.agents['department'])
+        for position, (code, capacity) in enumerate(zip(codes, self.agents['capacity'])):
+            if code >= 0 and capacity > 0:
+                queues[code].append((0.0, position))
+        
+        for queue in queues:
+            heapq.heapify(queue)
+        return queues
+    
+    def assign(self, complaints_df: pd.DataFrame, weights: np.ndarray,
+               criteria_columns: Sequence[str]) -> pd.DataFrame:
+        """
+        Assign complaints in order of effective priority until capacity runs out.
+        
+        A complaint's effective priority is its weighted criteria score with
+        capacity_score recomputed from department_load plus the complaints
+        already assigned to its department. Ties go to the earlier row, so
+        passing the ranked results keeps their order among equal scores.
+        
+        Args:
+            complaints_df: DataFrame with department, department_load and
+                           criteria score columns
+            weights: Criteria weights, in the order of criteria_columns
+            criteria_columns: Criteria score columns (must include capacity_score)
+        
+        Returns:
+            Copy of complaints_df in assignment order, unassigned complaints
+            last, with assignment_order (NaN when unassigned), assigned_agent
+            (with agents), effective_capacity_score and effective_priority_score
+        """
+        missing_cols = [col for col in [*criteria_columns, 'department', 'department_load']
+                        if col not in complaints_df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing columns: {missing_cols}")
+        
+        criteria_columns = list(criteria_columns)
+        if 'capacity_score' not in criteria_columns:
+            raise ValueError("criteria_columns must include capacity_score.")
+        capacity_weight = float(weights[criteria_columns.index('capacity_score')])
+        
+        n = len(complaints_df)
+        codes, departments = pd.factorize(complaints_df['department'])
+        departments = pd.Index(departments)
+        
+        scores = complaints_df[criteria_columns].to_numpy(dtype=float) @ np.asarray(weights, dtype=float)
+        base = scores - capacity_weight * complaints_df['capacity_score'].to_numpy(dtype=float)
+        
+        # Missing loads fall into the last band, as in calculate_capacity_scores
+        loads = pd.to_numeric(complaints_df['department_load'], errors='coerce').to_numpy(dtype=float)
+        loads = np.where(np.isnan(loads), np.inf, loads)
+        
+        bands = ComplaintDataLoader.CAPACITY_BANDS
+        band_scores = ComplaintDataLoader.CAPACITY_BAND_SCORES
+        initial = base + capacity_weight * np.asarray(band_scores)[np.digitize(loads, bands, right=True)]
+        base, loads = base.tolist(), loads.tolist()
+        
+        def capacity(i: int, assigned: int) -> float:
+            return band_scores[bisect_left(bands, loads[i] + assigned)]
+        
+        def effective(i: int, assigned: int) -> float:
+            return base[i] + capacity_weight * capacity(i, assigned)
+        
+        limits = self._department_limits(departments)
+        agent_queues = self._agent_queues(departments)
+        agent_counts = [0] * (0 if self.agents is None else len(self.agents))
+        agent_capacity = [] if self.agents is None else self.agents['capacity'].tolist()
+        
+        # Per-department heaps of (-score upper bound, row), earlier rows first
+        # among ties; each department's rows in sorted order already form a heap
+        rows = np.lexsort((np.arange(n), -initial, codes))
+        rows = rows[codes[rows] >= 0]
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[rows], minlength=len(departments)))])
+        entries = list(zip((-initial[rows]).tolist(), rows.tolist()))
+        queues = [entries[bounds[d]:bounds[d + 1]] for d in range(len(departments))]
+        
+        heads = [(queue[0][0], queue[0][1], d) for d, queue in enumerate(queues)
+                 if queue and limits[d] > 0]
+        heapq.heapify(heads)
+        
+        assigned = [0] * len(departments)
+        order = [-1] * n
+        agent_of = [-1] * n
+        final_capacity = [0.0] * n
+        step = 0
+        
+        while heads:
+            _, _, d = heapq.heappop(heads)
+            queue = queues[d]
+            key, i = queue[0]
+            current = effective(i, assigned[d])
+            
+            if current < -key:
+                # Load moved this complaint down a band since it was queued
+                heapq.heapreplace(queue, (-current, i))
+            else:
+                heapq.heappop(queue)
+                order[i] = step
+                final_capacity[i] = capacity(i, assigned[d])
+                step += 1
+                assigned[d] += 1
+                
+                if agent_queues is not None:
+                    _, agent = heapq.heappop(agent_queues[d])
+                    agent_of[i] = agent
+                    agent_counts[agent] += 1
+                    if agent_counts[agent] < agent_capacity[agent]:
+                        heapq.heappush(agent_queues[d], (agent_counts[agent] / agent_capacity[agent], agent))
+            
+            if queue and assigned[d] < limits[d]:
+                heapq.heappush(heads, (queue[0][0], queue[0][1], d))
+        
+        # Unassigned complaints are scored at their department's final load
+        final_load = np.asarray(assigned + [0])[codes].tolist()
+        for i in np.flatnonzero(np.asarray(order, dtype=int) < 0).tolist():
+            final_capacity[i] = capacity(i, final_load[i])
+        
+        order, agent_of = np.asarray(order, dtype=int), np.asarray(agent_of, dtype=int)
+        final_capacity = np.asarray(final_capacity, dtype=float)
+        
+        result = complaints_df.copy()
+        result['assignment_order'] = np.where(order >= 0, order + 1, np.nan)
+        if self.agents is not None:
+            agent_ids = self.agents['agent_id'].to_numpy(dtype=object)
+            result['assigned_agent'] = np.where(agent_of >= 0, agent_ids[agent_of], None)
+        result['effective_capacity_score'] = final_capacity
+        result['effective_priority_score'] = np.asarray(base) + capacity_weight * final_capacity
+        
+        self.assignments = result.iloc[np.argsort(np.where(order >= 0, order, n), kind='stable')]
+        self.department_summary = pd.DataFrame({
+            'department': departments,
+            'limit': limits,
+            'assigned': assigned,
+            'unassigned': np.bincount(codes[codes >= 0], minlength=len(departments)) - np.asarray(assigned, dtype=int),
+        })
+        return self.assignments
+    
+    def get_agent_loads(self) -> pd.DataFrame:
+        """
+        Number of complaints assigned to each agent.
+        
+        Returns:
+            DataFrame of agents with assigned and remaining capacity
+        """
+        if self.assignments is None:
+            raise ValueError("No assignments. Run assign first.")
+        if self.agents is None:
+            raise ValueError("No agents. The balancer only tracks department capacity.")
+        
+        counts = self.assignments['assigned_agent'].value_counts()
+        loads = self.agents.copy()
+        loads['assigned'] = counts.reindex(loads['agent_id'], fill_value=0).to_numpy()
+        loads['remaining'] = loads['capacity'] - loads['assigned']
+        return loads
+
+
+if __name__ == "__main__":
+    # Example usage
+    from prioritizer import ComplaintPrioritizer
+    
+    loader = ComplaintDataLoader()
+    loader.load_from_csv('../data/sample_complaints.csv')
+    enriched = loader.enrich_complaint_data()
+    
+    prioritizer = ComplaintPrioritizer()
+    prioritizer.load_default_weights()
+    ranked = prioritizer.prioritize_complaints(enriched)
+    
+    agents = pd.DataFrame({
+        'agent_id': [f"{department[:3].upper()}-{i}" for department in ranked['department'].unique() for i in (1, 2)],
+        'department': [department for department in ranked['department'].unique() for _ in (1, 2)],
+        'capacity': 2,
+    })
+    
+    balancer = WorkloadBalancer(agents)
+    balancer.assign(ranked, prioritizer.ahp.weights, prioritizer.CRITERIA_COLUMNS)
+    print(balancer.department_summary.to_string(index=False))
+    print()
+    print(balancer.get_agent_loads().to_string(index=False))
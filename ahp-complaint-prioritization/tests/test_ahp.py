@@ -160,6 +160,141 @@ class TestAHPCore:
         assert summary['criteria'] == criteria
 
 
+def random_reciprocal_matrices(k, n, seed=0):
+    """Stack of random reciprocal matrices with Saaty-scale judgments."""
+    rng = np.random.default_rng(seed)
+    scale = np.array([1/9, 1/7, 1/5, 1/3, 1, 3, 5, 7, 9])
+    upper = np.triu_indices(n, 1)
+    values = rng.choice(scale, size=(k, len(upper[0])))
+    
+    matrices = np.ones((k, n, n))
+    matrices[:, upper[0], upper[1]] = values
+    matrices[:, upper[1], upper[0]] = 1 / values
+    return matrices
+
+
+class TestBatchWeights:
+    """Test cases for batched weight and consistency calculation."""
+    
+    def test_batch_matches_single_matrix_methods(self):
+        """Test every matrix in the stack against the single-matrix path."""
+        matrices = random_reciprocal_matrices(50, 5)
+        
+        weights, lambda_max, cr = AHPCore.calculate_weights_batch(matrices)
+        
+        for i, matrix in enumerate(matrices):
+            ahp = AHPCore(["A", "B", "C", "D", "E"])
+            ahp.comparison_matrix = matrix
+            ahp.calculate_weights()
+            ahp.calculate_consistency_ratio()
+            
+            assert np.allclose(weights[i], ahp.weights)
+            assert np.isclose(lambda_max[i], ahp.lambda_max)
+            assert np.isclose(cr[i], ahp.consistency_ratio)
+    
+    def test_batch_shape_validation(self):
+        """Test non-square stacks are rejected."""
+        with pytest.raises(ValueError):
+            AHPCore.calculate_weights_batch(np.ones((3, 4, 5)))
+    
+    def test_consistency_ratio_reuses_decomposition(self, monkeypatch):
+        """Test CR does not run a second eigen decomposition."""
+        ahp = AHPCore(["A", "B", "C"])
+        ahp.create_comparison_matrix({("A", "B"): 3, ("A", "C"): 5, ("B", "C"): 2})
+        ahp.calculate_weights()
+        
+        monkeypatch.setattr(np.linalg, 'eigvals', lambda *args: pytest.fail("eigvals called"))
+        
+        assert ahp.calculate_consistency_ratio() < 0.1
+
+
+class TestWeightMethods:
+    """Test cases for the power iteration and geometric mean methods."""
+    
+    def test_power_iteration_matches_eigen(self):
+        """Test power iteration converges to the eigenvector weights."""
+        matrices = random_reciprocal_matrices(100, 6, seed=1)
+        
+        exact, exact_lambda, exact_cr = AHPCore.calculate_weights_batch(matrices)
+        power, power_lambda, power_cr = AHPCore.calculate_weights_batch(matrices, method='power', tol=1e-12)
+        
+        assert np.allclose(power, exact, atol=1e-9)
+        assert np.allclose(power_lambda, exact_lambda)
+        assert np.allclose(power_cr, exact_cr)
+    
+    def test_methods_agree_on_consistent_matrix(self):
+        """Test all methods return the exact weights of a consistent matrix."""
+        ahp = AHPCore(["A", "B", "C"])
+        ahp.create_comparison_matrix({("A", "B"): 3, ("A", "C"): 9, ("B", "C"): 3})
+        
+        for method in AHPCore.WEIGHT_METHODS:
+            weights = ahp.calculate_weights(method=method)
+            
+            assert np.allclose(weights, [9/13, 3/13, 1/13])
+            assert np.isclose(ahp.calculate_consistency_ratio(), 0.0, atol=1e-9)
+    
+    def test_unknown_method(self):
+        """Test unknown methods are rejected."""
+        ahp = AHPCore(["A", "B"])
+        ahp.create_comparison_matrix({("A", "B"): 2})
+        
+        with pytest.raises(ValueError):
+            ahp.calculate_weights(method='svd')
+
+
+class TestConsistencyRepair:
+    """Test cases for automatic consistency repair."""
+    
+    INCONSISTENT = {("A", "B"): 9, ("A", "C"): 1/7, ("A", "D"): 5, ("A", "E"): 3,
+                    ("B", "C"): 9, ("B", "D"): 1/5, ("B", "E"): 2, ("C", "D"): 7,
+                    ("C", "E"): 1/3, ("D", "E"): 4}
+    
+    def make_ahp(self):
+        """AHP model with CR well above 0.1."""
+        ahp = AHPCore(list("ABCDE"))
+        ahp.create_comparison_matrix(self.INCONSISTENT)
+        ahp.calculate_weights()
+        ahp.calculate_consistency_ratio()
+        return ahp
+    
+    def test_repair_reaches_threshold(self):
+        """Test the proposed changes bring CR under 0.1 on the Saaty scale."""
+        ahp = self.make_ahp()
+        original = ahp.comparison_matrix.copy()
+        
+        changes = ahp.repair_consistency()
+        
+        assert ahp.consistency_ratio > 0.1
+        assert np.array_equal(ahp.comparison_matrix, original)
+        assert changes[-1]['consistency_ratio'] < 0.1
+        assert all(np.isclose(AHPCore.SAATY_SCALE, change['new_value']).any() for change in changes)
+    
+    def test_incremental_cr_matches_full_decomposition(self):
+        """Test the warm-started CR equals an exact recomputation after applying."""
+        ahp = self.make_ahp()
+        
+        changes = ahp.repair_consistency(apply=True)
+        
+        assert np.isclose(ahp.consistency_ratio, changes[-1]['consistency_ratio'])
+        assert ahp.is_consistent()
+        assert np.allclose(ahp.comparison_matrix * ahp.comparison_matrix.T, 1.0)
+    
+    def test_consistent_matrix_unchanged(self):
+        """Test no changes are proposed for an already consistent matrix."""
+        ahp = AHPCore(["A", "B", "C"])
+        ahp.create_comparison_matrix({("A", "B"): 3, ("A", "C"): 5, ("B", "C"): 2})
+        
+        assert ahp.repair_consistency() == []
+    
+    def test_unsnapped_repair_stays_in_range(self):
+        """Test continuous adjustments stay within 1/9 and 9."""
+        ahp = self.make_ahp()
+        
+        changes = ahp.repair_consistency(threshold=0.01, snap_to_scale=False)
+        
+        assert all(1/9 <= change['new_value'] <= 9 for change in changes)
+
+
 class TestSaatyScale:
     """Test Saaty scale interpretation."""
     
@@ -0,0 +1,79 @@
+"""
+Test Suite for Configuration Loader
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src import config_loader
+from src.config_loader import (load_config, get_priority_percentiles, get_comparison_profiles,
+                               compile_profile, profile_cache_key)
+from src.prioritizer import ComplaintPrioritizer
+
+
+CRITERIA = ComplaintPrioritizer.DEFAULT_CRITERIA
+
+
+class TestConfigParsing:
+    """Parsing of config/criteria_weights.json."""
+    
+    def test_priority_percentiles(self):
+        """Test levels are ordered from highest to lowest."""
+        percentiles = get_priority_percentiles(load_config())
+        
+        assert list(percentiles) == ['critical', 'high', 'medium', 'low']
+        assert percentiles['critical'] == 75
+    
+    def test_default_profile_matches_builtin_comparisons(self):
+        """Test the config default profile equals the built-in fallback."""
+        profiles = get_comparison_profiles(load_config(), CRITERIA)
+        
+        assert profiles['default'] == ComplaintPrioritizer.DEFAULT_COMPARISONS
+
+
+class TestWeightsCache:
+    """Cached compilation of comparison profiles."""
+    
+    def setup_method(self):
+        self.profile = load_config()['pairwise_comparisons']['default']
+    
+    def test_cache_hit_skips_eigen_decomposition(self, tmp_path, monkeypatch):
+        """Test the second compile restores weights without recomputing."""
+        first = compile_profile(self.profile, CRITERIA, cache_dir=tmp_path)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("weights recomputed despite cache")
+        
+        monkeypatch.setattr(config_loader.AHPCore, 'calculate_weights', fail)
+        second = compile_profile(self.profile, CRITERIA, cache_dir=tmp_path)
+        
+        assert np.array_equal(first.weights, second.weights)
+        assert second.consistency_ratio == first.consistency_ratio
+        assert np.array_equal(first.comparison_matrix, second.comparison_matrix)
+    
+    def test_cache_key_tracks_profile_contents(self):
+        """Test any change to the judgments or criteria order changes the key."""
+        changed = dict(self.profile, **{'Scale of Impact vs Urgency Level': 2})
+        
+        assert profile_cache_key(self.profile, CRITERIA) == profile_cache_key(dict(self.profile), CRITERIA)
+        assert profile_cache_key(self.profile, CRITERIA) != profile_cache_key(changed, CRITERIA)
+        assert profile_cache_key(self.profile, CRITERIA) != profile_cache_key(self.profile, CRITERIA[::-1])
+    
+    def test_corrupt_cache_entry_is_recomputed(self, tmp_path):
+        """Test unreadable cache files fall back to computing the weights."""
+        cache_file = tmp_path / f"weights_{profile_cache_key(self.profile, CRITERIA)}.json"
+        cache_file.write_text('{not json')
+        
+        ahp = compile_profile(self.profile, CRITERIA, cache_dir=tmp_path)
+        
+        assert np.isclose(ahp.weights.sum(), 1.0)
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
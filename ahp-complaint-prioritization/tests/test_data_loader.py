@@ -0,0 +1,177 @@
+"""
+Test Suite for Complaint Data Loader
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.data_loader import ComplaintDataLoader
+from src.spatial import haversine_m
+
+
+SAMPLE_CSV = Path(__file__).parent.parent / 'data' / 'sample_complaints.csv'
+
+
+class TestVectorizedScoring:
+    """Vectorized scoring must match the scalar reference methods exactly."""
+
+    def setup_method(self):
+        self.loader = ComplaintDataLoader()
+
+    def test_safety_scores_match_scalar(self):
+        """Test safety scores including unknown types and mixed case."""
+        types = pd.Series(['gas_leak', 'Pothole', 'graffiti', 'flooding', 'GAS_LEAK'])
+        severities = pd.Series(['critical', 'HIGH', 'low', 'unknown', 'medium'])
+
+        expected = [self.loader.calculate_safety_score(t, s) for t, s in zip(types, severities)]
+
+        assert self.loader.calculate_safety_scores(types, severities).tolist() == expected
+
+    def test_impact_scores_match_scalar_at_band_edges(self):
+        """Test impact bands on both sides of every boundary."""
+        people = pd.Series([-5, 0, 1, 10, 11, 50, 51, 100, 101, 500, 501, 10 ** 6, np.nan])
+
+        expected = [self.loader.calculate_impact_score(p) for p in people]
+
+        assert self.loader.calculate_impact_scores(people).tolist() == expected
+
+    def test_resource_scores_match_scalar(self):
+        """Test resource scores for in-range, capped and missing costs."""
+        costs = pd.Series([0, 1200, 9999.5, 10000, 250000, np.nan])
+        complexities = pd.Series(['low', 'medium', 'high', 'HIGH', 'other', 'low'])
+
+        expected = [self.loader.calculate_resource_score(c, x) for c, x in zip(costs, complexities)]
+
+        assert self.loader.calculate_resource_scores(costs, complexities).tolist() == expected
+
+    def test_capacity_scores_match_scalar_at_band_edges(self):
+        """Test capacity bands on both sides of every boundary."""
+        loads = pd.Series([0, 5, 6, 10, 11, 20, 21, 30, 31, np.nan])
+
+        expected = [self.loader.calculate_capacity_score('Roads', load) for load in loads]
+
+        assert self.loader.calculate_capacity_scores(loads).tolist() == expected
+
+    def test_enrich_matches_scalar_path(self):
+        """Test both enrichment paths on the sample data set."""
+        self.loader.load_from_csv(SAMPLE_CSV)
+
+        vectorized = self.loader.enrich_complaint_data()
+        scalar = self.loader.enrich_complaint_data(vectorized=False)
+
+        for col in ['safety_score', 'impact_score', 'resource_score', 'capacity_score']:
+            assert np.array_equal(vectorized[col].to_numpy(), scalar[col].to_numpy()), col
+
+
+class TestUrgencyScoring:
+    """Batch urgency scoring against a fixed reference time."""
+
+    AS_OF = datetime(2024, 12, 20, 12, 0, tzinfo=timezone.utc)
+
+    def setup_method(self):
+        self.loader = ComplaintDataLoader()
+
+    def test_urgency_scores_match_scalar(self):
+        """Test every age band and the monthly decay against the scalar method."""
+        dates = pd.Series([
+            '2024-12-20T11:00Z', '2024-12-19T12:00Z', '2024-12-18T12:00:00+05:00',
+            '2024-12-13T13:00Z', '2024-12-01T00:00Z', '2024-10-01T00:00Z'
+        ])
+
+        expected = [self.loader.calculate_urgency_score(d, as_of=self.AS_OF) for d in dates]
+
+        assert self.loader.calculate_urgency_scores(dates, as_of=self.AS_OF).tolist() == expected
+
+    def test_deadline_scores_match_scalar(self):
+        """Test deadline-based urgency."""
+        dates = pd.Series(['2024-12-20T00:00Z', '2024-12-10T00:00Z'])
+
+        expected = [self.loader.calculate_urgency_score(d, 48, as_of=self.AS_OF) for d in dates]
+
+        assert self.loader.calculate_urgency_scores(dates, 48, as_of=self.AS_OF).tolist() == expected
+
+    def test_invalid_dates_use_default(self):
+        """Test unparseable timestamps fall back to 0.5."""
+        scores = self.loader.calculate_urgency_scores(pd.Series(['not a date', None]), as_of=self.AS_OF)
+
+        assert scores.tolist() == [0.5, 0.5]
+
+    def test_enrich_is_reproducible_for_fixed_as_of(self):
+        """Test the vectorized and scalar paths agree for a fixed as_of."""
+        self.loader.load_from_csv(SAMPLE_CSV)
+
+        vectorized = self.loader.enrich_complaint_data(as_of='2024-12-20T12:00Z')
+        scalar = self.loader.enrich_complaint_data(vectorized=False, as_of='2024-12-20T12:00Z')
+
+        assert np.array_equal(vectorized['urgency_score'].to_numpy(), scalar['urgency_score'].to_numpy())
+    
+    def test_naive_dates_are_utc_in_both_paths(self, monkeypatch):
+        """Test naive timestamps age the same in both paths on a non-UTC host."""
+        monkeypatch.setenv('TZ', 'Asia/Karachi')
+        time.tzset()
+        dates = pd.Series(['2024-12-20T01:00:00', '2024-12-18T12:00:00', '2024-12-01T00:00:00'])
+        try:
+            expected = [self.loader.calculate_urgency_score(d, as_of=self.AS_OF) for d in dates]
+            assert self.loader.calculate_urgency_scores(dates, as_of=self.AS_OF).tolist() == expected
+            assert expected == [0.9, 0.7, pytest.approx(1.0 - (19 * 24 + 12) / (30 * 24))]
+            
+            # Without as_of both paths age against the current UTC time
+            assert self.loader.calculate_urgency_score('2000-01-01T00:00:00', 48) == 1.0
+            recent = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+            assert self.loader.calculate_urgency_score(recent) == 0.9
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+
+class TestClusterImpact:
+    """Neighbourhood sums behind the cluster-aware impact score."""
+    
+    def setup_method(self):
+        self.loader = ComplaintDataLoader()
+    
+    def test_matches_all_pairs_scan(self):
+        """Test neighbourhood counts and people against a scan of every pair of the same type."""
+        rng = np.random.default_rng(0)
+        n = 500
+        df = pd.DataFrame({'latitude': 33.6 + rng.random(n) * 0.03, 'longitude': 73.0 + rng.random(n) * 0.03,
+                           'type': rng.choice(['gas_leak', 'pothole'], n), 'affected_people': rng.integers(0, 40, n)})
+        df.loc[::60, 'latitude'] = np.nan
+        
+        self.loader.enrich_cluster_impact(df, radius_m=250)
+        
+        lat, lon = df['latitude'].to_numpy(), df['longitude'].to_numpy()
+        near = haversine_m(lat[:, np.newaxis], lon[:, np.newaxis], lat, lon) <= 250
+        near &= (df['type'].to_numpy()[:, np.newaxis] == df['type'].to_numpy())
+        near[np.diag_indices(n)] = True
+        
+        assert df['nearby_complaints'].tolist() == near.sum(axis=1).tolist()
+        assert df['nearby_affected_people'].tolist() == (near @ df['affected_people'].to_numpy()).tolist()
+        assert np.array_equal(df['impact_score'], self.loader.calculate_impact_scores(df['nearby_affected_people']))
+    
+    def test_adjacent_reports_raise_impact(self):
+        """Test ten adjacent small gas leaks score as one large incident, other types stay local."""
+        df = pd.DataFrame({'latitude': 33.7 + np.arange(11) * 0.0001, 'longitude': 73.05,
+                           'type': ['gas_leak'] * 10 + ['pothole'], 'affected_people': 8})
+        
+        self.loader.enrich_cluster_impact(df)
+        
+        assert (df['local_impact_score'] == 0.2).all()
+        assert df['impact_score'].tolist() == [0.6] * 10 + [0.2]
+        assert df['nearby_complaints'].tolist() == [10] * 10 + [1]
+        
+        self.loader.enrich_cluster_impact(df, same_type=False)
+        assert (df['nearby_complaints'] == 11).all()
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
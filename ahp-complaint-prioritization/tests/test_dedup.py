@@ -0,0 +1,134 @@
+"""
+Test Suite for Duplicate Complaint Detection
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.data_loader import ComplaintDataLoader
+from src.dedup import (band_keys, candidate_pairs, duplicate_groups, haversine_m,
+                       minhash_signatures, shingle_codes)
+
+
+SAMPLE_CSV = Path(__file__).parent.parent / 'data' / 'sample_complaints.csv'
+
+
+class TestSignatures:
+    """Shingling and MinHash estimates."""
+    
+    def test_shingles_ignore_case_and_punctuation(self):
+        """Test normalized texts give the same shingles and short texts one shingle."""
+        codes, counts = shingle_codes(pd.Series(['Deep Pothole', 'deep -- POTHOLE!', 'ab', '', None]))
+        
+        assert counts.tolist() == [10, 10, 1, 0, 0]
+        assert np.array_equal(codes[:10], codes[10:20])
+    
+    def test_minhash_estimates_jaccard(self):
+        """Test the share of equal MinHash values tracks the exact Jaccard similarity."""
+        texts = pd.Series(['fire safety breach i 10 markaz', 'fire safety breach i 11 markaz',
+                           'deep pothole f 6 park', 'fire safety breach i 10 markaz'])
+        signatures = minhash_signatures(*shingle_codes(texts), num_perm=256)
+        sets = [{text[i:i + 3] for i in range(len(text) - 2)} for text in texts]
+        
+        for i, j in [(0, 1), (0, 2), (0, 3)]:
+            exact = len(sets[i] & sets[j]) / len(sets[i] | sets[j])
+            assert abs((signatures[i] == signatures[j]).mean() - exact) < 0.1
+
+
+class TestCandidatePairs:
+    """Grid and LSH blocking must find exactly the qualifying pairs."""
+    
+    def test_matches_all_pairs_scan(self):
+        """Test against a scan of every pair for shared type, band key and adjacent cell."""
+        rng = np.random.default_rng(3)
+        n, radius = 600, 200.0
+        words = ['pothole', 'road', 'gas', 'leak', 'water', 'fire']
+        texts = pd.Series([' '.join(rng.choice(words, 3)) for _ in range(n)])
+        groups = rng.integers(0, 2, n)
+        latitudes = 33.6 + rng.random(n) * 0.02
+        longitudes = 73.0 + rng.random(n) * 0.02
+        latitudes[::40] = np.nan
+        keys = band_keys(minhash_signatures(*shingle_codes(texts)), 16)
+        
+        pairs = candidate_pairs(groups, latitudes, longitudes, keys, radius)
+        
+        cos_lat = np.cos(np.radians(np.nanmax(np.abs(latitudes))))
+        cell_y = np.floor(latitudes * 111_320 / radius)
+        cell_x = np.floor(longitudes * 111_320 * cos_lat / radius)
+        expected = {(i, j) for i in range(n) for j in range(i + 1, n)
+                    if groups[i] == groups[j] and abs(cell_x[i] - cell_x[j]) <= 1
+                    and abs(cell_y[i] - cell_y[j]) <= 1 and (keys[i] == keys[j]).any()}
+        
+        assert set(map(tuple, pairs.tolist())) == expected
+
+
+class TestDuplicateGroups:
+    """Grouping by type, distance and text similarity."""
+    
+    def test_groups_require_type_distance_and_text(self):
+        """Test only nearby, same-type, similar reports are grouped, transitively."""
+        df = pd.DataFrame({
+            'type': ['pothole', 'pothole', 'pothole', 'gas_leak', 'pothole', 'pothole'],
+            'latitude': [33.7156, 33.7160, 33.7164, 33.7156, 33.7300, 33.7156],
+            'longitude': [73.0644, 73.0644, 73.0644, 73.0644, 73.0644, 73.0644],
+            'title': ['Deep Pothole F-6 Park', 'Deep pothole F6 Park', 'Deep Pothole F-6 Park',
+                      'Deep Pothole F-6 Park', 'Deep Pothole F-6 Park', 'Signal Failure G-9'],
+        })
+        
+        labels = duplicate_groups(df, radius_m=60, similarity=0.6)
+        
+        # Rows 0 and 2 are 90 m apart but both within 60 m of row 1
+        assert haversine_m(33.7156, 73.0644, 33.7164, 73.0644) > 60
+        assert labels.tolist() == [0, 0, 0, 1, 2, 3]
+    
+    def test_large_input_finds_planted_duplicates(self):
+        """Test every planted near-copy is found among thousands of complaints."""
+        rng = np.random.default_rng(0)
+        n, k = 20000, 500
+        words = ['pothole', 'deep', 'road', 'signal', 'failure', 'gas', 'leak', 'water', 'pipe', 'fire']
+        df = pd.DataFrame({'type': rng.choice(['a', 'b', 'c'], n),
+                           'latitude': 33.6 + rng.random(n) * 0.2,
+                           'longitude': 73.0 + rng.random(n) * 0.2,
+                           'title': [f"{' '.join(rng.choice(words, 4))} {rng.integers(100)}" for _ in range(n)]})
+        sources = rng.choice(n, k, replace=False)
+        copies = df.iloc[sources].assign(latitude=lambda d: d['latitude'] + 0.0005)
+        
+        labels = duplicate_groups(pd.concat([df, copies], ignore_index=True), radius_m=100, similarity=0.6)
+        
+        assert np.array_equal(labels[sources], labels[n:])
+
+
+class TestLoaderDeduplication:
+    """Canonical complaints after merging duplicate reports."""
+    
+    def test_sample_duplicates_are_merged(self):
+        """Test repeated sample reports collapse into their earliest report."""
+        loader = ComplaintDataLoader()
+        raw = loader.load_from_csv(SAMPLE_CSV)
+        
+        result = loader.deduplicate()
+        merged = result.set_index('id').loc['C-1060']
+        
+        assert len(result) == len(raw) - 3
+        assert loader.complaints_df is result
+        assert merged['merged_ids'] == 'C-1071'
+        assert merged['duplicate_count'] == 2
+        assert merged['affected_people'] == raw.set_index('id').loc[['C-1060', 'C-1071'], 'affected_people'].sum()
+        assert loader.duplicate_of['C-1071'] == 'C-1060'
+        assert result['affected_people'].sum() == raw['affected_people'].sum()
+    
+    def test_requires_loaded_data(self):
+        """Test deduplication needs data."""
+        with pytest.raises(ValueError):
+            ComplaintDataLoader().deduplicate()
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,85 @@
+"""
+Test Suite for Fuzzy AHP
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.ahp_core import AHPCore
+from src.fuzzy_ahp import FuzzyAHP, calculate_weights_batch, crisp_to_tfn, defuzzify
+from src.prioritizer import ComplaintPrioritizer
+
+
+COMPARISONS = {("A", "B"): 3, ("A", "C"): 5, ("B", "C"): 2}
+
+
+class TestTriangularArithmetic:
+    """Fuzzification and batch weights on (k, n, n, 3) arrays."""
+    
+    def test_fuzzify_keeps_reciprocity(self):
+        """Test a_ji is the reciprocal TFN of a_ij and bounds stay on the scale."""
+        ahp = AHPCore(["A", "B", "C"])
+        fuzzy = crisp_to_tfn(ahp.create_comparison_matrix({("A", "B"): 9, ("A", "C"): 1/3, ("B", "C"): 1}))
+        
+        assert fuzzy[0, 1].tolist() == [8, 9, 9]
+        assert np.allclose(fuzzy[1, 0], 1 / fuzzy[0, 1][::-1])
+        assert np.allclose(fuzzy[0, 2], [1/4, 1/3, 1/2])
+        assert fuzzy[1, 2].tolist() == [1, 1, 1]
+        assert (fuzzy[..., 0] <= fuzzy[..., 1]).all() and (fuzzy[..., 1] <= fuzzy[..., 2]).all()
+    
+    def test_zero_spread_matches_geometric_mean(self):
+        """Test crisp TFNs reduce to the row geometric mean weights."""
+        matrices = np.stack([AHPCore(["A", "B", "C"]).create_comparison_matrix(COMPARISONS)] * 4)
+        
+        fuzzy = calculate_weights_batch(crisp_to_tfn(matrices, spread=0))
+        crisp, _, _ = AHPCore.calculate_weights_batch(matrices, method='geometric_mean')
+        
+        assert np.allclose(fuzzy, crisp)
+    
+    def test_batch_matches_single(self):
+        """Test batched weights equal one-matrix-at-a-time FuzzyAHP."""
+        single = FuzzyAHP(["A", "B", "C"])
+        single.create_fuzzy_matrix(COMPARISONS)
+        
+        batch = calculate_weights_batch(np.stack([single.fuzzy_matrix] * 3), method='graded_mean')
+        
+        assert np.allclose(batch, single.calculate_weights(method='graded_mean'))
+    
+    def test_unknown_defuzzification(self):
+        """Test unknown defuzzification methods are rejected."""
+        with pytest.raises(ValueError):
+            defuzzify(np.ones((2, 3)), method='mode')
+
+
+class TestFuzzyWeights:
+    """Fuzzy weights as an alternative weight provider."""
+    
+    def test_explicit_tfn_judgments(self):
+        """Test (l, m, u) tuples are used as given."""
+        fuzzy = FuzzyAHP(["A", "B"])
+        matrix = fuzzy.create_fuzzy_matrix({("A", "B"): (2, 3, 5)})
+        
+        assert np.allclose(matrix[1, 0], [1/5, 1/3, 1/2])
+        assert fuzzy.calculate_weights()[0] > 0.7
+        
+        with pytest.raises(ValueError):
+            fuzzy.create_fuzzy_matrix({("A", "B"): (3, 2, 5)})
+    
+    def test_prioritizer_scoring_path_unchanged(self):
+        """Test fuzzy weights plug into the prioritizer and sum to 1."""
+        prioritizer = ComplaintPrioritizer()
+        prioritizer.load_fuzzy_weights('default')
+        
+        assert np.isclose(prioritizer.ahp.weights.sum(), 1.0)
+        assert prioritizer.ahp.is_consistent()
+        assert np.argmax(prioritizer.ahp.weights) == 0
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
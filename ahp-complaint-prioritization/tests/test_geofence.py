@@ -0,0 +1,154 @@
+"""
+Test Suite for Geofencing
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+from matplotlib.path import Path as PolygonPath
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.data_loader import ComplaintDataLoader
+from src.geofence import Geofence, str_pack
+
+
+def square(x, y, size):
+    """Closed square ring with its lower-left corner at (x, y)."""
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+def polygon_feature(rings, **properties):
+    """GeoJSON Polygon feature."""
+    return {'type': 'Feature', 'properties': properties, 'geometry': {'type': 'Polygon', 'coordinates': rings}}
+
+
+def random_sectors(k, seed):
+    """k x k grid of irregular, partly overlapping star-shaped polygons."""
+    rng = np.random.default_rng(seed)
+    size = 0.2 / k
+    features = []
+    for a in range(k):
+        for b in range(k):
+            angles = np.sort(rng.random(30)) * 2 * np.pi
+            radii = size * (0.4 + 0.3 * rng.random(30))
+            ring = np.column_stack([73.0 + (a + 0.5) * size + radii * np.cos(angles),
+                                    33.6 + (b + 0.5) * size + radii * np.sin(angles)])
+            features.append(polygon_feature([np.vstack([ring, ring[:1]]).tolist()], name=f"S{a}-{b}"))
+    return features
+
+
+class TestRTree:
+    """STR packing and tree descent."""
+    
+    def test_str_pack_is_a_permutation(self):
+        """Test packing orders every box once, grouped into vertical slices."""
+        boxes = np.random.default_rng(0).random((1000, 2)).repeat(2, axis=1)[:, [0, 2, 1, 3]]
+        
+        order = str_pack(boxes, 16)
+        
+        assert np.array_equal(np.sort(order), np.arange(1000))
+        assert (np.diff(boxes[order, 0][:256]) >= -1).all()
+    
+    @pytest.mark.parametrize('capacity', [2, 4, 16])
+    def test_candidates_match_box_scan(self, capacity):
+        """Test the tree returns exactly the features whose box holds each point."""
+        geofence = Geofence(random_sectors(9, seed=1), capacity=capacity)
+        rng = np.random.default_rng(1)
+        x, y = 72.98 + rng.random(3000) * 0.24, 33.58 + rng.random(3000) * 0.24
+        
+        points, features = geofence.candidates(x, y)
+        
+        b = geofence.bounds
+        inside = (b[:, 0] <= x[:, None]) & (x[:, None] <= b[:, 2]) & (b[:, 1] <= y[:, None]) & (y[:, None] <= b[:, 3])
+        assert set(zip(points.tolist(), features.tolist())) == set(zip(*map(np.ndarray.tolist, np.nonzero(inside))))
+
+
+class TestLocate:
+    """Point-in-polygon assignment."""
+    
+    def test_matches_reference_containment(self, monkeypatch):
+        """Test against matplotlib containment, earliest overlapping feature first."""
+        monkeypatch.setattr('geofence.EDGE_BLOCK', 500)
+        features = random_sectors(8, seed=2)
+        geofence = Geofence(features, capacity=4)
+        rng = np.random.default_rng(2)
+        lon, lat = 72.98 + rng.random(5000) * 0.24, 33.58 + rng.random(5000) * 0.24
+        lat[::100] = np.nan
+        
+        located = geofence.locate(lat, lon)
+        
+        expected = np.full(len(lat), -1)
+        points = np.column_stack([lon, lat])
+        for i in reversed(range(len(features))):
+            ring = features[i]['geometry']['coordinates'][0]
+            expected[PolygonPath(ring).contains_points(points)] = i
+        assert np.array_equal(located, expected)
+        assert (located[::100] == -1).all()
+    
+    def test_holes_and_multipolygons(self):
+        """Test points in holes fall through and every part of a multipolygon counts."""
+        geofence = Geofence([
+            polygon_feature([square(0, 0, 10), square(4, 4, 2)], name='ring'),
+            {'type': 'Feature', 'properties': {'name': 'parts'},
+             'geometry': {'type': 'MultiPolygon', 'coordinates': [[square(20, 0, 2)], [square(30, 0, 2)]]}},
+        ])
+        
+        located = geofence.locate(np.array([1, 5, 1, 1, 1]), np.array([1, 5, 21, 31, 25]))
+        
+        assert located.tolist() == [0, -1, 1, 1, -1]
+    
+    def test_loads_geojson(self, tmp_path):
+        """Test reading a FeatureCollection and rejecting other geometries."""
+        path = tmp_path / 'sectors.geojson'
+        path.write_text(json.dumps({'type': 'FeatureCollection', 'features': [polygon_feature([square(0, 0, 1)], name='A')]}))
+        
+        geofence = Geofence.from_geojson(path)
+        
+        assert geofence.properties['name'].tolist() == ['A']
+        with pytest.raises(ValueError, match="Unsupported geometry"):
+            Geofence([{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [0, 0]}}])
+
+
+class TestLoaderGeofence:
+    """Department and location columns from polygons."""
+    
+    def setup_method(self):
+        self.loader = ComplaintDataLoader()
+        self.loader.complaints_df = pd.DataFrame({
+            'latitude': [0.5, 0.5, 5.5, 0.5, 9.0],
+            'longitude': [0.5, 0.5, 5.5, 0.5, 9.0],
+            'department': ['Parks', 'Roads', 'Roads', None, 'Parks'],
+            'location_name': ['Old Name', None, 'Market', None, 'Lake'],
+            'department_load': [3, 25, 12, 3, 7],
+            'created_at': ['2024-11-01T00:00Z', '2024-11-10T00:00Z', '2024-11-02T00:00Z',
+                           '2024-11-03T00:00Z', '2024-11-04T00:00Z'],
+        })
+        self.geofence = Geofence([polygon_feature([square(0, 0, 1)], name='Sector A', department='Roads'),
+                                  polygon_feature([square(5, 5, 1)], name='Sector B')])
+    
+    def test_overwrites_and_reloads_department_load(self):
+        """Test polygon values replace the columns and moved complaints take the new department's load."""
+        result = self.loader.assign_geofence(self.geofence)
+        
+        assert result['department'].tolist() == ['Roads', 'Roads', 'Roads', 'Roads', 'Parks']
+        assert result['location_name'].tolist() == ['Sector A', 'Sector A', 'Sector B', 'Sector A', 'Lake']
+        # Roads last reported a load of 25 (2024-11-10) on a complaint it already had
+        assert result['department_load'].tolist() == [25, 25, 12, 25, 7]
+        assert self.loader.complaints_df is result
+    
+    def test_fill_missing_only(self):
+        """Test existing values are kept when overwrite is off."""
+        result = self.loader.assign_geofence(self.geofence, overwrite=False)
+        
+        assert result['department'].tolist() == ['Parks', 'Roads', 'Roads', 'Roads', 'Parks']
+        assert result['location_name'].tolist() == ['Old Name', 'Sector A', 'Market', 'Sector A', 'Lake']
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+"""
+Test Suite for Group AHP Aggregation
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.ahp_core import AHPCore
+from src.group_ahp import GroupAHP
+
+
+CRITERIA = ['A', 'B', 'C']
+
+CONSISTENT = {('A', 'B'): 2, ('A', 'C'): 4, ('B', 'C'): 2}
+OTHER = {('A', 'B'): 3, ('A', 'C'): 3, ('B', 'C'): 1}
+INCONSISTENT = {('A', 'B'): 9, ('A', 'C'): 1/9, ('B', 'C'): 9}
+
+
+def single_weights(comparisons):
+    """Weights of one evaluator via AHPCore."""
+    ahp = AHPCore(CRITERIA)
+    ahp.create_comparison_matrix(comparisons)
+    return ahp.calculate_weights()
+
+
+class TestGroupAggregation:
+    """AIJ / AIP aggregation and inconsistency policies."""
+    
+    def test_single_evaluator_matches_ahp_core(self):
+        """Test a one-person group reproduces AHPCore."""
+        group = GroupAHP(CRITERIA)
+        group.add_evaluator('solo', OTHER)
+        
+        for method in GroupAHP.AGGREGATION_METHODS:
+            assert np.allclose(group.aggregate(method).weights, single_weights(OTHER))
+    
+    def test_aij_is_geometric_mean_of_judgments(self):
+        """Test the group matrix is the element-wise geometric mean and reciprocal."""
+        group = GroupAHP(CRITERIA)
+        group.add_evaluator('first', CONSISTENT)
+        group.add_evaluator('second', OTHER)
+        
+        ahp = group.aggregate('aij')
+        
+        assert np.isclose(ahp.comparison_matrix[0, 1], np.sqrt(2 * 3))
+        assert np.allclose(ahp.comparison_matrix * ahp.comparison_matrix.T, 1.0)
+    
+    def test_aip_is_geometric_mean_of_priorities(self):
+        """Test AIP weights against a direct calculation."""
+        group = GroupAHP(CRITERIA)
+        group.add_evaluator('first', CONSISTENT, importance=3)
+        group.add_evaluator('second', OTHER, importance=1)
+        
+        expected = single_weights(CONSISTENT) ** 0.75 * single_weights(OTHER) ** 0.25
+        
+        assert np.allclose(group.aggregate('aip').weights, expected / expected.sum())
+    
+    def test_aip_follows_weight_method(self):
+        """Test AIP re-derives evaluator weights when the weight method changes."""
+        criteria = ['A', 'B', 'C', 'D']
+        comparisons = {('A', 'B'): 3, ('A', 'C'): 1/2, ('A', 'D'): 7,
+                       ('B', 'C'): 5, ('B', 'D'): 1/3, ('C', 'D'): 4}
+        group = GroupAHP(criteria)
+        group.add_evaluator('solo', comparisons)
+        
+        eigen = group.aggregate('aip').weights
+        geometric = group.aggregate('aip', weight_method='geometric_mean').weights
+        
+        ahp = AHPCore(criteria)
+        ahp.create_comparison_matrix(comparisons)
+        assert np.allclose(geometric, ahp.calculate_weights(method='geometric_mean'))
+        assert not np.allclose(eigen, geometric)
+    
+    def test_inconsistency_policies(self):
+        """Test dropping and down-weighting evaluators with CR >= threshold."""
+        group = GroupAHP(CRITERIA)
+        group.add_evaluator('good', CONSISTENT)
+        group.add_evaluator('bad', INCONSISTENT)
+        
+        cr = group.evaluate()['consistency_ratio']
+        assert cr['good'] < 0.1 <= cr['bad']
+        
+        assert np.allclose(group.evaluator_weights(policy='drop'), [1.0, 0.0])
+        downweighted = group.evaluator_weights(policy='downweight')
+        assert 0 < downweighted[1] < downweighted[0]
+        assert np.allclose(group.aggregate(policy='drop').weights, single_weights(CONSISTENT))
+    
+    def test_all_inconsistent_dropped_raises(self):
+        """Test dropping every evaluator is an error."""
+        group = GroupAHP(CRITERIA)
+        group.add_evaluator('bad', INCONSISTENT)
+        
+        with pytest.raises(ValueError):
+            group.aggregate(policy='drop')
+    
+    def test_survey_matches_individual_evaluators(self):
+        """Test survey rows, reversed columns and batch CR against one-by-one adds."""
+        survey = pd.DataFrame({
+            'evaluator': ['first', 'second'],
+            'A vs B': [2, 3],
+            'C vs A': [1/4, 1/3],
+            'B vs C': [2, 1]
+        })
+        from_survey = GroupAHP(CRITERIA)
+        from_survey.add_survey_responses(survey)
+        
+        one_by_one = GroupAHP(CRITERIA)
+        one_by_one.add_evaluator('first', CONSISTENT)
+        one_by_one.add_evaluator('second', OTHER)
+        
+        assert np.allclose(from_survey.evaluator_matrices, one_by_one.evaluator_matrices)
+        assert np.allclose(from_survey.evaluate().to_numpy(), one_by_one.evaluate().to_numpy())
+    
+    def test_unknown_criteria_rejected(self):
+        """Test comparisons naming unknown criteria are rejected."""
+        group = GroupAHP(CRITERIA)
+        
+        with pytest.raises(ValueError):
+            group.add_evaluator('typo', {('A', 'D'): 3})
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,110 @@
+"""
+Test Suite for Hierarchical AHP
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.ahp_core import AHPCore
+from src.config_loader import load_config
+from src.hierarchy import AHPHierarchy, HierarchyNode
+
+
+def make_hierarchy():
+    """Goal -> (Safety -> Injury, Property), Impact."""
+    safety = HierarchyNode('Safety', [HierarchyNode('Injury'), HierarchyNode('Property')],
+                           {('Injury', 'Property'): 3})
+    return AHPHierarchy(HierarchyNode('Goal', [safety, HierarchyNode('Impact')], {('Safety', 'Impact'): 4}))
+
+
+class TestHierarchy:
+    """Global weights, caching and score aggregation."""
+    
+    def test_global_weights_are_path_products(self):
+        """Test leaf weights multiply local weights along each path."""
+        weights = make_hierarchy().global_weights()
+        
+        assert list(weights.index) == ['Injury', 'Property', 'Impact']
+        assert np.allclose(weights.to_numpy(), [0.8 * 0.75, 0.8 * 0.25, 0.2])
+    
+    def test_changing_judgments_invalidates_only_that_node(self):
+        """Test the root keeps its cached model when a child changes."""
+        hierarchy = make_hierarchy()
+        hierarchy.global_weights()
+        root_ahp, safety_ahp = hierarchy.root.ahp, hierarchy.find('Safety').ahp
+        
+        hierarchy.find('Safety').set_comparisons({('Injury', 'Property'): 1})
+        weights = hierarchy.global_weights()
+        
+        assert hierarchy.root.ahp is root_ahp
+        assert hierarchy.find('Safety').ahp is not safety_ahp
+        assert np.allclose(weights.to_numpy(), [0.4, 0.4, 0.2])
+    
+    def test_criterion_scores_collapse_sub_criteria(self):
+        """Test inner node scores are weighted sums of their children."""
+        leaf_scores = pd.DataFrame({'Injury': [1.0, 0.0], 'Property': [0.0, 1.0], 'Impact': [0.5, 0.5]})
+        
+        scores = make_hierarchy().criterion_scores(leaf_scores)
+        
+        assert list(scores.columns) == ['Safety', 'Impact']
+        assert np.allclose(scores['Safety'], [0.75, 0.25])
+    
+    def test_duplicate_names_rejected(self):
+        """Test criterion names must be unique."""
+        with pytest.raises(ValueError):
+            AHPHierarchy(HierarchyNode('Goal', [HierarchyNode('A', [HierarchyNode('A')])]))
+    
+    def test_config_hierarchy_matches_flat_weights(self):
+        """Test the config hierarchy keeps the top-level weights of the flat profile."""
+        hierarchy = AHPHierarchy.from_config('default')
+        weights = hierarchy.global_weights()
+        
+        flat = AHPHierarchy.from_config('default', config={**load_config(), 'sub_criteria': {}}).global_weights()
+        
+        assert np.isclose(weights.sum(), 1.0)
+        assert np.isclose(weights[['Injury Risk', 'Property Risk', 'Fire Risk']].sum(),
+                          flat['Public Safety Risk'])
+
+
+class TestRandomIndex:
+    """Simulated Random Index for matrices larger than Saaty's table."""
+    
+    def test_simulation_matches_saaty_table(self):
+        """Test the simulation reproduces published values."""
+        assert abs(AHPCore.simulate_random_index(5, n_samples=5000) - AHPCore.RANDOM_INDEX[5]) < 0.03
+        assert abs(AHPCore.simulate_random_index(10, n_samples=5000) - AHPCore.RANDOM_INDEX[10]) < 0.03
+    
+    def test_large_n_is_simulated_and_persisted(self, monkeypatch, tmp_path):
+        """Test n > 10 no longer falls back to 1.49 and is cached on disk."""
+        cache_file = tmp_path / 'random_index.json'
+        monkeypatch.setattr(AHPCore, 'RANDOM_INDEX_CACHE', cache_file)
+        monkeypatch.setattr(AHPCore, 'RANDOM_INDEX_SAMPLES', 2000)
+        monkeypatch.setattr(AHPCore, '_simulated_random_index', {})
+        
+        ri = AHPCore.random_index(12)
+        
+        assert 1.49 < ri < 1.6
+        assert json.loads(cache_file.read_text()) == {'12:2000:0': ri}
+        
+        # Other simulation settings are stored under their own key
+        other = AHPCore.random_index(12, n_samples=1000, seed=1)
+        assert other != ri
+        assert json.loads(cache_file.read_text()) == {'12:2000:0': ri, '12:1000:1': other}
+        
+        # A fresh process reads the stored value instead of simulating again
+        monkeypatch.setattr(AHPCore, '_simulated_random_index', {})
+        monkeypatch.setattr(AHPCore, 'simulate_random_index', lambda *args: pytest.fail("simulated again"))
+        assert AHPCore.random_index(12) == ri
+        assert AHPCore.random_index(12, n_samples=1000, seed=1) == other
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,393 @@
+"""
+Test Suite for Complaint Prioritization Engine
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.config_loader import parse_pairwise_comparisons
+from src.data_loader import ComplaintDataLoader
+from src.prioritizer import ComplaintPrioritizer
+
+
+SAMPLE_CSV = Path(__file__).parent.parent / 'data' / 'sample_complaints.csv'
+AS_OF = '2024-12-20T12:00Z'
+
+
+@pytest.fixture
+def enriched_df():
+    """Sample complaints with criteria scores at a fixed reference time."""
+    loader = ComplaintDataLoader()
+    loader.load_from_csv(SAMPLE_CSV)
+    return loader.enrich_complaint_data(as_of=AS_OF)
+
+
+@pytest.fixture
+def prioritizer():
+    """Prioritizer with default weights."""
+    prioritizer = ComplaintPrioritizer()
+    prioritizer.load_default_weights()
+    return prioritizer
+
+
+class TestTopKSelection:
+    """Top-K selection must match the head of the full ranking."""
+
+    def test_top_k_matches_full_ranking(self, prioritizer, enriched_df):
+        """Test ids and dense ranks, including tied scores."""
+        top = prioritizer.prioritize_complaints(enriched_df, top_k=15)
+        assert prioritizer._prioritized_complaints is None
+
+        full = prioritizer.prioritized_complaints.head(15)
+
+        assert top['id'].tolist() == full['id'].tolist()
+        assert top['priority_rank'].tolist() == full['priority_rank'].tolist()
+
+    def test_top_k_with_ties_at_boundary(self, prioritizer):
+        """Test tied scores straddling the cut-off keep input order."""
+        scored = pd.DataFrame({'id': list('abcdef'),
+                               'priority_score': [0.2, 0.9, 0.5, 0.5, 0.5, 0.1]})
+
+        top = prioritizer._select_top(scored, 3)
+
+        assert top['id'].tolist() == ['b', 'c', 'd']
+        assert top['priority_rank'].tolist() == [1.0, 2.0, 2.0]
+
+    def test_top_k_with_many_ties_matches_stable_sort(self, prioritizer):
+        """Test tie-heavy random scores against the head of the stable full sort."""
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            n = int(rng.integers(1, 400))
+            scored = pd.DataFrame({'id': np.arange(n), 'priority_score': rng.integers(0, 8, n) / 8})
+            k = int(rng.integers(1, n + 2))
+            
+            top = prioritizer._select_top(scored, k)
+            
+            expected = scored.sort_values('priority_score', ascending=False, kind='stable').head(k)
+            assert top['id'].tolist() == expected['id'].tolist()
+    
+    def test_larger_request_extends_selection(self, prioritizer, enriched_df):
+        """Test asking for more than the cached top K still works lazily."""
+        prioritizer.prioritize_complaints(enriched_df, top_k=5)
+
+        assert len(prioritizer.get_top_priorities(20)) == 20
+        assert prioritizer._prioritized_complaints is None
+
+
+class TestWeightProfiles:
+    """Scoring all config weight profiles in one batch."""
+    
+    def test_profiles_match_single_profile_runs(self, enriched_df):
+        """Test each profile column equals a separate single-profile run."""
+        prioritizer = ComplaintPrioritizer()
+        weights = prioritizer.load_weight_profiles()
+        result = prioritizer.prioritize_profiles(enriched_df)
+        
+        assert list(weights.index) == ['default', 'safety_focused', 'efficiency_focused']
+        assert np.allclose(weights.sum(axis=1), 1.0)
+        
+        for name in weights.index:
+            single = ComplaintPrioritizer()
+            single.ahp.weights = weights.loc[name].to_numpy()
+            expected = single.prioritize_complaints(enriched_df).sort_index()
+            
+            assert np.allclose(result[f'priority_score_{name}'], expected['priority_score'])
+            assert result[f'priority_rank_{name}'].equals(expected['priority_rank'])
+    
+    def test_rank_agreement_summary(self, enriched_df):
+        """Test the pairwise agreement table."""
+        prioritizer = ComplaintPrioritizer()
+        prioritizer.load_weight_profiles()
+        prioritizer.prioritize_profiles(enriched_df)
+        
+        summary = prioritizer.compare_profile_rankings(top_k=10)
+        
+        assert len(summary) == 3
+        assert summary['spearman'].between(-1, 1).all()
+        assert summary['top_10_overlap'].between(0, 1).all()
+    
+    def test_unknown_criteria_rejected(self):
+        """Test profiles referencing unknown criteria are rejected."""
+        with pytest.raises(ValueError):
+            parse_pairwise_comparisons({'Public Safety Risk vs Cost': 3}, ComplaintPrioritizer.DEFAULT_CRITERIA)
+
+
+class TestStreamingPrioritization:
+    """Chunked prioritization must agree with the in-memory path."""
+
+    def test_stream_matches_full_prioritization(self, prioritizer, enriched_df, tmp_path):
+        """Test top complaints, ranks and written scores."""
+        full = prioritizer.prioritize_complaints(enriched_df)
+
+        loader = ComplaintDataLoader()
+        chunks = (loader.enrich_frame(chunk, as_of=AS_OF)
+                  for chunk in loader.iter_csv_chunks(SAMPLE_CSV, chunksize=7))
+        output = tmp_path / 'stream.csv'
+        top = prioritizer.prioritize_stream(chunks, output, top_n=10)
+
+        assert top['id'].tolist() == full.head(10)['id'].tolist()
+        assert top['priority_rank'].tolist() == full.head(10)['priority_rank'].tolist()
+
+        written = pd.read_csv(output)
+        assert len(written) == len(enriched_df)
+        assert np.allclose(written['priority_score'], prioritizer.calculate_priority_scores(enriched_df))
+    
+    def test_stream_keeps_earliest_ties(self, prioritizer, tmp_path):
+        """Test tied scores at the cut-off keep the earliest rows, as the full sort does."""
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            n, chunksize, top_n = int(rng.integers(50, 600)), int(rng.integers(20, 200)), int(rng.integers(1, 40))
+            levels = rng.integers(0, 3, n) / 3
+            df = pd.DataFrame({col: levels for col in prioritizer.CRITERIA_COLUMNS})
+            df.insert(0, 'id', np.arange(n))
+            
+            top = prioritizer.prioritize_stream((df.iloc[i:i + chunksize].copy() for i in range(0, n, chunksize)),
+                                                tmp_path / 'out.csv', top_n=top_n)
+            
+            full = prioritizer.prioritize_complaints(df)
+            assert top['id'].tolist() == full.head(top_n)['id'].tolist()
+    
+    def test_stream_rejects_empty_top(self, prioritizer, enriched_df, tmp_path):
+        """Test top_n below one is rejected before any chunk is read."""
+        with pytest.raises(ValueError, match="top_n must be at least 1"):
+            prioritizer.prioritize_stream([enriched_df.copy()], tmp_path / 'out.csv', top_n=0)
+        assert not (tmp_path / 'out.csv').exists()
+
+    def test_stream_summary_report(self, prioritizer, enriched_df, tmp_path):
+        """Test the summary report is available after streaming."""
+        prioritizer.prioritize_stream([enriched_df.copy()], tmp_path / 'out.csv', top_n=5)
+
+        report = prioritizer.generate_summary_report()
+
+        assert f"Total Complaints: {len(enriched_df)}" in report
+        assert len(prioritizer.get_top_priorities(5)) == 5
+
+
+class TestPriorityLevels:
+    """Single-pass priority level assignment."""
+
+    def test_levels_match_quantile_masks(self, prioritizer, enriched_df):
+        """Test levels agree with the original quantile mask definition."""
+        prioritizer.prioritize_complaints(enriched_df)
+        scores = prioritizer.scored_complaints['priority_score']
+        q25, q50, q75 = scores.quantile([0.25, 0.50, 0.75])
+
+        counts = prioritizer.get_priority_level_counts()
+
+        assert list(counts) == ['critical', 'high', 'medium', 'low']
+        assert counts['critical'] == (scores >= q75).sum()
+        assert counts['high'] == ((scores >= q50) & (scores < q75)).sum()
+        assert counts['medium'] == ((scores >= q25) & (scores < q50)).sum()
+        assert counts['low'] == (scores < q25).sum()
+    
+    def test_counts_do_not_need_full_ranking(self, prioritizer, enriched_df):
+        """Test counting stays on the unsorted scored frame."""
+        prioritizer.prioritize_complaints(enriched_df, top_k=5)
+        
+        prioritizer.get_priority_level_counts()
+        
+        assert prioritizer._prioritized_complaints is None
+        assert prioritizer.scored_complaints['priority_level'].dtype == 'category'
+    
+    def test_categories_from_config(self, enriched_df):
+        """Test thresholds come from the priority_categories config section."""
+        prioritizer = ComplaintPrioritizer()
+        prioritizer.load_default_weights()
+        prioritizer.load_priority_categories()
+        prioritizer.prioritize_complaints(enriched_df)
+        
+        categories = prioritizer.get_priority_categories()
+        
+        assert prioritizer.priority_percentiles == {'critical': 75, 'high': 50, 'medium': 25, 'low': 0}
+        assert sum(len(df) for df in categories.values()) == len(enriched_df)
+    
+    def test_stream_counts_are_approximate(self, prioritizer, enriched_df, tmp_path):
+        """Test streamed level counts stay close to the exact counts."""
+        prioritizer.prioritize_complaints(enriched_df)
+        exact = prioritizer.get_priority_level_counts()
+        
+        prioritizer.prioritize_stream([enriched_df.copy()], tmp_path / 'out.csv', top_n=5)
+        approximate = prioritizer.get_priority_level_counts()
+        
+        assert sum(approximate.values()) == len(enriched_df)
+        for level in exact:
+            assert abs(approximate[level] - exact[level]) <= 2
+
+
+
+class TestDepartmentPartitions:
+    """Per-department slices of the ranking."""
+    
+    def test_slices_match_filtered_ranking(self, prioritizer, enriched_df):
+        """Test each department block equals a mask over the full ranking."""
+        ranked = prioritizer.prioritize_complaints(enriched_df)
+        
+        for department, count in prioritizer.get_department_counts().items():
+            expected = ranked[ranked['department'] == department]
+            result = prioritizer.get_department_priorities(department)
+            
+            assert count == len(expected)
+            assert result['id'].tolist() == expected['id'].tolist()
+            assert result['priority_rank'].tolist() == expected['priority_rank'].tolist()
+            assert prioritizer.get_department_priorities(department, n=2)['id'].tolist() == expected['id'].tolist()[:2]
+        
+        assert sum(prioritizer.get_department_counts().values()) == len(enriched_df)
+        assert prioritizer.get_department_priorities('Unknown Department').empty
+    
+    def test_partitions_follow_new_results(self, prioritizer, enriched_df):
+        """Test the partitions are rebuilt for a new prioritization and keep levels."""
+        prioritizer.prioritize_complaints(enriched_df)
+        department = enriched_df['department'].iloc[0]
+        before = prioritizer.get_department_counts()[department]
+        
+        prioritizer.prioritize_complaints(enriched_df[enriched_df['department'] != department])
+        counts = prioritizer.get_department_counts()
+        levels = prioritizer.assign_priority_levels()
+        
+        assert before > 0 and department not in counts
+        for other in counts:
+            result = prioritizer.get_department_priorities(other)
+            assert result['priority_level'].tolist() == levels[result.index].tolist()
+
+
+
+class TestIncrementalPrioritization:
+    """Delta batches must reproduce a full rescore."""
+    
+    LATER = '2024-12-27T12:00Z'
+    
+    @pytest.fixture
+    def raw_df(self):
+        """Raw sample complaints without criteria scores."""
+        return pd.read_csv(SAMPLE_CSV)
+    
+    def apply_changes(self, raw_df):
+        """Split the sample into a base batch and a delta, plus the expected result."""
+        base = raw_df.iloc[:-5]
+        delta = pd.concat([raw_df.iloc[[0, 3]], raw_df.iloc[-5:]])
+        delta.loc[delta.index[:2], 'affected_people'] = [5000, 1]
+        deleted = [raw_df['id'].iloc[1]]
+        
+        expected = pd.concat([base, raw_df.iloc[-5:]])
+        expected.loc[delta.index[:2], 'affected_people'] = [5000, 1]
+        return base, delta, deleted, expected[~expected['id'].isin(deleted)]
+    
+    def full_rescore(self, prioritizer, raw_df, as_of):
+        """Enrich and score a raw frame from scratch."""
+        loader = ComplaintDataLoader()
+        loader.complaints_df = raw_df.reset_index(drop=True)
+        prioritizer.prioritize_complaints(loader.enrich_complaint_data(as_of=as_of))
+        return prioritizer.scored_complaints.set_index('id', drop=False)
+    
+    def test_delta_matches_full_rescore(self, prioritizer, raw_df):
+        """Test scores, urgency and level counts after inserts, updates and deletes."""
+        base, delta, deleted, expected_df = self.apply_changes(raw_df)
+        self.full_rescore(prioritizer, base, AS_OF)
+        
+        counts = prioritizer.apply_delta(delta, deleted_ids=deleted, as_of=self.LATER)
+        result = prioritizer.scored_complaints
+        
+        reference = ComplaintPrioritizer()
+        reference.load_default_weights()
+        expected = self.full_rescore(reference, expected_df, self.LATER)
+        
+        assert counts['inserted'] == 5 and counts['updated'] == 2 and counts['deleted'] == 1
+        assert result['id'].tolist() == expected['id'].tolist()
+        np.testing.assert_allclose(result['urgency_score'], expected['urgency_score'])
+        np.testing.assert_array_equal(result['priority_score'], expected['priority_score'])
+        expected_ranks = reference.prioritized_complaints.set_index('id')['priority_rank']
+        assert [prioritizer.rank_of(i) for i in expected['id']] == expected_ranks[expected['id']].tolist()
+        assert prioritizer.get_priority_level_counts() == reference.get_priority_level_counts()
+        assert prioritizer.get_top_priorities(5)['id'].tolist() == reference.get_top_priorities(5)['id'].tolist()
+    
+    def test_rescores_only_aged_rows(self, prioritizer, raw_df):
+        """Test an unchanged reference time rescores nothing."""
+        self.full_rescore(prioritizer, raw_df, AS_OF)
+        
+        counts = prioritizer.apply_delta(as_of=AS_OF)
+        
+        assert counts == {'inserted': 0, 'updated': 0, 'deleted': 0, 'rescored': 0}
+    
+    def test_state_round_trip(self, prioritizer, raw_df, tmp_path):
+        """Test saved state reloads and keeps accepting deltas."""
+        base, delta, deleted, _ = self.apply_changes(raw_df)
+        self.full_rescore(prioritizer, base, AS_OF)
+        prioritizer.save_state(tmp_path / 'state.pkl')
+        
+        restored = ComplaintPrioritizer()
+        restored.load_default_weights()
+        restored.load_state(tmp_path / 'state.pkl')
+        
+        prioritizer.apply_delta(delta, deleted_ids=deleted, as_of=self.LATER)
+        restored.apply_delta(delta, deleted_ids=deleted, as_of=self.LATER)
+        
+        pd.testing.assert_series_equal(restored.scored_complaints['priority_score'],
+                                       prioritizer.scored_complaints['priority_score'])
+    
+    def test_duplicate_ids_rejected(self, prioritizer, raw_df):
+        """Test the state cannot be keyed by non-unique ids."""
+        self.full_rescore(prioritizer, pd.concat([raw_df, raw_df.head(1)]), AS_OF)
+        
+        with pytest.raises(ValueError, match="Duplicate complaint ids"):
+            prioritizer.apply_delta(as_of=AS_OF)
+    
+    def test_rank_queries_after_delta(self, prioritizer, raw_df):
+        """Test rank-of-id and k-th complaint agree with a full ranking."""
+        base, delta, deleted, expected_df = self.apply_changes(raw_df)
+        self.full_rescore(prioritizer, base, AS_OF)
+        prioritizer.apply_delta(delta, deleted_ids=deleted, as_of=self.LATER)
+        
+        reference = ComplaintPrioritizer()
+        reference.load_default_weights()
+        self.full_rescore(reference, expected_df, self.LATER)
+        ranked = reference.prioritized_complaints
+        department = ranked['department'].iloc[0]
+        
+        for k in (1, 7, len(ranked)):
+            row = ranked.iloc[k - 1]
+            assert prioritizer.rank_of(row['id']) == row['priority_rank']
+            assert prioritizer.kth_complaint(k)['priority_score'] == pytest.approx(row['priority_score'])
+        assert (prioritizer.get_department_priorities(department)['id'].tolist()
+                == reference.get_department_priorities(department)['id'].tolist())
+        with pytest.raises(KeyError):
+            prioritizer.rank_of(deleted[0])
+    
+    def test_department_queries_after_delta(self, prioritizer, raw_df):
+        """Test department queries follow deltas without a full re-ranking."""
+        base, delta, deleted, expected_df = self.apply_changes(raw_df)
+        self.full_rescore(prioritizer, base, AS_OF)
+        prioritizer.get_department_counts()
+        prioritizer.apply_delta(delta, deleted_ids=deleted, as_of=self.LATER)
+        
+        prioritizer.get_department_counts()
+        
+        # A second batch at the same time only moves one complaint between departments
+        moved = expected_df.iloc[[4]].copy()
+        moved['department'] = expected_df['department'].iloc[0]
+        prioritizer.apply_delta(moved, as_of=self.LATER)
+        expected_df = expected_df.copy()
+        expected_df.loc[moved.index, 'department'] = moved['department']
+        
+        reference = ComplaintPrioritizer()
+        reference.load_default_weights()
+        self.full_rescore(reference, expected_df, self.LATER)
+        
+        assert prioritizer.get_department_counts() == reference.get_department_counts()
+        for department in reference.get_department_counts():
+            for n in (None, 2):
+                result = prioritizer.get_department_priorities(department, n)
+                expected = reference.get_department_priorities(department, n)
+                assert result['id'].tolist() == expected['id'].tolist()
+                assert result['priority_rank'].tolist() == expected['priority_rank'].tolist()
+        assert prioritizer._prioritized_complaints is None
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,59 @@
+"""
+Test Suite for Streaming Quantile Sketch
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.quantile_sketch import KLLSketch
+
+
+class TestKLLSketch:
+    """Test cases for the KLL quantile sketch."""
+    
+    def test_small_input_is_exact(self):
+        """Test no compaction happens below capacity."""
+        sketch = KLLSketch(k=200)
+        sketch.update(np.arange(100, dtype=float))
+        
+        assert sketch.quantile(0.5) == 49.0
+        assert sketch.rank([10.0])[0] == 10
+    
+    def test_rank_error_bound(self):
+        """Test quantiles of a large stream are within the rank error bound."""
+        rng = np.random.default_rng(1)
+        values = rng.normal(size=200_000)
+        
+        sketch = KLLSketch(k=200, seed=1)
+        for batch in np.array_split(values, 50):
+            sketch.update(batch)
+        
+        sorted_values = np.sort(values)
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            true_rank = np.searchsorted(sorted_values, sketch.quantile(q)) / len(values)
+            assert abs(true_rank - q) < 0.02
+        
+        assert sketch.count == len(values)
+        assert sketch.size < 2000
+    
+    def test_merge(self):
+        """Test merged sketches keep the total weight."""
+        a, b = KLLSketch(k=64, seed=0), KLLSketch(k=64, seed=0)
+        a.update(np.linspace(0, 1, 5000))
+        b.update(np.linspace(1, 2, 5000))
+        
+        a.merge(b)
+        
+        assert a.count == 10000
+        assert a.rank([np.inf])[0] == 10000
+        assert abs(a.quantile(0.5) - 1.0) < 0.1
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,149 @@
+"""
+Test Suite for the Score Rank Index
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.rank_index import ScoreRankIndex
+
+
+@pytest.fixture
+def scores():
+    """Scores on a coarse grid, so many of them tie."""
+    rng = np.random.default_rng(3)
+    return np.round(rng.random(5000), 3)
+
+
+class TestScoreRankIndex:
+    """Test cases for Fenwick-tree order statistics."""
+    
+    def test_ranks_match_pandas(self, scores):
+        """Test competition and dense ranks of tied scores."""
+        index = ScoreRankIndex.from_scores(scores)
+        series = pd.Series(scores)
+        
+        assert np.array_equal(index.rank(scores), series.rank(ascending=False, method='min'))
+        assert np.array_equal(index.dense_rank(scores), series.rank(ascending=False, method='dense'))
+    
+    def test_incremental_matches_rebuild(self, scores):
+        """Test inserts, removals and updates leave the same trees as a fresh build."""
+        index = ScoreRankIndex.from_scores(scores[:4000])
+        index.insert(scores[4000:])
+        index.remove(scores[:100])
+        index.update(scores[100:200], scores[100:200] / 2)
+        
+        expected = np.concatenate([scores[100:200] / 2, scores[200:]])
+        rebuilt = ScoreRankIndex.from_scores(expected)
+        
+        assert len(index) == len(expected)
+        assert np.array_equal(index._tree, rebuilt._tree)
+        assert np.array_equal(index._distinct_tree, rebuilt._distinct_tree)
+    
+    def test_kth_bucket(self, scores):
+        """Test the k-th highest bucket against a sort."""
+        index = ScoreRankIndex.from_scores(scores)
+        ordered = np.sort(index.bucket(scores))[::-1]
+        
+        for k in (1, 2, 100, 2500, len(scores)):
+            assert index.kth_bucket(k) == ordered[k - 1]
+        with pytest.raises(IndexError):
+            index.kth_bucket(len(scores) + 1)
+    
+    def test_quantiles_match_level_counts(self, scores):
+        """Test counts at or above each quantile agree with np.quantile."""
+        index = ScoreRankIndex.from_scores(scores)
+        qs = [0.25, 0.5, 0.75]
+        
+        thresholds = index.quantiles(qs)
+        expected = np.diff(np.concatenate([[0], np.searchsorted(np.sort(scores), np.quantile(scores, qs)),
+                                           [len(scores)]]))
+        
+        assert np.array_equal(index.level_counts(thresholds), expected)
+    
+    def test_remove_missing_score(self):
+        """Test removing a score that was never inserted leaves the index unchanged."""
+        index = ScoreRankIndex.from_scores([0.2, 0.4])
+        
+        with pytest.raises(ValueError):
+            index.remove([0.9])
+        assert len(index) == 2
+        assert index.rank([0.4])[0] == 1
+
+
+
+class TestKeyedRankIndex:
+    """Keyed indexes answer exact ranks and item queries."""
+    
+    @pytest.fixture
+    def index(self, scores):
+        """A coarse keyed index, so every bucket holds many distinct scores."""
+        return ScoreRankIndex.from_scores(scores, keys=np.arange(len(scores)), resolution=64)
+    
+    def test_exact_ranks_despite_coarse_buckets(self, scores, index):
+        """Test ranks match pandas for single and bulk queries."""
+        series = pd.Series(scores)
+        dense = series.rank(ascending=False, method='dense').to_numpy()
+        competition = series.rank(ascending=False, method='min').to_numpy()
+        
+        assert np.array_equal(index.dense_rank(scores), dense)
+        assert np.array_equal(index.rank(scores), competition)
+        for i in (0, 17, 4999):
+            assert index.dense_rank(scores[i])[0] == dense[i]
+            assert index.rank(scores[i])[0] == competition[i]
+    
+    def test_kth_and_top_follow_stable_sort(self, scores, index):
+        """Test item queries return keys in score order, ties by key."""
+        order = np.argsort(-scores, kind='stable')
+        
+        keys, top_scores = index.top(300)
+        
+        assert np.array_equal(keys, order[:300])
+        assert np.array_equal(top_scores, scores[order[:300]])
+        assert index.kth_key(1234) == (order[1233], scores[order[1233]])
+    
+    def test_quantiles_are_exact(self, scores, index):
+        """Test thresholds and level counts equal np.quantile and searchsorted."""
+        qs = [0.25, 0.5, 0.75]
+        thresholds = np.quantile(scores, qs)
+        levels = np.searchsorted(thresholds, scores, side='right')
+        
+        assert np.array_equal(index.quantiles(qs), thresholds)
+        assert np.array_equal(index.level_counts(thresholds), np.bincount(levels, minlength=4))
+    
+    def test_keyed_updates_match_rebuild(self, scores, index):
+        """Test removals, re-inserts and updates keep exact ranks and item order."""
+        keys = np.arange(len(scores))
+        current = scores.copy()
+        
+        index.remove(current[:50], keys[:50])
+        index.update(current[50:100], current[50:100] / 3, keys[50:100])
+        current[50:100] /= 3
+        index.insert([0.5, 0.5], [0, 1])
+        current[:2] = 0.5
+        
+        live = np.concatenate([keys[:2], keys[50:]])
+        rebuilt = ScoreRankIndex.from_scores(current[live], keys=live, resolution=64)
+        
+        assert len(index) == len(rebuilt)
+        assert np.array_equal(index._distinct_tree, rebuilt._distinct_tree)
+        assert np.array_equal(index.top(500)[0], rebuilt.top(500)[0])
+        assert np.array_equal(index.dense_rank(current[live[:100]]), rebuilt.dense_rank(current[live[:100]]))
+    
+    def test_keys_required_once_tracked(self, scores, index):
+        """Test keyed and keyless calls are not mixed."""
+        with pytest.raises(ValueError):
+            index.insert([0.3])
+        with pytest.raises(ValueError):
+            ScoreRankIndex.from_scores(scores).top(5)
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,116 @@
+"""
+Test Suite for Field-Agent Route Batching
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.routing import (RoutePlanner, hilbert_index, nearest_neighbour_route, two_opt,
+                         weighted_latency)
+from src.spatial import haversine_m
+
+
+def make_complaints(n, departments, seed=0):
+    """Random ranked complaints around Islamabad."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'id': [f"C-{i}" for i in range(n)],
+                         'priority_score': rng.random(n),
+                         'department': rng.choice(departments, n),
+                         'latitude': 33.6 + rng.random(n) * 0.1,
+                         'longitude': 73.0 + rng.random(n) * 0.1})
+
+
+class TestRouteHeuristics:
+    """Curve ordering and route improvement."""
+    
+    def test_hilbert_curve_visits_neighbouring_cells(self):
+        """Test the curve covers every cell once, moving one cell at a time."""
+        x, y = np.meshgrid(np.arange(8), np.arange(8))
+        
+        d = hilbert_index(x.ravel(), y.ravel(), order=3)
+        
+        assert np.array_equal(np.sort(d), np.arange(64))
+        path = np.column_stack([x.ravel(), y.ravel()])[np.argsort(d)]
+        assert (np.abs(np.diff(path, axis=0)).sum(axis=1) == 1).all()
+    
+    @pytest.mark.parametrize('free_start', [False, True])
+    def test_two_opt_reaches_local_optimum(self, free_start):
+        """Test no single segment reversal improves the weighted latency afterwards."""
+        rng = np.random.default_rng(1)
+        for _ in range(10):
+            points = rng.random((13, 2)) * 1000
+            distances = np.sqrt(((points[:, np.newaxis] - points) ** 2).sum(axis=-1))
+            if free_start:
+                distances[0, :] = distances[:, 0] = 0
+            weights = np.concatenate([[0.0], rng.random(12) + 0.1])
+            
+            initial = nearest_neighbour_route(distances, np.where(weights > 0, weights, 1.0))
+            route = two_opt(initial, distances, weights)
+            best = weighted_latency(route, distances, weights)
+            
+            assert route[0] == 0 and np.array_equal(np.sort(route), np.arange(13))
+            assert best <= weighted_latency(initial, distances, weights) + 1e-9
+            for a in range(11):
+                for b in range(a + 2, 13):
+                    reversed_route = route.copy()
+                    reversed_route[a + 1:b + 1] = route[a + 1:b + 1][::-1]
+                    assert weighted_latency(reversed_route, distances, weights) >= best - 1e-6
+
+
+class TestRoutePlanner:
+    """Top-K stops split across agents and sequenced."""
+    
+    def test_every_top_stop_routed_once(self, monkeypatch):
+        """Test each department's top K are visited exactly once, also across route chunks."""
+        monkeypatch.setattr('routing.MAX_ROUTE_STOPS', 7)
+        df = make_complaints(400, ['Roads', 'Parks', 'Water Supply'])
+        planner = RoutePlanner(agents_per_department=3)
+        
+        routes = planner.plan(df, top_k=40)
+        
+        expected = df.sort_values('priority_score', ascending=False).groupby('department').head(40)
+        assert sorted(routes['id']) == sorted(expected['id'])
+        summary = planner.get_route_summary()
+        assert len(summary) == 9
+        assert summary['stops'].tolist() == [13, 14, 13] * 3
+        for _, route in routes.groupby('agent_id'):
+            assert route['visit_order'].tolist() == list(range(1, len(route) + 1))
+            legs = haversine_m(route['latitude'].to_numpy()[:-1], route['longitude'].to_numpy()[:-1],
+                               route['latitude'].to_numpy()[1:], route['longitude'].to_numpy()[1:])
+            assert np.allclose(route['leg_m'].to_numpy()[1:], legs)
+    
+    def test_agents_share_by_capacity_and_start(self):
+        """Test stops follow agent capacity shares and routes leave from the start point."""
+        df = make_complaints(100, ['Roads', 'Parks'])
+        df.loc[df.index[:3], 'latitude'] = np.nan
+        agents = pd.DataFrame({'agent_id': ['r1', 'r2', 'p1'], 'department': ['Roads', 'Roads', 'Parks'],
+                               'capacity': [1, 3, 0]})
+        start = (33.65, 73.05)
+        planner = RoutePlanner(agents, start=start)
+        
+        routes = planner.plan(df, top_k=100)
+        
+        roads = df[(df['department'] == 'Roads') & df['latitude'].notna()]
+        counts = routes['agent_id'].value_counts()
+        assert counts['r1'] + counts['r2'] == len(roads)
+        assert counts['r2'] == pytest.approx(3 * counts['r1'], abs=2)
+        assert (routes['department'] == 'Roads').all()
+        assert len(planner.unrouted) == len(df) - len(routes)
+        first = routes[routes['visit_order'] == 1]
+        assert np.allclose(first['leg_m'], haversine_m(*start, first['latitude'], first['longitude']))
+    
+    def test_missing_columns(self):
+        """Test ranked complaints need priority and coordinates."""
+        with pytest.raises(ValueError, match="Missing columns"):
+            RoutePlanner().plan(pd.DataFrame({'priority_score': [1.0]}))
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
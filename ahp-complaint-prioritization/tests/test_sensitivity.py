@@ -0,0 +1,91 @@
+"""
+Test Suite for Weight Sensitivity Analysis
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.sensitivity import SensitivityAnalyzer, sweep_weights
+
+
+CRITERIA = ['A', 'B', 'C']
+BASE_WEIGHTS = np.array([0.5, 0.3, 0.2])
+
+
+class TestWeightSweep:
+    """Grid weights must stay normalized and keep the other ratios."""
+    
+    def test_sweep_renormalizes_other_weights(self):
+        """Test each row sums to 1 and the other criteria keep their ratio."""
+        weights = sweep_weights(BASE_WEIGHTS, 0, [0.0, 0.25, 0.5, 1.0])
+        
+        assert np.allclose(weights.sum(axis=1), 1.0)
+        assert np.allclose(weights[:, 0], [0.0, 0.25, 0.5, 1.0])
+        assert np.allclose(weights[2], BASE_WEIGHTS)
+        assert np.allclose(weights[:3, 1] / weights[:3, 2], 1.5)
+    
+    def test_sweep_from_single_criterion(self):
+        """Test a base weight of 1 spreads the remainder evenly."""
+        weights = sweep_weights(np.array([1.0, 0.0, 0.0]), 0, [0.4])
+        
+        assert np.allclose(weights, [[0.4, 0.3, 0.3]])
+
+
+class TestRankReversals:
+    """Sweep results and exact reversal points."""
+    
+    def setup_method(self):
+        # x leads on A, y leads on B and C
+        self.scores = np.array([[0.9, 0.1, 0.1],
+                                [0.3, 0.6, 0.6],
+                                [0.0, 0.0, 0.0]])
+        self.analyzer = SensitivityAnalyzer(CRITERIA, BASE_WEIGHTS)
+    
+    def test_reversal_weight_is_exact(self):
+        """Test the reported crossing point equalizes the two scores."""
+        self.analyzer.run(self.scores, ids=['x', 'y', 'z'], top_k=2)
+        
+        reversal = self.analyzer.reversals.query("criterion == 'A'").iloc[0]
+        weights = sweep_weights(BASE_WEIGHTS, 0, [reversal['reversal_weight']])[0]
+        
+        assert reversal['higher_id'] == 'x' and reversal['lower_id'] == 'y'
+        assert np.isclose(self.scores[0] @ weights, self.scores[1] @ weights)
+        assert reversal['weight_change'] < 0
+    
+    def test_sweep_ranks_follow_scores(self):
+        """Test grid ranks and the top-K retention count."""
+        results = self.analyzer.run(self.scores, ids=['x', 'y', 'z'], top_k=2,
+                                    grid=np.linspace(0, 1, 11))
+        
+        sweep_a = results[results['criterion'] == 'A']
+        at_zero = sweep_a[sweep_a['weight'] == 0.0].set_index('id')['priority_rank']
+        at_one = sweep_a[sweep_a['weight'] == 1.0].set_index('id')['priority_rank']
+        
+        assert at_zero.to_dict() == {'x': 2, 'y': 1}
+        assert at_one.to_dict() == {'x': 1, 'y': 2}
+        assert (sweep_a['top_k_retained'] == 2).all()
+        assert len(results) == 3 * 11 * 2
+    
+    def test_process_pool_matches_serial(self):
+        """Test parallel sweeps give identical results."""
+        scores = np.random.default_rng(0).random((50, 3))
+        
+        serial = SensitivityAnalyzer(CRITERIA, BASE_WEIGHTS).run(scores, top_k=5)
+        parallel = SensitivityAnalyzer(CRITERIA, BASE_WEIGHTS).run(scores, top_k=5, n_jobs=2)
+        
+        assert serial.equals(parallel)
+    
+    def test_critical_changes_require_run(self):
+        """Test asking for critical changes before a sweep raises."""
+        with pytest.raises(ValueError):
+            self.analyzer.get_critical_changes()
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
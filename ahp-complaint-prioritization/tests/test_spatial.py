@@ -0,0 +1,196 @@
+"""
+Test Suite for the Spatial Grid Index and Hotspot Scores
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.data_loader import ComplaintDataLoader
+from src.prioritizer import ComplaintPrioritizer
+from src.spatial import SpatialGridIndex, getis_ord_gi, haversine_m, hotspot_scores
+
+
+SAMPLE_CSV = Path(__file__).parent.parent / 'data' / 'sample_complaints.csv'
+
+
+def random_points(n, seed=0, span=0.02):
+    """Random coordinates around Islamabad with a few missing locations."""
+    rng = np.random.default_rng(seed)
+    latitudes = 33.6 + rng.random(n) * span
+    longitudes = 73.0 + rng.random(n) * span
+    latitudes[::50] = np.nan
+    return latitudes, longitudes
+
+
+def brute_force_distances(latitudes, longitudes):
+    """Distance between every pair of points (NaN where a location is missing)."""
+    return haversine_m(latitudes[:, np.newaxis], longitudes[:, np.newaxis],
+                       latitudes[np.newaxis, :], longitudes[np.newaxis, :])
+
+
+class TestGridIndex:
+    """Radius queries must return exactly the pairs within the radius."""
+    
+    @pytest.mark.parametrize('radius, cell', [(150.0, 150.0), (300.0, 100.0), (80.0, 250.0)])
+    def test_pairs_match_all_pairs_scan(self, radius, cell):
+        """Test pairs and distances against a scan of every pair."""
+        latitudes, longitudes = random_points(400)
+        index = SpatialGridIndex(latitudes, longitudes, cell_m=cell)
+        
+        found = {}
+        for i, j, distance in index.query_pairs(radius):
+            found.update(zip(zip(i.tolist(), j.tolist()), distance.tolist()))
+        
+        distances = brute_force_distances(latitudes, longitudes)
+        expected = set(zip(*np.nonzero(distances <= radius)))
+        
+        assert set(found) == {(int(i), int(j)) for i, j in expected}
+        assert np.allclose([found[pair] for pair in expected], distances[tuple(np.array(list(expected)).T)],
+                           atol=1e-6)
+    
+    def test_small_batches_give_same_sums(self, monkeypatch):
+        """Test splitting candidate pairs into tiny batches does not change results."""
+        latitudes, longitudes = random_points(300, seed=1)
+        values = np.random.default_rng(1).random(300)
+        index = SpatialGridIndex(latitudes, longitudes, cell_m=200)
+        expected = index.neighbourhood_sums(values, 200)
+        
+        monkeypatch.setattr('spatial.PAIR_BLOCK', 7)
+        
+        for actual, wanted in zip(index.neighbourhood_sums(values, 200), expected):
+            assert np.allclose(actual, wanted)
+    
+    def test_epanechnikov_sums(self):
+        """Test kernel-weighted sums against direct computation."""
+        latitudes, longitudes = random_points(300, seed=2)
+        values = np.random.default_rng(2).random(300)
+        index = SpatialGridIndex(latitudes, longitudes)
+        
+        weight_sum, value_sum, squared_sum = index.neighbourhood_sums(values, 400, kernel='epanechnikov')
+        
+        distances = np.nan_to_num(brute_force_distances(latitudes, longitudes), nan=np.inf)
+        weights = np.where(distances <= 400, 1 - (distances / 400) ** 2, 0)
+        assert np.allclose(weight_sum, weights.sum(axis=1))
+        assert np.allclose(value_sum, weights @ values)
+        assert np.allclose(squared_sum, (weights ** 2).sum(axis=1))
+    
+    def test_invalid_arguments(self):
+        """Test bad cell sizes, kernels and value lengths are rejected."""
+        with pytest.raises(ValueError):
+            SpatialGridIndex([33.6], [73.0], cell_m=0)
+        index = SpatialGridIndex([33.6, 33.7], [73.0, 73.1])
+        with pytest.raises(ValueError, match="Unknown kernel"):
+            index.neighbourhood_sums([1.0, 2.0], 100, kernel='gaussian')
+        with pytest.raises(ValueError):
+            index.neighbourhood_sums([1.0], 100)
+
+
+class TestHotspots:
+    """Getis-Ord Gi* statistics and the hotspot criterion score."""
+    
+    def test_gi_star_matches_formula(self):
+        """Test z-scores against the textbook Gi* formula with binary weights."""
+        latitudes, longitudes = random_points(300, seed=3)
+        values = np.random.default_rng(3).random(300)
+        index = SpatialGridIndex(latitudes, longitudes, cell_m=300)
+        
+        z = getis_ord_gi(index, values, 300)
+        
+        valid = ~np.isnan(latitudes)
+        x = values[valid]
+        n = len(x)
+        weights = (brute_force_distances(latitudes[valid], longitudes[valid]) <= 300).astype(float)
+        w_sum = weights.sum(axis=1)
+        s = np.sqrt((x ** 2).mean() - x.mean() ** 2)
+        expected = (weights @ x - x.mean() * w_sum) / (s * np.sqrt((n * w_sum - w_sum ** 2) / (n - 1)))
+        
+        assert np.allclose(z[valid], expected)
+        assert np.isnan(z[~valid]).all()
+    
+    def test_planted_cluster_is_hotspot(self):
+        """Test a tight cluster of high values scores as a significant hotspot."""
+        rng = np.random.default_rng(4)
+        df = pd.DataFrame({'latitude': 33.6 + rng.random(2000) * 0.1,
+                           'longitude': 73.0 + rng.random(2000) * 0.1,
+                           'priority_score': rng.random(2000) * 0.5})
+        df.loc[:29, ['latitude', 'longitude']] = [33.65, 73.05] + rng.normal(0, 0.0005, (30, 2))
+        df.loc[:29, 'priority_score'] = 0.9
+        df.loc[30, 'latitude'] = np.nan
+        
+        scores = hotspot_scores(df, radius_m=300)
+        
+        assert (scores[:30] > 0.975).all()
+        assert scores[30] == 0.5
+        assert scores.index.equals(df.index)
+        assert scores.between(0, 1).all()
+    
+    def test_constant_values_are_neutral(self):
+        """Test constant values have no hotspots."""
+        latitudes, longitudes = random_points(100, seed=5)
+        df = pd.DataFrame({'latitude': latitudes, 'longitude': longitudes})
+        
+        assert (hotspot_scores(df, np.ones(100)) == 0.5).all()
+
+
+class TestHotspotCriterion:
+    """Hotspot score as a sixth AHP criterion."""
+    
+    def test_extends_existing_judgments(self):
+        """Test the existing comparisons are kept and weights still sum to one."""
+        prioritizer = ComplaintPrioritizer()
+        prioritizer.set_criteria_weights(ComplaintPrioritizer.DEFAULT_COMPARISONS)
+        base_matrix = prioritizer.ahp.comparison_matrix.copy()
+        
+        prioritizer.add_hotspot_criterion()
+        
+        assert prioritizer.criteria[-1] == ComplaintPrioritizer.HOTSPOT_CRITERION
+        assert prioritizer.CRITERIA_COLUMNS[-1] == 'hotspot_score'
+        assert len(ComplaintPrioritizer.CRITERIA_COLUMNS) == 5
+        assert np.array_equal(prioritizer.ahp.comparison_matrix[:5, :5], base_matrix)
+        assert prioritizer.ahp.comparison_matrix[0, 5] == 3
+        assert prioritizer.ahp.weights.sum() == pytest.approx(1.0)
+        assert prioritizer.ahp.is_consistent()
+        with pytest.raises(ValueError, match="already added"):
+            prioritizer.add_hotspot_criterion()
+    
+    def test_profiles_keep_hotspot_judgments(self):
+        """Test weight profiles loaded after the hotspot criterion reuse its judgments."""
+        prioritizer = ComplaintPrioritizer()
+        prioritizer.load_default_weights()
+        prioritizer.add_hotspot_criterion()
+        
+        profiles = prioritizer.load_weight_profiles(cache_dir=None)
+        
+        np.testing.assert_allclose(profiles.loc['default'], prioritizer.ahp.weights)
+        weights = prioritizer.set_weight_profiles({'base': ComplaintPrioritizer.DEFAULT_COMPARISONS})
+        np.testing.assert_allclose(weights.loc['base'], prioritizer.ahp.weights)
+    
+    def test_prioritizes_with_hotspot_scores(self):
+        """Test the sample data ranks with the hotspot column and needs it."""
+        loader = ComplaintDataLoader()
+        loader.load_from_csv(SAMPLE_CSV)
+        enriched = loader.enrich_complaint_data()
+        prioritizer = ComplaintPrioritizer()
+        prioritizer.load_default_weights()
+        base = prioritizer.calculate_priority_scores(enriched)
+        prioritizer.add_hotspot_criterion()
+        
+        with pytest.raises(ValueError, match="hotspot_score"):
+            prioritizer.prioritize_complaints(enriched)
+        
+        enriched['hotspot_score'] = hotspot_scores(enriched, base)
+        ranked = prioritizer.prioritize_complaints(enriched)
+        
+        expected = enriched[prioritizer.CRITERIA_COLUMNS].to_numpy() @ prioritizer.ahp.weights
+        assert np.allclose(ranked['priority_score'].sort_index(), expected)
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""
+Test Suite for Weight Uncertainty Analysis
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.prioritizer import ComplaintPrioritizer
+from src.uncertainty import WeightUncertaintyAnalyzer, competition_ranks
+
+
+def make_analyzer(**kwargs):
+    """Analyzer around the built-in default comparisons."""
+    return WeightUncertaintyAnalyzer(ComplaintPrioritizer.DEFAULT_CRITERIA,
+                                     ComplaintPrioritizer.DEFAULT_COMPARISONS, seed=7, **kwargs)
+
+
+class TestPerturbation:
+    """Perturbed matrices must stay valid Saaty-scale comparison matrices."""
+    
+    def test_step_samples_stay_on_scale(self):
+        """Test reciprocity and one-step moves along the Saaty scale."""
+        analyzer = make_analyzer()
+        matrices = analyzer.sample_matrices(500)
+        
+        assert np.allclose(matrices * np.swapaxes(matrices, 1, 2), 1.0)
+        
+        ladder = np.log(WeightUncertaintyAnalyzer.SAATY_LADDER)
+        steps = np.abs(np.log(matrices)[..., np.newaxis] - ladder).argmin(axis=-1)
+        base_steps = np.abs(np.log(analyzer.base_matrix)[..., np.newaxis] - ladder).argmin(axis=-1)
+        assert np.abs(steps - base_steps).max() == 1
+    
+    def test_lognormal_samples_are_clipped(self):
+        """Test log-normal noise keeps judgments within 1/9 and 9."""
+        matrices = make_analyzer(perturbation='lognormal', spread=2.0).sample_matrices(200)
+        
+        assert matrices.min() >= 1/9 - 1e-12
+        assert matrices.max() <= 9 + 1e-12
+    
+    def test_unknown_perturbation_rejected(self):
+        """Test invalid perturbation names raise."""
+        with pytest.raises(ValueError):
+            make_analyzer(perturbation='uniform')
+
+
+class TestRankStability:
+    """Rank statistics under sampled weights."""
+    
+    def test_competition_ranks_share_ties(self):
+        """Test tied scores share the best rank and the next rank is skipped."""
+        ranks = competition_ranks(np.array([[0.2, 0.9, 0.5, 0.5, 0.1]]))
+        
+        assert ranks.tolist() == [[4, 1, 2, 2, 5]]
+    
+    def test_chunking_does_not_change_results(self):
+        """Test a tiny memory budget gives the same statistics as one chunk."""
+        scores = np.random.default_rng(0).random((300, 5))
+        
+        one_chunk = make_analyzer().analyze(scores, n_samples=200, top_k=20)
+        chunked = make_analyzer().analyze(scores, n_samples=200, top_k=20, memory_budget_mb=0.01)
+        
+        assert one_chunk.equals(chunked)
+    
+    def test_statistics_are_consistent(self):
+        """Test rank bounds, probabilities and the dominant complaint."""
+        scores = np.random.default_rng(1).random((200, 5))
+        scores[0] = 1.0
+        
+        result = make_analyzer().analyze(scores, n_samples=300, top_k=10)
+        
+        assert (result['rank_min'] <= result['rank_mean']).all()
+        assert (result['rank_mean'] <= result['rank_max']).all()
+        assert result['prob_top_10'].between(0, 1).all()
+        assert result.loc[0, 'rank_max'] == 1
+        assert result.loc[0, 'prob_top_10'] == 1.0
+    
+    def test_zero_spread_reproduces_baseline(self):
+        """Test unperturbed samples always give the baseline ranking."""
+        scores = np.random.default_rng(2).random((100, 5))
+        
+        result = make_analyzer(spread=0).analyze(scores, n_samples=20)
+        
+        assert (result['rank_min'] == result['baseline_rank']).all()
+        assert (result['rank_max'] == result['baseline_rank']).all()
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
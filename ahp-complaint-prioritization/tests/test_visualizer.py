@@ -0,0 +1,129 @@
+"""
+Test Suite for the Interactive Priority Map
+"""
+
+import json
+import re
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+pytest.importorskip('folium')
+
+from src.visualizer import PrioritizationVisualizer
+
+
+def make_ranked(n, seed=0):
+    """Ranked complaints around Islamabad, with text that needs escaping."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'id': [f"C-{i}" for i in range(n)],
+                       'title': 'Leak {{ near }} </script> & "main"',
+                       'severity': rng.choice(['critical', 'high', 'low'], n),
+                       'type': 'water_leak',
+                       'affected_people': rng.integers(1, 500, n).astype(float),
+                       'description': 'Reported twice. ' * 20,
+                       'latitude': 33.6 + rng.random(n) * 0.1,
+                       'longitude': 73.0 + rng.random(n) * 0.1,
+                       'priority_score': np.sort(rng.random(n))[::-1]})
+    df['priority_rank'] = np.arange(1, n + 1)
+    return df
+
+
+def embedded_collection(html):
+    """The FeatureCollection written into a GeoJSON-mode map."""
+    data = re.findall(r"var \w+_data = (\{.*?\});\n", html)
+    assert len(data) == 1
+    return json.loads(data[0])
+
+
+def label_positions(html):
+    """Feature positions a GeoJSON-mode map draws rank labels for."""
+    labels = re.findall(r"(\[[\d, ]*\])\.forEach\(", html)
+    assert len(labels) == 1
+    return json.loads(labels[0])
+
+
+@pytest.mark.filterwarnings("ignore:CartoDB tiles")
+class TestPriorityMap:
+    """Per-marker and GeoJSON map rendering."""
+    
+    def setup_method(self):
+        self.visualizer = PrioritizationVisualizer()
+    
+    def test_geojson_properties(self):
+        """Test rows without coordinates are dropped and missing values take fallbacks."""
+        df = make_ranked(5)
+        df.loc[1, 'latitude'] = np.nan
+        df.loc[2, 'affected_people'] = np.nan
+        
+        collection = self.visualizer.complaints_to_geojson(df)
+        
+        features = collection['features']
+        assert [f['properties']['id'] for f in features] == ['C-0', 'C-2', 'C-3', 'C-4']
+        assert features[1]['properties']['affected_people'] == 'N/A'
+        assert features[1]['properties']['department'] == 'N/A'
+        assert features[0]['properties']['priority_rank'] == 1
+        assert len(features[0]['properties']['description']) == 150
+        assert features[2]['geometry']['coordinates'] == [round(df.loc[3, 'longitude'], 6),
+                                                          round(df.loc[3, 'latitude'], 6)]
+        json.dumps(collection)
+    
+    def test_geojson_mode_embeds_one_collection(self):
+        """Test every complaint is in one clustered layer and text survives unexpanded."""
+        df = make_ranked(300)
+        
+        html = self.visualizer.plot_priority_map(df, mode='auto').get_root().render()
+        
+        collection = embedded_collection(html)
+        assert len(collection['features']) == 300
+        assert collection['features'][0]['properties']['title'] == df.loc[0, 'title']
+        assert '</script> &' not in html
+        assert html.count('L.circleMarker(') == 1
+        assert html.count('L.markerClusterGroup(') == 1
+        # Rank labels only for the top 10, drawn by the same layer
+        assert label_positions(html) == list(range(10))
+        assert html.count('L.divIcon(') == 1
+    
+    def test_html_grows_linearly(self):
+        """Test the GeoJSON map costs a small, constant number of bytes per complaint."""
+        sizes = [len(self.visualizer.plot_priority_map(make_ranked(n), mode='geojson').get_root().render())
+                 for n in (1000, 4000)]
+        
+        per_complaint = (sizes[1] - sizes[0]) / 3000
+        assert per_complaint < 600
+        assert sizes[0] < 1000 * 600 + 50000
+    
+    def test_tied_ranks_label_ten(self):
+        """Test dense-rank ties and missing ranks still give at most ten labels."""
+        df = make_ranked(2000)
+        df['priority_rank'] = 1 + np.arange(2000) // 500
+        
+        html = self.visualizer.plot_priority_map(df, mode='geojson').get_root().render()
+        assert label_positions(html) == list(range(10))
+        assert len(html) < 2000 * 600 + 50000
+        
+        m = self.visualizer.plot_priority_map(df.head(150), mode='markers')
+        assert sum(child._name == 'Marker' for child in m._children.values()) == 10
+        
+        m = self.visualizer.plot_priority_map(df.head(150).drop(columns='priority_rank'), mode='markers')
+        assert sum(child._name == 'Marker' for child in m._children.values()) == 0
+    
+    def test_markers_mode_clusters(self):
+        """Test per-complaint markers go into the marker cluster beyond 100 complaints."""
+        m = self.visualizer.plot_priority_map(make_ranked(150), mode='markers')
+        
+        clusters = [child for child in m._children.values() if child._name == 'MarkerCluster']
+        assert len(clusters) == 1
+        assert len(clusters[0]._children) == 150
+        with pytest.raises(ValueError, match="Unknown map mode"):
+            self.visualizer.plot_priority_map(make_ranked(5), mode='canvas')
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,103 @@
+"""
+Test Suite for Capacity-Aware Workload Balancing
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from src.data_loader import ComplaintDataLoader
+from src.workload import WorkloadBalancer
+
+
+COLUMNS = ['safety_score', 'capacity_score']
+WEIGHTS = np.array([0.5, 0.5])
+
+
+def make_complaints(safety, departments, loads):
+    """Complaints with one safety criterion and a load-based capacity score."""
+    df = pd.DataFrame({'safety_score': safety, 'department': departments, 'department_load': loads})
+    df['capacity_score'] = ComplaintDataLoader().calculate_capacity_scores(df['department_load'])
+    return df
+
+
+def brute_force_order(df, limits):
+    """Reference greedy: rescore every open complaint before each pick."""
+    bands, band_scores = ComplaintDataLoader.CAPACITY_BANDS, ComplaintDataLoader.CAPACITY_BAND_SCORES
+    assigned = dict.fromkeys(limits, 0)
+    remaining = list(range(len(df)))
+    picks = []
+    while True:
+        best = None
+        for i in remaining:
+            department = df['department'][i]
+            if assigned[department] >= limits[department]:
+                continue
+            band = np.digitize(df['department_load'][i] + assigned[department], bands, right=True)
+            score = WEIGHTS[0] * df['safety_score'][i] + WEIGHTS[1] * band_scores[band]
+            if best is None or score > best[0]:
+                best = (score, i)
+        if best is None:
+            return picks
+        picks.append(best[1])
+        remaining.remove(best[1])
+        assigned[df['department'][best[1]]] += 1
+
+
+class TestGreedyAssignment:
+    """Assignments must follow the effective priority under growing load."""
+    
+    def test_load_lowers_remaining_priority(self):
+        """Test a busy department yields to a quieter one after crossing a band."""
+        df = make_complaints([0.9, 0.85, 0.7], ['Roads', 'Roads', 'Parks'], [5, 5, 0])
+        
+        result = WorkloadBalancer(department_capacity={'Roads': 2, 'Parks': 1}).assign(df, WEIGHTS, COLUMNS)
+        
+        # The first Roads assignment moves Roads from load 5 to 6 (1.0 -> 0.8)
+        assert result.index.tolist() == [0, 2, 1]
+        assert result['effective_capacity_score'].tolist() == [1.0, 1.0, 0.8]
+        assert result['assignment_order'].tolist() == [1, 2, 3]
+    
+    def test_matches_brute_force_greedy(self):
+        """Test the lazy heaps pick the same sequence as rescoring everything."""
+        rng = np.random.default_rng(7)
+        for _ in range(10):
+            df = make_complaints(rng.random(50), rng.choice(['A', 'B', 'C'], 50),
+                                 rng.integers(0, 35, 50))
+            limits = {department: int(rng.integers(0, 20)) for department in 'ABC'}
+            
+            result = WorkloadBalancer(department_capacity=limits).assign(df, WEIGHTS, COLUMNS)
+            
+            assert result.index[result['assignment_order'].notna()].tolist() == brute_force_order(df, limits)
+    
+    def test_agents_share_department_load(self):
+        """Test agents fill evenly and never exceed their capacity."""
+        df = make_complaints(np.linspace(1, 0, 12), ['Roads'] * 10 + ['Parks'] * 2, 0)
+        agents = pd.DataFrame({'agent_id': ['r1', 'r2', 'p1'], 'department': ['Roads', 'Roads', 'Parks'],
+                               'capacity': [2, 4, 5]})
+        balancer = WorkloadBalancer(agents)
+        
+        result = balancer.assign(df, WEIGHTS, COLUMNS)
+        loads = balancer.get_agent_loads().set_index('agent_id')
+        
+        assert loads['assigned'].to_dict() == {'r1': 2, 'r2': 4, 'p1': 2}
+        assert result['assigned_agent'].head(3).tolist() == ['r1', 'r2', 'r2']
+        assert result['assignment_order'].isna().sum() == 4
+        assert balancer.department_summary.set_index('department')['unassigned'].to_dict() == {'Roads': 4, 'Parks': 0}
+    
+    def test_capacity_required(self):
+        """Test a balancer without any capacity is rejected."""
+        with pytest.raises(ValueError):
+            WorkloadBalancer()
+        with pytest.raises(ValueError, match="Missing agent columns"):
+            WorkloadBalancer(pd.DataFrame({'agent_id': [1]}))
+
+
+if __name__ == "__main__":
+    # Run tests
+    pytest.main([__file__, "-v"])